@@ -6,11 +6,17 @@ import re
 from datetime import datetime
 import os
 import shutil
+import sys
 import threading
+from flask.helpers import get_debug_flag
 from flask_cors import CORS
 from src.utils.progress_utils import read_progress
 from src.core.pipeline import GenerationPipeline
 from src.core.models import model_registry
+from src.core.config import Config
+from src.processors.service import processor_service
+from src.processors.segmentation_models import AVAILABLE_MODELS, resolve_model_name
+from src.generators.webhooks import webhook_receiver
 import time, os
 
 app = Flask(__name__)
@@ -171,7 +177,8 @@ def api_stats():
         'models': model_counts,
         'prompts': prompt_counts,
         'success_rate': 100,  # All existing images are successful
-        'status': 'complete'  # Since we're viewing completed generation
+        'status': 'complete',  # Since we're viewing completed generation
+        'processors': processor_service.status()
     })
 
 @app.route('/api/progress')
@@ -180,6 +187,14 @@ def api_progress():
     return jsonify(read_progress())
 
 
+@app.route('/api/webhooks/<provider>', methods=['POST'])
+def api_webhook(provider):
+    """Receive prediction completion callbacks from Replicate/Fal.ai"""
+    handled = webhook_receiver.dispatch(provider, request.get_data(), request.headers,
+                                        request.args.get('token'))
+    return jsonify({'handled': handled})
+
+
 @app.route('/api/logs/stream')
 def api_logs_stream():
     """Server-Sent Events stream of live log lines"""
@@ -396,12 +411,15 @@ def start_workflow():
         
         remove_bg = config.get('removeBackground', True)
         create_ico = config.get('createICO', True)
+        bg_model = config.get('backgroundModel')
+        if bg_model and resolve_model_name(bg_model) not in AVAILABLE_MODELS:
+            return jsonify({'error': f'Unknown background model: {bg_model}'}), 400
         
         # Start workflow in background thread
         def run_workflow():
             try:
                 pipeline = GenerationPipeline()
-                if pipeline.initialize():
+                if pipeline.initialize(bg_model=bg_model):
                     pipeline.run_complete_pipeline(
                         models=models,
                         prompts=prompts,
@@ -497,9 +515,12 @@ def remove_background_selected():
     try:
         data = request.get_json()
         image_ids = data.get('imageIds', [])
+        bg_model = data.get('model')
         
         if not image_ids:
             return jsonify({'error': 'No images selected'}), 400
+        if bg_model and resolve_model_name(bg_model) not in AVAILABLE_MODELS:
+            return jsonify({'error': f'Unknown background model: {bg_model}'}), 400
         
         # Get selected image files
         selected_files = []
@@ -512,15 +533,9 @@ def remove_background_selected():
         if not selected_files:
             return jsonify({'error': 'No valid images found for processing'}), 400
         
-        # Initialize background remover
-        pipeline = GenerationPipeline()
-        pipeline.initialize()
-        
-        if not pipeline.background_remover:
-            return jsonify({'error': 'Background remover not available'}), 500
-        
-        # Process images
-        processed_files = pipeline.background_remover.process_batch(selected_files, PROCESSED_DIR)
+        # Shared background remover (model stays loaded between requests)
+        remover = processor_service.background_remover_for(bg_model)
+        processed_files = remover.process_batch(selected_files, PROCESSED_DIR)
         
         return jsonify({
             'success': True,
@@ -562,15 +577,8 @@ def convert_to_ico_selected():
         if not selected_files:
             return jsonify({'error': 'No valid images found for conversion'}), 400
         
-        # Initialize ICO converter
-        pipeline = GenerationPipeline()
-        pipeline.initialize()
-        
-        if not pipeline.ico_converter:
-            return jsonify({'error': 'ICO converter not available'}), 500
-        
         # Convert images
-        ico_files = pipeline.ico_converter.convert_batch(selected_files, ICONS_DIR)
+        ico_files = processor_service.ico_converter.convert_batch(selected_files, ICONS_DIR)
         
         return jsonify({
             'success': True,
@@ -581,6 +589,23 @@ def convert_to_ico_selected():
     except Exception as e:
         return jsonify({'error': f'Failed to convert to ICO: {str(e)}'}), 500
 
+def is_reloader_parent():
+    """True in the debug reloader's file-watching process, which never serves requests"""
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        return False
+    if __name__ == '__main__':
+        return True  # app.run(debug=True) below starts the reloader
+    # `flask run` reloads when debug is on (--debug sets FLASK_DEBUG) or --reload is given
+    argv = sys.argv[1:]
+    if Path(sys.argv[0]).stem != 'flask' or 'run' not in argv or '--no-reload' in argv:
+        return False
+    return '--reload' in argv or get_debug_flag()
+
+# Load the background removal model at startup, in whichever process serves
+# requests (python app.py, flask run or a WSGI server)
+if Config.PROCESSOR_PREWARM and not is_reloader_parent():
+    processor_service.warm_up()
+
 if __name__ == '__main__':
     # Ensure directories exist
     for dir_path in [OUTPUT_DIR, RAW_DIR, PROCESSED_DIR, ICONS_DIR, LOGS_DIR]:
@@ -6,6 +6,12 @@ Usage:
     python main.py generate --models flux_dev,dalle3       # Generate with specific models
     python main.py generate --prompts spark_dialog         # Generate specific prompts
     python main.py process --remove-bg --create-ico        # Process existing images
+    python main.py process --remove-bg --export            # Export icon sets for Windows, macOS and web
+    python main.py resume <job_id>                         # Resume an interrupted generation job
+    python main.py benchmark --workers 1,2,4               # Benchmark background removal throughput
+    python main.py benchmark --suite models                # Compare segmentation models (speed/quality)
+    python main.py benchmark --suite ico                   # Compare ICO resampling paths
+    python main.py verify-icons                            # Check ICO files from their headers
     python main.py status                                  # Show system status
     python main.py list-models                            # List all available models
 """
@@ -105,6 +111,13 @@ def cmd_list_models(args):
                     logger.info(f"  - {model}")
                     # Show full spec for CLI usage
                     logger.info(f"    Usage: --models {provider}:{model}")
+        
+        from src.processors.segmentation_models import AVAILABLE_MODELS
+        logger.info("\nBackground removal models:")
+        for model in AVAILABLE_MODELS:
+            default = " (default)" if model == Config.BG_MODEL else ""
+            logger.info(f"  - {model}{default}")
+        logger.info("    Usage: --bg-model MODEL")
     
     except Exception as e:
         logger.error(f"Failed to list models: {e}")
@@ -119,7 +132,7 @@ def cmd_generate(args):
     try:
         # Initialize pipeline
         pipeline = GenerationPipeline()
-        if not pipeline.initialize():
+        if not pipeline.initialize(bg_model=args.bg_model):
             logger.error("Failed to initialize pipeline")
             return 1
         
@@ -143,7 +156,10 @@ def cmd_generate(args):
                 models=models,
                 prompts=prompts,
                 remove_bg=args.remove_bg,
-                create_ico=args.create_ico
+                create_ico=args.create_ico,
+                scheduler_mode=args.scheduler,
+                use_cache=False if args.no_cache else None,
+                force=args.force
             )
             
             # Print summary
@@ -153,15 +169,22 @@ def cmd_generate(args):
             logger.info(f"Images processed: {summary['images_processed']}")
             logger.info(f"ICO files created: {summary['ico_files_created']}")
             logger.info(f"Total time: {summary['total_time']:.1f}s")
+            logger.info(f"Job id: {results['generation']['job_id']}")
         
         else:
             # Just generation
-            results = pipeline.generate_images(models=models, prompts=prompts)
+            results = pipeline.generate_images(models=models, prompts=prompts, scheduler_mode=args.scheduler,
+                                               use_cache=False if args.no_cache else None, force=args.force)
             
             logger.info("=== Generation Complete ===")
             logger.info(f"Success rate: {results['success_rate']:.1%} ({results['successful']}/{results['total_tasks']})")
             logger.info(f"Total time: {results['total_time']:.1f}s")
             logger.info(f"Avg time per image: {results['avg_time_per_image']:.1f}s")
+            if results["cached"]:
+                logger.info(f"Reused from cache: {results['cached']}")
+            logger.info(f"Job id: {results['job_id']}")
+            if "time_saved" in results["scheduler"]:
+                logger.info(f"Time saved vs sequential mode: ~{results['scheduler']['time_saved']:.1f}s")
         
         # Save detailed results
         results_file = Config.LOGS_DIR / "last_generation_results.json"
@@ -191,25 +214,67 @@ def cmd_generate(args):
     
     return 0
 
+def cmd_resume(args):
+    """Resume an interrupted generation job from its journal"""
+    logger = setup_cli_logger()
+    
+    from src.core.journal import JobJournal
+    
+    if not args.job_id:
+        jobs = JobJournal.list_jobs()
+        if not jobs:
+            logger.info("No journaled jobs found")
+            return 0
+        logger.info("=== Journaled Jobs (newest first) ===")
+        for job_id in jobs[:20]:
+            logger.info(f"  {job_id}: {JobJournal.open(job_id).summary()}")
+        return 0
+    
+    try:
+        pipeline = GenerationPipeline()
+        if not pipeline.initialize():
+            logger.error("Failed to initialize pipeline")
+            return 1
+        
+        results = pipeline.resume_job(args.job_id)
+        generation = results.get("generation", results)
+        
+        logger.info("=== Resume Complete ===")
+        logger.info(f"Success rate: {generation['success_rate']:.1%} ({generation['successful']}/{generation['total_tasks']})")
+        logger.info(f"Recovered from the interrupted run: {generation['resumed']}")
+        logger.info(f"Total time: {generation['total_time']:.1f}s")
+        
+    except Exception as e:
+        logger.error(f"Resume failed: {e}")
+        return 1
+    
+    return 0
+
 def cmd_process(args):
     """Process existing images"""
     logger = setup_cli_logger()
     
     try:
         pipeline = GenerationPipeline()
-        pipeline.initialize()
+        pipeline.initialize(bg_model=args.bg_model)
         
         input_dir = Path(args.input) if args.input else Config.RAW_DIR
         
         results = pipeline.process_images(
             input_dir=input_dir,
             remove_bg=args.remove_bg,
-            create_ico=args.create_ico
+            create_ico=args.create_ico,
+            force=args.force,
+            export_icons=args.export,
+            jobs=args.jobs
         )
         
         logger.info("=== Processing Complete ===")
         logger.info(f"Images processed: {len(results['processed'])}")
         logger.info(f"ICO files created: {len(results['icons'])}")
+        if args.export:
+            logger.info(f"Icon sets exported: {len(results['exports'])} (in {Config.EXPORTS_DIR})")
+        logger.info(f"Up-to-date steps skipped: {results['skipped']}")
         
     except Exception as e:
         logger.error(f"Processing failed: {e}")
@@ -217,6 +282,81 @@ def cmd_process(args):
     
     return 0
 
+def cmd_verify_icons(args):
+    """Check every ICO in a directory from its headers (no pixels are decoded)"""
+    logger = setup_cli_logger()
+    
+    from src.processors.ico_converter import ICOConverter
+    
+    input_dir = Path(args.input) if args.input else Config.ICONS_DIR
+    ico_files = sorted(input_dir.glob("*.ico"))
+    if not ico_files:
+        logger.error(f"No ICO files found in {input_dir}")
+        return 1
+    
+    results = ICOConverter(Config.ICO_SIZES).verify_batch(ico_files)
+    logger.info("=== ICO Verification ===")
+    logger.info(f"Valid: {results['valid']}/{results['checked']} ({results['elapsed_ms']:.1f} ms)")
+    return 0 if not results["invalid"] else 1
+
+def cmd_benchmark(args):
+    """Benchmark background removal throughput, segmentation models or ICO resampling"""
+    logger = setup_cli_logger()
+    
+    from src.utils.benchmark_utils import (benchmark_background_removal, benchmark_ico_resampling,
+                                           benchmark_models, find_images, save_benchmark)
+    
+    try:
+        input_dir = Path(args.input) if args.input else Config.RAW_DIR
+        images = find_images(input_dir, args.limit)
+        if not images:
+            logger.error(f"No images found in {input_dir}")
+            return 1
+        
+        if args.suite == "models":
+            models = [m.strip() for m in args.models.split(",")]
+            logger.info(f"=== Segmentation Model Benchmark: {len(images)} images, reference {args.reference} ===")
+            results = benchmark_models(images, models, reference=args.reference,
+                                       intra_op_threads=args.threads or 0,
+                                       graph_optimization=args.graph_opt, min_iou=args.min_iou)
+            
+            for run in results["runs"]:
+                logger.info(f"  {run['model']:<24} p50 {run['latency_ms_p50']:>8.1f}ms  "
+                            f"p95 {run['latency_ms_p95']:>8.1f}ms  RSS {run['peak_rss_mb']} MB  "
+                            f"IoU {run['iou_mean']} (min {run['iou_min']})")
+            logger.info(f"Fastest model with mean IoU >= {args.min_iou}: {results['recommended']}")
+            logger.info(f"Results saved to: {save_benchmark(results)}")
+            return 0
+        
+        if args.suite == "ico":
+            logger.info(f"=== ICO Resampling Benchmark: {len(images)} images ===")
+            results = benchmark_ico_resampling(images, repeats=args.repeats)
+            for run in results["runs"]:
+                logger.info(f"  {run['path']:<8} {run['ms_per_image']:>8.1f} ms/image (p50 {run['ms_p50']:.1f})")
+            logger.info(f"Pyramid speedup: {results['speedup']:.2f}x; mean abs difference per size: "
+                        f"{results['mean_abs_diff']}")
+            logger.info(f"Results saved to: {save_benchmark(results)}")
+            return 0
+        
+        worker_counts = [int(w) for w in args.workers.split(",")]
+        batch_sizes = [int(b) for b in args.batch_size.split(",")]
+        logger.info(f"=== Background Removal Benchmark: {len(images)} images ===")
+        results = benchmark_background_removal(images, worker_counts, model_name=args.bg_model,
+                                               intra_op_threads=args.threads, batch_sizes=batch_sizes)
+        
+        for run in results["runs"]:
+            speedup = f", {run['speedup']:.2f}x per-image" if run["speedup"] else ""
+            logger.info(f"  {run['workers']:>2} workers x {run['intra_op_threads']:>2} threads, "
+                        f"batch {run['batch_size']:>2}: {run['images_per_s']:.2f} img/s "
+                        f"({run['images_per_s_per_core']:.3f} per core{speedup})")
+        logger.info(f"Results saved to: {save_benchmark(results)}")
+        
+    except Exception as e:
+        logger.error(f"Benchmark failed: {e}")
+        return 1
+    
+    return 0
+
 def main():
     """Main CLI entry point"""
     
@@ -231,6 +371,12 @@ Examples:
   %(prog)s generate --models flux_dev,dalle3       # Use specific models
   %(prog)s generate --all --process --remove-bg    # Generate + process pipeline
   %(prog)s process --remove-bg --create-ico        # Process existing images
+  %(prog)s process --remove-bg --export            # Export icon sets for Windows, macOS and web
+  %(prog)s resume 20250101_120000_ab12cd           # Resume an interrupted job
+  %(prog)s benchmark --workers 1,2,4,8             # Compare background removal throughput
+  %(prog)s benchmark --suite models                # Compare segmentation model speed/quality
+  %(prog)s benchmark --suite ico                   # Compare ICO resampling paths
+  %(prog)s verify-icons                            # Check ICO files from their headers
         """
     )
     
@@ -252,12 +398,61 @@ Examples:
     gen_parser.add_argument("--process", action="store_true", help="Run complete pipeline (generate + process)")
     gen_parser.add_argument("--remove-bg", action="store_true", help="Remove backgrounds during processing")
     gen_parser.add_argument("--create-ico", action="store_true", help="Create ICO files during processing")
+    gen_parser.add_argument("--scheduler", choices=["global", "sequential", "async"],
+                            help="Run all models at once (global), one model at a time (sequential) "
+                                 "or on a single event loop (async) (default: SCHEDULER_MODE)")
+    gen_parser.add_argument("--force", action="store_true",
+                            help="Regenerate images even if an identical generation is cached")
+    gen_parser.add_argument("--no-cache", action="store_true",
+                            help="Neither read nor write the generation cache")
+    gen_parser.add_argument("--bg-model", help="Background removal model, e.g. u2netp or u2net-int8 (default: BG_MODEL)")
     
     # Process command
     proc_parser = subparsers.add_parser("process", help="Process existing images")
     proc_parser.add_argument("--input", help="Input directory (default: output/raw)")
     proc_parser.add_argument("--remove-bg", action="store_true", help="Remove backgrounds")
     proc_parser.add_argument("--create-ico", action="store_true", help="Create ICO files")
+    proc_parser.add_argument("--export", action="store_true",
+                             help="Export ICO, ICNS, favicon, apple-touch/manifest PNG and WebP icon sets "
+                                  "(formats: EXPORT_FORMATS)")
+    proc_parser.add_argument("--force", action="store_true",
+                             help="Reprocess images even if their outputs are up to date")
+    proc_parser.add_argument("--jobs", type=int,
+                             help="Worker processes for ICO conversion and icon export, 0 = one per core "
+                                  "(default: PROCESS_JOBS / EXPORT_WORKERS)")
+    proc_parser.add_argument("--bg-model", help="Background removal model, e.g. u2netp or u2net-int8 (default: BG_MODEL)")
+    
+    # Resume command
+    resume_parser = subparsers.add_parser("resume", help="Resume an interrupted generation job")
+    resume_parser.add_argument("job_id", nargs="?", help="Job id to resume (omit to list journaled jobs)")
+    
+    # Verify icons command
+    verify_parser = subparsers.add_parser("verify-icons", help="Check ICO files from their headers")
+    verify_parser.add_argument("--input", help="Directory of ICO files (default: output/icons)")
+    
+    # Benchmark command
+    bench_parser = subparsers.add_parser("benchmark", help="Benchmark background removal")
+    bench_parser.add_argument("--suite", choices=["throughput", "models", "ico"], default="throughput",
+                              help="Worker/batch throughput of one model, latency, peak RSS and "
+                                   "mask IoU of several models, or ICO resampling paths (default: throughput)")
+    bench_parser.add_argument("--input", help="Input directory (default: output/raw)")
+    bench_parser.add_argument("--limit", type=int, default=50, help="Number of images to use (default: 50)")
+    bench_parser.add_argument("--workers", default="1,2,4",
+                              help="Comma-separated worker-process counts to compare (default: 1,2,4)")
+    bench_parser.add_argument("--batch-size", default="1",
+                              help="Comma-separated batch sizes to compare; 1 = per-image path (default: 1)")
+    bench_parser.add_argument("--threads", type=int,
+                              help="ONNX intra-op threads per worker (default: cores / workers)")
+    bench_parser.add_argument("--bg-model", help="Model for the throughput suite (default: BG_MODEL)")
+    bench_parser.add_argument("--models", default="u2net,u2netp,silueta,isnet-general-use,u2net-int8,u2netp-int8",
+                              help="Comma-separated models for the models suite")
+    bench_parser.add_argument("--reference", default="u2net", help="Model whose masks IoU is measured against")
+    bench_parser.add_argument("--min-iou", type=float, default=0.95,
+                              help="Mean IoU a model needs to be recommended (default: 0.95)")
+    bench_parser.add_argument("--graph-opt", choices=["disabled", "basic", "extended", "all"],
+                              help="ONNX Runtime graph optimization level (default: BG_GRAPH_OPTIMIZATION)")
+    bench_parser.add_argument("--repeats", type=int, default=3,
+                              help="Timed runs per image in the ico suite, best kept (default: 3)")
     
     # Parse arguments
     args = parser.parse_args()
@@ -275,6 +470,12 @@ Examples:
         return cmd_generate(args)
     elif args.command == "process":
         return cmd_process(args)
+    elif args.command == "resume":
+        return cmd_resume(args)
+    elif args.command == "benchmark":
+        return cmd_benchmark(args)
+    elif args.command == "verify-icons":
+        return cmd_verify_icons(args)
     else:
         parser.print_help()
         return 1
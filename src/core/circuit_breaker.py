@@ -0,0 +1,186 @@
+# src/core/circuit_breaker.py
+"""
+Per-model circuit breakers classifying failures by HTTP status
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .config import Config
+
+FAILURE_PERMANENT = "permanent"
+FAILURE_TRANSIENT = "transient"
+
+# Statuses that will not change during a run (bad key, no credit, unknown model)
+PERMANENT_STATUSES = {401, 402, 403, 404}
+TRANSIENT_STATUSES = {408, 409, 425, 429}
+
+def classify_failure(status_code: Optional[int]) -> Optional[str]:
+    """Classify a failed call by status code
+
+    Returns FAILURE_PERMANENT, FAILURE_TRANSIENT, or None for request-specific
+    errors (e.g. a 400 for a rejected prompt) that say nothing about the model.
+    Failures without a status (timeouts, dropped connections) are transient.
+    """
+    if status_code is None or status_code in TRANSIENT_STATUSES or status_code >= 500:
+        return FAILURE_TRANSIENT
+    if status_code in PERMANENT_STATUSES:
+        return FAILURE_PERMANENT
+    return None
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one provider:model
+
+    Closed: calls flow and outcomes go into a sliding window; the breaker
+    opens once the window's transient failure rate crosses the threshold.
+    Open: calls are held back until the cooldown expires.
+    Half-open: a single probe call is let through; success closes the
+    breaker, failure reopens it with a doubled cooldown.
+
+    A new breaker starts half-open so the first call to a model acts as the
+    probe. A permanent failure, or too many failed probes in a row, marks
+    the model dead for the rest of the run.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, key: str, window: int = None, min_calls: int = None,
+                 failure_rate: float = None, open_seconds: float = None,
+                 max_open_seconds: float = None, max_probes: int = None):
+        self.key = key
+        self.min_calls = min_calls or Config.CIRCUIT_MIN_CALLS
+        self.failure_rate = failure_rate or Config.CIRCUIT_FAILURE_RATE
+        self.open_seconds = open_seconds or Config.CIRCUIT_OPEN_SECONDS
+        self.max_open_seconds = max_open_seconds or Config.CIRCUIT_MAX_OPEN_SECONDS
+        self.max_probes = max_probes or Config.CIRCUIT_MAX_PROBES
+        self.logger = logging.getLogger("circuit_breaker")
+
+        self.state = self.HALF_OPEN
+        self.dead = False
+        self.last_error: Optional[str] = None
+        self.trips = 0
+        self.failed_probes = 0
+        self._window: Deque[bool] = deque(maxlen=window or Config.CIRCUIT_WINDOW)
+        self._cooldown = self.open_seconds
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def admit(self) -> Optional[bool]:
+        """Ask to make a call: None if it must wait, otherwise whether it is the probe"""
+        with self._lock:
+            if self.dead:
+                return None
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN:
+                if time.time() < self._open_until:
+                    return None
+                self.state = self.HALF_OPEN
+            if self._probe_in_flight:
+                return None
+            self._probe_in_flight = True
+            return True
+
+    def retry_in(self) -> Optional[float]:
+        """Seconds until a call may be admitted (0 if now), or None if the model is dead"""
+        with self._lock:
+            if self.dead:
+                return None
+            if self.state == self.OPEN:
+                return max(0.0, self._open_until - time.time())
+            return 0.0
+
+    @property
+    def probe_in_flight(self) -> bool:
+        """Whether a probe call has been admitted and not recorded yet"""
+        with self._lock:
+            return self._probe_in_flight
+
+    def record(self, probe: bool, success: bool, status_code: Optional[int] = None,
+               error: Optional[str] = None):
+        """Record the outcome of an admitted call"""
+
+        kind = None if success else classify_failure(status_code)
+
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            if kind is not None:
+                self.last_error = error
+
+            if kind == FAILURE_PERMANENT:
+                self._kill(f"permanent error (status {status_code})")
+                return
+
+            if probe and self.state == self.HALF_OPEN:
+                if kind == FAILURE_TRANSIENT:
+                    self.failed_probes += 1
+                    if self.failed_probes >= self.max_probes:
+                        self._kill(f"{self.failed_probes} failed probes")
+                    else:
+                        self._open(f"probe failed (status {status_code})")
+                        self._cooldown = min(self.max_open_seconds, self._cooldown * 2)
+                else:
+                    self.state = self.CLOSED
+                    self.failed_probes = 0
+                    self._cooldown = self.open_seconds
+                    self._window.clear()
+                return
+
+            # Calls finishing while open/half-open were admitted before the trip
+            if self.state != self.CLOSED:
+                return
+
+            self._window.append(kind == FAILURE_TRANSIENT)
+            failures = sum(self._window)
+            if len(self._window) >= self.min_calls and failures / len(self._window) >= self.failure_rate:
+                self._open(f"{failures}/{len(self._window)} recent calls failed")
+
+    def _open(self, reason: str):
+        self.state = self.OPEN
+        self.trips += 1
+        self._open_until = time.time() + self._cooldown
+        self.logger.warning(f"Circuit for {self.key} opened for {self._cooldown:.1f}s: {reason}")
+
+    def _kill(self, reason: str):
+        self.state = self.OPEN
+        self.dead = True
+        self.logger.warning(f"Circuit for {self.key} open for the rest of the run: {reason}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": "dead" if self.dead else self.state,
+                "trips": self.trips,
+                "failed_probes": self.failed_probes,
+                "last_error": self.last_error
+            }
+
+class CircuitBreakerRegistry:
+    """Breakers for one generation run, created on first use"""
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(key, **self.breaker_options)
+            return self._breakers[key]
+
+    def dead_models(self) -> List[str]:
+        with self._lock:
+            return [key for key, breaker in self._breakers.items() if breaker.dead]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.snapshot() for key, breaker in breakers.items()}
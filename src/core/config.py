@@ -19,6 +19,7 @@ class Config:
     RAW_DIR = OUTPUT_DIR / "raw"
     PROCESSED_DIR = OUTPUT_DIR / "processed"
     ICONS_DIR = OUTPUT_DIR / "icons"
+    EXPORTS_DIR = OUTPUT_DIR / "exports"
     LOGS_DIR = BASE_DIR / "logs"
     CACHE_DIR = BASE_DIR / "cache"
     CONFIG_DIR = BASE_DIR / "config"
@@ -35,10 +36,101 @@ class Config:
     TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", "120"))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     
+    # Scheduling Settings
+    SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "global").lower()  # "global", "sequential" or "async"
+    SCHEDULER_MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", "16"))
+    MAX_CONCURRENT_PER_PROVIDER = int(os.getenv("MAX_CONCURRENT_PER_PROVIDER", "8"))
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "256"))
+    CANARY_MAX_WORKERS = int(os.getenv("CANARY_MAX_WORKERS", "32"))
+    
+    # HTTP connection pooling (connections kept alive per host, per provider session)
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", str(max(MAX_WORKERS, MAX_CONCURRENT_PER_PROVIDER))))
+    HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+    POLLER_WORKERS = int(os.getenv("POLLER_WORKERS", "4"))
+    # Threads that download and save finished predictions (see PredictionPoller.then)
+    POLLER_COMPLETION_WORKERS = int(os.getenv("POLLER_COMPLETION_WORKERS", "8"))
+    POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "0.5"))
+    POLL_MIN_TIMEOUT = float(os.getenv("POLL_MIN_TIMEOUT", "30"))
+    POLL_TIMEOUT_FACTOR = float(os.getenv("POLL_TIMEOUT_FACTOR", "2.0"))
+    
+    # Streaming generate -> process pipeline (run_complete_pipeline)
+    STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "32"))
+    STREAM_BG_WORKERS = int(os.getenv("STREAM_BG_WORKERS", "1"))
+    STREAM_ICO_WORKERS = int(os.getenv("STREAM_ICO_WORKERS", "2"))
+    
+    # Generation cache (reuse outputs for unchanged provider/model/prompt/params)
+    GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "true").lower() == "true"
+    GENERATION_CACHE_MAX_MB = int(os.getenv("GENERATION_CACHE_MAX_MB", "2048"))
+    GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "20000"))
+    
+    # Rate limiting (see RATE_LIMITS below)
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "5"))
+    
+    # Circuit breakers (per provider:model)
+    CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+    CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+    CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+    CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "10"))
+    CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "120"))
+    CIRCUIT_MAX_PROBES = int(os.getenv("CIRCUIT_MAX_PROBES", "5"))
+    
+    # Webhooks (public base URL that providers can reach; empty = polling only). Callback
+    # URLs carry WEBHOOK_TOKEN (random per run when empty); callbacks older than
+    # WEBHOOK_MAX_AGE_SECONDS are rejected
+    WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "")
+    WEBHOOK_TOKEN = os.getenv("WEBHOOK_TOKEN", "")
+    WEBHOOK_MAX_AGE_SECONDS = float(os.getenv("WEBHOOK_MAX_AGE_SECONDS", "300"))
+    WEBHOOK_LISTEN_HOST = os.getenv("WEBHOOK_LISTEN_HOST", "127.0.0.1")
+    WEBHOOK_LISTEN_PORT = int(os.getenv("WEBHOOK_LISTEN_PORT", "0"))  # 0 = no standalone listener
+    WEBHOOK_FALLBACK_INTERVAL = float(os.getenv("WEBHOOK_FALLBACK_INTERVAL", "15"))
+    REPLICATE_WEBHOOK_SECRET = os.getenv("REPLICATE_WEBHOOK_SECRET", "")
+    
     # Processing Settings
     REMOVE_BACKGROUND = os.getenv("REMOVE_BACKGROUND", "true").lower() == "true"
     CREATE_ICO = os.getenv("CREATE_ICO", "true").lower() == "true"
     ICO_SIZES = [16, 32, 48, 64, 128, 256]
+    # ICO frame encoding: "standard" (Pillow's PNG frames) or "compact" (smallest PNG per
+    # frame, palettized when the mean color/alpha error stays within ICO_PALETTE_MAX_ERROR)
+    ICO_ENCODING = os.getenv("ICO_ENCODING", "standard")
+    ICO_PALETTE_MAX_ERROR = float(os.getenv("ICO_PALETTE_MAX_ERROR", "1.5"))
+    # Worker processes for batch ICO conversion and image optimization (0 = one per core)
+    PROCESS_JOBS = int(os.getenv("PROCESS_JOBS", "1"))
+    # Quality search floor and encode budget for JPEG/WebP/AVIF size targets, and whether
+    # 4:4:4 chroma is tried (JPEG/AVIF) when 4:2:0 at the requested quality uses half the budget
+    OPTIMIZE_MIN_QUALITY = int(os.getenv("OPTIMIZE_MIN_QUALITY", "30"))
+    OPTIMIZE_MAX_ENCODES = int(os.getenv("OPTIMIZE_MAX_ENCODES", "3"))
+    OPTIMIZE_SUBSAMPLING_SEARCH = os.getenv("OPTIMIZE_SUBSAMPLING_SEARCH", "true").lower() == "true"
+    
+    # Icon export (process --export): formats from icon_exporter.EXPORT_FORMATS,
+    # worker processes (0 = one per core) and the apple-touch background (empty = transparent)
+    EXPORT_FORMATS = os.getenv("EXPORT_FORMATS", "ico,icns,favicon,apple-touch,manifest,webp")
+    EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "0"))
+    EXPORT_WEBP_QUALITY = int(os.getenv("EXPORT_WEBP_QUALITY", "90"))
+    EXPORT_TOUCH_BACKGROUND = os.getenv("EXPORT_TOUCH_BACKGROUND", "#FFFFFF")
+    
+    # Background removal model (see segmentation_models.AVAILABLE_MODELS; "-int8"
+    # variants are quantized on first use) and ONNX Runtime session options
+    BG_MODEL = os.getenv("BG_MODEL", "u2net")
+    BG_GRAPH_OPTIMIZATION = os.getenv("BG_GRAPH_OPTIMIZATION", "all")  # disabled, basic, extended or all
+    BG_INTER_OP_THREADS = int(os.getenv("BG_INTER_OP_THREADS", "0"))  # 0 = ONNX Runtime default
+    
+    # Background removal worker processes (1 = in-process) and ONNX intra-op
+    # threads per session (0 = cores / BG_WORKERS, or ONNX's default in-process)
+    BG_WORKERS = int(os.getenv("BG_WORKERS", "1"))
+    BG_INTRA_OP_THREADS = int(os.getenv("BG_INTRA_OP_THREADS", "0"))
+    BG_BATCH_SIZE = int(os.getenv("BG_BATCH_SIZE", "1"))  # images per ONNX call in batch processing
+    # Solid-background fast path: NumPy color key for logos on a flat background,
+    # tolerances are RGB distances (0-441); ambiguous images still go to rembg
+    BG_FAST_PATH = os.getenv("BG_FAST_PATH", "true").lower() == "true"
+    BG_FAST_TOLERANCE = float(os.getenv("BG_FAST_TOLERANCE", "30"))
+    BG_FAST_FEATHER = float(os.getenv("BG_FAST_FEATHER", "24"))
+    BG_FAST_MIN_BORDER = float(os.getenv("BG_FAST_MIN_BORDER", "0.97"))  # matching share of border pixels
+    PROCESSOR_PREWARM = os.getenv("PROCESSOR_PREWARM", "true").lower() == "true"  # web app: load model at startup
+    # Mask cache: model masks keyed by image content hash and model, reused on re-runs
+    MASK_CACHE_ENABLED = os.getenv("MASK_CACHE_ENABLED", "true").lower() == "true"
+    MASK_CACHE_MAX_MB = int(os.getenv("MASK_CACHE_MAX_MB", "512"))
+    MASK_CACHE_MAX_ENTRIES = int(os.getenv("MASK_CACHE_MAX_ENTRIES", "50000"))
     
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -123,4 +215,23 @@ MODEL_CONFIGS = {
             "model": "fal-ai/flux/schnell"
         }
     }
-}
\ No newline at end of file
+}
+
+# Max in-flight generations per provider (falls back to Config.MAX_CONCURRENT_PER_PROVIDER)
+PROVIDER_CONCURRENCY = {
+    "together_ai": 6,
+    "replicate": 8,
+    "openai": 2,
+    "fal_ai": 8
+}
+
+# Submission rate limits per provider, with optional "provider:model" overrides.
+# requests_per_minute paces submissions, burst is the bucket size and
+# max_concurrent caps in-flight calls regardless of the scheduler in use.
+RATE_LIMITS = {
+    "together_ai": {"requests_per_minute": 60, "burst": 6},
+    "replicate": {"requests_per_minute": 600, "burst": 20},
+    "openai": {"requests_per_minute": 7, "burst": 2},
+    "fal_ai": {"requests_per_minute": 120, "burst": 10, "max_concurrent": 10},
+    "replicate:ideogram_v2": {"requests_per_minute": 30, "burst": 4}
+}
@@ -0,0 +1,122 @@
+# src/core/journal.py
+"""
+Append-only JSONL journal of generation job and task states
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import Config
+
+# Task states in the order a task moves through them
+QUEUED = "queued"
+SUBMITTED = "submitted"
+DOWNLOADED = "downloaded"
+FAILED = "failed"
+PROCESSED = "processed"
+
+class JobJournal:
+    """Record a job's options and every task state change as JSON lines
+
+    The first line holds the job options (models, prompts, scheduler and
+    processing flags). Every later line is a task event; replaying the file
+    merges events per task, so a task that was submitted and then crashed
+    still carries its prediction id. Lines are flushed as they are written,
+    so the journal survives the process dying mid-run.
+    """
+
+    def __init__(self, job_id: str, path: Path = None):
+        self.job_id = job_id
+        self.path = path or Config.LOGS_DIR / "jobs" / f"{job_id}.jsonl"
+        self.options: Dict[str, Any] = {}
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.logger = logging.getLogger("journal")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, **options) -> "JobJournal":
+        """Start a new job journal with the given options"""
+        job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        journal = cls(job_id)
+        journal.options = options
+        journal.path.parent.mkdir(parents=True, exist_ok=True)
+        journal._append({"event": "job", "job_id": job_id, "options": options})
+        return journal
+
+    @classmethod
+    def open(cls, job_id: str) -> "JobJournal":
+        """Load an existing journal and replay its task states"""
+        journal = cls(job_id)
+        if not journal.path.exists():
+            raise ValueError(f"No journal found for job {job_id}")
+
+        with open(journal.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a torn last line
+                    journal.logger.warning(f"Ignoring unreadable line {line_number} in {journal.path.name}")
+                    continue
+                if entry.get("event") == "job":
+                    journal.options = entry.get("options", {})
+                elif entry.get("event") == "task":
+                    journal.states.setdefault(entry["task"], {}).update(
+                        {k: v for k, v in entry.items() if k not in ("event", "task")}
+                    )
+        return journal
+
+    @staticmethod
+    def list_jobs() -> List[str]:
+        """Job ids with a journal, newest first"""
+        jobs_dir = Config.LOGS_DIR / "jobs"
+        if not jobs_dir.exists():
+            return []
+        return sorted((p.stem for p in jobs_dir.glob("*.jsonl")), reverse=True)
+
+    @staticmethod
+    def task_key(provider: str, model: str, prompt_id: str) -> str:
+        return f"{provider}:{model}:{prompt_id}"
+
+    def record(self, task: str, state: str, **fields):
+        """Append a state change for a task"""
+        entry = {"event": "task", "task": task, "state": state, "ts": round(time.time(), 3), **fields}
+        with self._lock:
+            self.states.setdefault(task, {}).update(
+                {k: v for k, v in entry.items() if k not in ("event", "task")}
+            )
+            self._append(entry)
+
+    def record_many(self, tasks: Iterable[str], state: str):
+        """Append the same state for many tasks in one write"""
+        now = round(time.time(), 3)
+        with self._lock:
+            lines = []
+            for task in tasks:
+                self.states.setdefault(task, {}).update({"state": state, "ts": now})
+                lines.append({"event": "task", "task": task, "state": state, "ts": now})
+            self._append(*lines)
+
+    def state(self, task: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self.states.get(task)
+            return dict(state) if state else None
+
+    def summary(self) -> Dict[str, int]:
+        """Number of tasks in each state"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for state in self.states.values():
+                counts[state["state"]] = counts.get(state["state"], 0) + 1
+        return counts
+
+    def _append(self, *entries: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
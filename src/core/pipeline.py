@@ -7,18 +7,28 @@ import logging
 import json
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import time
+import asyncio
 from collections import defaultdict
 
 from .config import Config
 from .models import model_registry
+from .scheduler import GenerationScheduler
+from .circuit_breaker import CircuitBreakerRegistry
+from .journal import JobJournal, QUEUED, SUBMITTED, DOWNLOADED, FAILED, PROCESSED
+from .streaming import Stage, StreamingPipeline
 from ..utils.file_utils import load_prompts
 from ..utils.progress_utils import write_progress, reset_progress
+from ..utils.http_utils import get_pool_stats
+from ..generators.latency import latency_history
+from ..generators.webhooks import webhook_receiver
+from ..generators.cache import generation_cache
+from ..generators.base import submission_listener
 from ..utils.logging_utils import setup_logger
-from ..processors.background_remover import BackgroundRemover
-from ..processors.ico_converter import ICOConverter
-from ..processors.image_optimizer import ImageOptimizer
+from ..processors.manifest import processing_manifest
+from ..processors.mask_cache import mask_cache
+from ..processors.service import processor_service
 
 class GenerationPipeline:
     """Main pipeline for image generation and processing"""
@@ -27,16 +37,33 @@ class GenerationPipeline:
         self.logger = setup_logger("pipeline", Config.LOGS_DIR / "generation.log", Config.LOG_LEVEL)
         self.background_remover = None
         self.ico_converter = None
+        self.icon_exporter = None
         self.image_optimizer = None
+        self.scheduler = GenerationScheduler()
         
-        # Fail-fast tracking
-        self.failed_models: Set[str] = set()  # Track failed provider:model combinations
+        # Per-run circuit breakers; models whose breaker gave up are listed as failed
+        self.circuit_breakers = CircuitBreakerRegistry()
+        self.failed_models: Set[str] = set()
+        
+        # Canary (first task) outcome per provider:model, reported in progress.json
+        self.canaries: Dict[str, Dict[str, Any]] = {}
+        
+        # Generation cache: whether new outputs are stored, and how many tasks were served
+        # without generating (cache hits and images recovered by a resumed job)
+        self.cache_writes = False
+        self.cached_count = 0
+        
+        # Journal of the current job's task states (see resume_job)
+        self.journal: Optional[JobJournal] = None
+        
+        # Processing stream fed with each generated image during run_complete_pipeline
+        self.stream: Optional[StreamingPipeline] = None
         
         # Ensure directories exist
         Config.ensure_directories()
     
-    def initialize(self) -> bool:
-        """Initialize the pipeline and all generators"""
+    def initialize(self, bg_model: str = None) -> bool:
+        """Initialize the pipeline and all generators (bg_model overrides BG_MODEL)"""
         self.logger.info("Initializing generation pipeline...")
         
         # Initialize model registry
@@ -47,37 +74,56 @@ class GenerationPipeline:
             self.logger.error("No API providers are working. Check your API keys in .env file")
             return False
         
-        # Initialize processors
+        # Standalone callback listener for CLI runs (the web app has its own route)
+        if webhook_receiver.enabled and Config.WEBHOOK_LISTEN_PORT:
+            webhook_receiver.start_listener()
+        
+        # Processors are shared process-wide, so the model is loaded only once
         if Config.REMOVE_BACKGROUND:
-            self.background_remover = BackgroundRemover()
+            self.background_remover = processor_service.background_remover_for(bg_model)
         
         if Config.CREATE_ICO:
-            self.ico_converter = ICOConverter(Config.ICO_SIZES)
+            self.ico_converter = processor_service.ico_converter
+        
+        self.icon_exporter = processor_service.icon_exporter
         
-        self.image_optimizer = ImageOptimizer()
+        self.image_optimizer = processor_service.image_optimizer
         
         self.logger.info(f"Pipeline initialized with {working_providers} providers and {model_registry.get_model_count()} models")
         return True
     
     def generate_images(self, models: List[str] = None, prompts: List[str] = None, 
-                       max_workers: int = None) -> Dict[str, Any]:
+                       max_workers: int = None, scheduler_mode: str = None,
+                       use_cache: bool = None, force: bool = False,
+                       journal: JobJournal = None, job_options: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Generate images with specified models and prompts
         
         Args:
             models: List of model specs (provider:model or just model)
             prompts: List of prompt IDs to generate (None = all)
-            max_workers: Number of parallel workers
+            max_workers: Number of parallel workers per model
+            scheduler_mode: "global" (all models at once), "sequential" (one model at a time)
+                or "async" (single event loop, up to ASYNC_MAX_IN_FLIGHT requests in flight)
+            use_cache: Read and write the generation cache (default GENERATION_CACHE_ENABLED)
+            force: Regenerate even when a cached image exists (still refreshes the cache)
+            journal: Journal of an interrupted job to resume (a new job is started otherwise)
+            job_options: Extra options stored in a new job's journal (e.g. processing flags)
         
         Returns:
             Dictionary with generation results and statistics
         """
         
         start_time = time.time()
+        use_cache = Config.GENERATION_CACHE_ENABLED if use_cache is None else use_cache
+        self.cache_writes = use_cache
+        self.cached_count = 0
         
         # Reset failed models tracking
         reset_progress()
+        self.circuit_breakers = CircuitBreakerRegistry()
         self.failed_models.clear()
+        self.canaries = {}
         
         # Load prompts
         prompt_data = load_prompts(Config.get_prompts_file())
@@ -111,9 +157,7 @@ class GenerationPipeline:
         self.logger.info(f"Starting generation: {len(prompt_data)} prompts × {len(model_specs)} models = {len(prompt_data) * len(model_specs)} images")
         
         # Generate all combinations
-        # Initialise progress tracking now that we know total tasks
         total_tasks = len(prompt_data) * len(model_specs)
-        write_progress(total_tasks=total_tasks, completed=0, status="running")
         generation_tasks = []
         for prompt_idx, prompt in enumerate(prompt_data):
             for model_idx, (provider, model) in enumerate(model_specs):
@@ -121,14 +165,62 @@ class GenerationPipeline:
                     "prompt": prompt,
                     "provider": provider,
                     "model": model,
+                    "params": self._generation_params(prompt, model_registry.get_generator(provider)),
                     "prompt_idx": prompt_idx,
                     "model_idx": model_idx,
                     "prompt_total": len(prompt_data),
                     "model_total": len(model_specs)
                 })
         
-        # Execute generations with fail-fast logic
-        results = self._execute_generation_tasks_failfast(generation_tasks, max_workers or Config.MAX_WORKERS)
+        # Journal every task state so an interrupted run can be resumed
+        if journal is None:
+            journal = JobJournal.create(
+                models=[f"{provider}:{model}" for provider, model in model_specs],
+                prompts=[prompt["id"] for prompt in prompt_data],
+                scheduler_mode=scheduler_mode,
+                use_cache=use_cache,
+                force=force,
+                **(job_options or {})
+            )
+            journal.record_many((self._task_key(task) for task in generation_tasks), QUEUED)
+            self.journal = journal
+            resumed_results, pending_tasks = [], generation_tasks
+        else:
+            self.journal = journal
+            resumed_results, pending_tasks = self._resolve_journaled_tasks(generation_tasks)
+        self.logger.info(f"Job {journal.job_id} (resume with: python main.py resume {journal.job_id})")
+        
+        # Serve unchanged prompt×model combinations from the cache
+        if use_cache and not force:
+            cached_results, pending_tasks = self._resolve_cached_tasks(pending_tasks)
+        else:
+            cached_results = []
+        if cached_results:
+            self.logger.info(f"Generation cache: {len(cached_results)} of {total_tasks} images reused, "
+                             f"{len(pending_tasks)} to generate")
+        cached_results = resumed_results + cached_results
+        self.cached_count = len(cached_results)
+        
+        # Initialise progress tracking now that we know total tasks
+        self.canaries = {f"{task['provider']}:{task['model']}": {"status": "pending"} for task in pending_tasks}
+        write_progress(total_tasks=total_tasks, completed=len(cached_results), status="running",
+                       canaries=self.canaries)
+        
+        # Execute generations behind per-model circuit breakers
+        scheduler_mode = scheduler_mode or Config.SCHEDULER_MODE
+        scheduler_stats = None
+        if not pending_tasks:
+            results = []
+        elif scheduler_mode == "sequential":
+            results = self._execute_generation_tasks_failfast(pending_tasks, max_workers or Config.MAX_WORKERS)
+        elif scheduler_mode == "async":
+            results = asyncio.run(self._aexecute_generation_tasks(pending_tasks, Config.ASYNC_MAX_IN_FLIGHT))
+        else:
+            scheduler_stats = self._execute_generation_tasks_scheduled(pending_tasks, max_workers or Config.MAX_WORKERS)
+            results = scheduler_stats.pop("results")
+        
+        results = cached_results + results
+        self.failed_models.update(self.circuit_breakers.dead_models())
         
         # Collect statistics
         total_time = time.time() - start_time
@@ -137,6 +229,7 @@ class GenerationPipeline:
         skipped = len(generation_tasks) - len(results)
         
         stats = {
+            "job_id": journal.job_id,
             "total_tasks": len(generation_tasks),
             "executed": len(results),
             "skipped": skipped,
@@ -146,123 +239,356 @@ class GenerationPipeline:
             "total_time": total_time,
             "avg_time_per_image": total_time / len(results) if results else 0,
             "failed_models": list(self.failed_models),
+            "cached": len(cached_results) - len(resumed_results),
+            "resumed": len(resumed_results),
+            "generation_cache": generation_cache.stats(),
+            "canaries": self.canaries,
+            "circuit_breakers": self.circuit_breakers.snapshot(),
+            "scheduler": {"mode": scheduler_mode, **(scheduler_stats or {})},
+            "http_pools": get_pool_stats(),
             "results": results
         }
         
+        # Persist completion times so the next run polls on a learned schedule
+        latency_history.save()
+        generation_cache.save()
+        
         # Mark progress complete
-        write_progress(total_tasks=len(generation_tasks), completed=len(results), status="complete")
+        write_progress(total_tasks=len(generation_tasks), completed=len(results), status="complete",
+                       canaries=self.canaries)
 
         self.logger.info(f"Generation complete: {successful}/{len(results)} successful, {skipped} skipped, in {total_time:.1f}s")
         if self.failed_models:
             self.logger.info(f"Failed models (skipped subsequent prompts): {', '.join(self.failed_models)}")
+        if scheduler_stats:
+            self.logger.info(f"Global scheduler saved ~{scheduler_stats['time_saved']:.1f}s vs sequential mode "
+                             f"(estimated {scheduler_stats['estimated_sequential_time']:.1f}s)")
+        for name, pool in stats["http_pools"].items():
+            self.logger.debug(f"HTTP pool {name}: {pool['requests']} requests, "
+                              f"{pool['hits']} reused connections, {pool['misses']} new connections")
         
         return stats
     
+    def _execute_generation_tasks_scheduled(self, tasks: List[Dict], max_workers: int) -> Dict[str, Any]:
+        """Execute generation tasks for all models at once through the global scheduler"""
+        
+        results = []
+        
+        def on_result(task, result):
+            results.append(result)
+            self._update_detailed_progress(task, len(tasks), len(results), result)
+        
+        scheduler_stats = self.scheduler.run(
+            tasks,
+            self._start_single_image,
+            model_limit=max_workers,
+            breakers=self.circuit_breakers,
+            on_result=on_result,
+            on_canary=self._record_canary
+        )
+        
+        return scheduler_stats
+    
     def _execute_generation_tasks_failfast(self, tasks: List[Dict], max_workers: int) -> List[Any]:
-        """Execute generation tasks with fail-fast logic for failed models"""
+        """Execute generation tasks one model at a time behind each model's circuit breaker"""
+        
+        from ..generators.base import GenerationResult
         
         results = []
         
-        # Group tasks by provider:model for fail-fast logic
+        # Group tasks by provider:model
         tasks_by_model = defaultdict(list)
         for task in tasks:
             model_key = f"{task['provider']}:{task['model']}"
             tasks_by_model[model_key].append(task)
         
-        # Process each model group
-        for model_key, model_tasks in tasks_by_model.items():
-            if model_key in self.failed_models:
-                self.logger.info(f"Skipping {len(model_tasks)} tasks for failed model: {model_key}")
-                continue
+        def run_admitted(breaker, task):
+            """Run a task if the breaker admits it; returns None when it must be retried later"""
+            probe = breaker.admit()
+            if probe is None:
+                return None
+            try:
+                result = self._generate_single_image(task)
+            except Exception as e:
+                self.logger.error(f"Task execution failed: {task['provider']}:{task['model']} {task['prompt']['id']} - {e}")
+                result = GenerationResult(
+                    success=False,
+                    prompt_id=task['prompt']['id'],
+                    model=f"{task['provider']}:{task['model']}",
+                    error=str(e)
+                )
+            breaker.record(probe, result.success, result.status_code, result.error)
+            return result
+        
+        def run_canary(breaker, task):
+            start = time.time()
+            return run_admitted(breaker, task), time.time() - start
+        
+        # Launch every model's canary at once instead of one model at a time
+        with ThreadPoolExecutor(max_workers=min(len(tasks_by_model), Config.CANARY_MAX_WORKERS)) as executor:
+            future_to_task = {}
+            for model_key, model_tasks in tasks_by_model.items():
+                task = model_tasks.pop(0)
+                self._record_canary(task)
+                future_to_task[executor.submit(run_canary, self.circuit_breakers.get(model_key), task)] = task
             
-            self.logger.info(f"Processing {len(model_tasks)} tasks for model: {model_key}")
-            
-            # Try first task for this model
-            first_task = model_tasks[0]
-            first_result = self._generate_single_image(first_task)
-            results.append(first_result)
-            # Update progress file after each task completion with detailed info
-            self._update_detailed_progress(first_task, len(tasks), len(results), first_result)
-            
-            # If first task failed with certain errors, skip remaining tasks for this model
-            if not first_result.success and self._should_skip_model(first_result.error):
-                self.failed_models.add(model_key)
-                self.logger.warning(f"Model {model_key} failed with: {first_result.error}")
-                self.logger.warning(f"Skipping remaining {len(model_tasks) - 1} tasks for this model")
+            for future in as_completed(future_to_task):
+                task = future_to_task[future]
+                result, duration = future.result()
+                self._record_canary(task, result, duration)
+                results.append(result)
+                self._update_detailed_progress(task, len(tasks), len(results), result)
+        
+        # Process the remaining tasks one model at a time
+        for model_key, model_tasks in tasks_by_model.items():
+            breaker = self.circuit_breakers.get(model_key)
+            pending = list(model_tasks)
+            if not pending:
                 continue
+            self.logger.info(f"Processing {len(pending)} tasks for model: {model_key}")
             
-            # If first task succeeded or failed with a non-fatal error, process remaining tasks
-            if len(model_tasks) > 1:
-                remaining_tasks = model_tasks[1:]
+            while pending and not breaker.dead:
+                delay = breaker.retry_in()
+                if delay:
+                    self.logger.info(f"Waiting {delay:.0f}s for {model_key} circuit to half-open")
+                    time.sleep(delay)
                 
+                if breaker.state != breaker.CLOSED:
+                    # Probe with a single task before releasing the rest
+                    task = pending.pop(0)
+                    result = run_admitted(breaker, task)
+                    if result is None:
+                        pending.insert(0, task)
+                        continue
+                    results.append(result)
+                    self._update_detailed_progress(task, len(tasks), len(results), result)
+                    continue
+                
+                # Closed: run the rest in parallel; tasks refused by a tripped breaker are kept
                 with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # Submit remaining tasks for this model
-                    future_to_task = {}
-                    for task in remaining_tasks:
-                        # Double-check model hasn't failed while we were processing
-                        if model_key not in self.failed_models:
-                            future = executor.submit(self._generate_single_image, task)
-                            future_to_task[future] = task
-                    
-                    # Collect results
+                    future_to_task = {executor.submit(run_admitted, breaker, task): task for task in pending}
+                    pending = []
                     for future in as_completed(future_to_task):
                         task = future_to_task[future]
+                        result = future.result()
+                        if result is None:
+                            pending.append(task)
+                            continue
+                        results.append(result)
+                        self._update_detailed_progress(task, len(tasks), len(results), result)
+            
+            if pending:
+                self.logger.warning(f"Model {model_key} failed with: {breaker.last_error}")
+                self.logger.warning(f"Skipping remaining {len(pending)} tasks for this model")
+        
+        return results
+    
+    async def _aexecute_generation_tasks(self, tasks: List[Dict], max_in_flight: int) -> List[Any]:
+        """Execute generation tasks as coroutines on one event loop behind per-model circuit breakers"""
+        
+        from ..generators.base import GenerationResult
+        
+        results = []
+        semaphore = asyncio.Semaphore(max_in_flight)
+        
+        # The first probe admitted for each model is its canary
+        awaiting_canary = {f"{task['provider']}:{task['model']}" for task in tasks}
+        # Set (and replaced) whenever a model's breaker records an outcome
+        breaker_changed = defaultdict(asyncio.Event)
+        
+        async def run_task(task):
+            model_key = f"{task['provider']}:{task['model']}"
+            breaker = self.circuit_breakers.get(model_key)
+            
+            while True:
+                async with semaphore:
+                    probe = breaker.admit()
+                    if probe is not None:
+                        canary = probe and model_key in awaiting_canary
+                        if canary:
+                            awaiting_canary.discard(model_key)
+                            self._record_canary(task)
+                        start = time.time()
                         try:
-                            result = future.result()
-                            results.append(result)
-                            # Update progress file for each finished future with detailed info
-                            self._update_detailed_progress(task, len(tasks), len(results), result)
-                            
-                            # Check if this result should cause us to skip future tasks
-                            if not result.success and self._should_skip_model(result.error):
-                                self.failed_models.add(model_key)
-                                self.logger.warning(f"Model {model_key} failed during batch, marking as failed")
-                                
+                            result = await self._agenerate_single_image(task)
                         except Exception as e:
-                            self.logger.error(f"Task execution failed: {task['provider']}:{task['model']} {task['prompt']['id']} - {e}")
-                            # Create failed result
-                            from ..generators.base import GenerationResult
-                            failed_result = GenerationResult(
+                            self.logger.error(f"Task execution failed: {model_key} {task['prompt']['id']} - {e}")
+                            result = GenerationResult(
                                 success=False,
                                 prompt_id=task['prompt']['id'],
-                                model=f"{task['provider']}:{task['model']}",
+                                model=model_key,
                                 error=str(e)
                             )
-                            results.append(failed_result)
+                        break
+                
+                # Held back by an open breaker or an in-flight probe: wait for the
+                # probe's outcome, or for the cooldown to expire
+                delay = breaker.retry_in()
+                if delay is None:
+                    return
+                if delay == 0 and not breaker.probe_in_flight:
+                    continue  # the cooldown expired just now
+                try:
+                    await asyncio.wait_for(breaker_changed[model_key].wait(), timeout=delay or None)
+                except asyncio.TimeoutError:
+                    pass
+            
+            breaker.record(probe, result.success, result.status_code, result.error)
+            breaker_changed.pop(model_key, asyncio.Event()).set()
+            if canary:
+                self._record_canary(task, result, time.time() - start)
+            results.append(result)
+            self._update_detailed_progress(task, len(tasks), len(results), result)
+        
+        self.logger.info(f"Running {len(tasks)} tasks on the async engine (max in flight: {max_in_flight})")
+        
+        try:
+            await asyncio.gather(*(run_task(task) for task in tasks))
+        finally:
+            for generator in model_registry.get_all_generators().values():
+                await generator.aclose()
         
         return results
     
-    def _should_skip_model(self, error_message: str) -> bool:
-        """Determine if an error should cause us to skip remaining tasks for a model"""
-        if not error_message:
-            return False
-        
-        error_lower = error_message.lower()
+    def _record_canary(self, task: Dict, result: Any = None, duration: float = 0.0):
+        """Track a model's canary task: started (no result yet) or finished"""
+        
+        model_key = f"{task['provider']}:{task['model']}"
+        if result is None:
+            self.canaries[model_key] = {"status": "running", "prompt_id": task["prompt"]["id"]}
+            return
+        
+        self.canaries[model_key] = {
+            "status": "passed" if result.success else "failed",
+            "prompt_id": task["prompt"]["id"],
+            "latency": round(duration, 2)
+        }
+        if not result.success:
+            self.canaries[model_key]["error"] = result.error
+        self.logger.info(f"Canary for {model_key} {self.canaries[model_key]['status']} in {duration:.1f}s")
+    
+    def _resolve_cached_tasks(self, tasks: List[Dict]):
+        """Split tasks into cache hits (as results) and tasks that still need generating"""
         
-        # Rate limiting errors
-        if "rate limit" in error_lower or "429" in error_lower:
-            return True
+        from ..generators.base import GenerationResult
         
-        # Authentication errors
-        if "unauthorized" in error_lower or "401" in error_lower or "invalid api key" in error_lower:
-            return True
+        cached_results = []
+        pending_tasks = []
+        for task in tasks:
+            file_path = generation_cache.lookup(task["provider"], task["model"], task["prompt"]["prompt"],
+                                                task["prompt"]["id"], Config.RAW_DIR, params=task["params"])
+            if file_path is None:
+                pending_tasks.append(task)
+            else:
+                self.journal.record(self._task_key(task), DOWNLOADED, file_path=str(file_path), cached=True)
+                cached_results.append(GenerationResult(
+                    success=True,
+                    prompt_id=task["prompt"]["id"],
+                    model=task["model"],
+                    file_path=file_path,
+                    metadata={"cached": True}
+                ))
+                self._stream_for_processing(cached_results[-1])
+        return cached_results, pending_tasks
+    
+    def _resolve_journaled_tasks(self, tasks: List[Dict]):
+        """Split a resumed job's tasks into finished/re-attached results and tasks to generate again"""
         
-        # Quota exceeded errors
-        if "quota" in error_lower or "insufficient" in error_lower:
-            return True
+        from ..generators.base import GenerationResult
         
-        # Service unavailable errors
-        if "503" in error_lower or "service unavailable" in error_lower:
-            return True
+        resumed_results = []
+        reattach = []
+        pending_tasks = []
+        for task in tasks:
+            state = self.journal.state(self._task_key(task)) or {}
+            file_path = state.get("file_path")
+            if state.get("state") in (DOWNLOADED, PROCESSED) and file_path and Path(file_path).exists():
+                resumed_results.append(GenerationResult(
+                    success=True,
+                    prompt_id=task["prompt"]["id"],
+                    model=task["model"],
+                    file_path=Path(file_path),
+                    metadata={"resumed": True}
+                ))
+                if state["state"] == DOWNLOADED:
+                    self._stream_for_processing(resumed_results[-1])
+            elif state.get("state") == SUBMITTED and state.get("prediction_id"):
+                reattach.append((task, state))
+            else:
+                pending_tasks.append(task)
+        
+        if reattach:
+            self.logger.info(f"Re-attaching to {len(reattach)} in-flight predictions")
+            with ThreadPoolExecutor(max_workers=min(len(reattach), Config.SCHEDULER_MAX_WORKERS)) as executor:
+                futures = {executor.submit(self._resume_single_image, task, state): task
+                           for task, state in reattach}
+                for future in as_completed(futures):
+                    task = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Failed to resume {self._task_key(task)}: {e}")
+                        result = None
+                    if result is not None and result.success:
+                        resumed_results.append(result)
+                    else:
+                        pending_tasks.append(task)
+        
+        self.logger.info(f"Resumed job {self.journal.job_id}: {len(resumed_results)} images recovered, "
+                         f"{len(pending_tasks)} to generate")
+        return resumed_results, pending_tasks
+    
+    def _resume_single_image(self, task: Dict, state: Dict[str, Any]) -> Any:
+        """Wait for a prediction submitted before the interruption"""
         
-        # Model not found or unavailable
-        if "model not found" in error_lower or "404" in error_lower:
-            return True
+        generator = model_registry.get_generator(task["provider"])
+        if not generator:
+            return None
+        submission = {k: v for k, v in state.items() if k not in ("state", "ts")}
+        result = generator.resume(submission, task["prompt"]["id"], task["model"], Config.RAW_DIR)
+        if result is not None:
+            self._finish_task(task, result)
+        return result
+    
+    @staticmethod
+    def _generation_params(prompt: Dict, generator=None) -> Dict[str, Any]:
+        """Request params for a prompt: its optional "params" plus "seed", without unset values
         
-        return False
+        Params the provider does not accept are dropped. The rest are passed
+        to the generator and are part of the generation cache key.
+        """
+        params = {**prompt.get("params", {}), "seed": prompt.get("seed")}
+        params = {name: value for name, value in params.items() if value is not None}
+        return generator.filter_params(params) if generator else params
+    
+    @staticmethod
+    def _task_key(task: Dict) -> str:
+        return JobJournal.task_key(task["provider"], task["model"], task["prompt"]["id"])
+    
+    def _submission_recorder(self, task: Dict):
+        """Submission listener that journals a task's prediction id"""
+        def record(provider: str, prediction_id: str, details: Dict[str, Any]):
+            self.journal.record(self._task_key(task), SUBMITTED, prediction_id=prediction_id, **details)
+        return record
+    
+    def _finish_task(self, task: Dict, result: Any):
+        """Journal a finished generation and store fresh successes in the cache"""
+        if result.success and result.file_path:
+            self.journal.record(self._task_key(task), DOWNLOADED, file_path=str(result.file_path))
+            if self.cache_writes:
+                generation_cache.store_result(task["provider"], task["model"], task["prompt"]["prompt"],
+                                              Path(result.file_path), params=task["params"])
+            self._stream_for_processing(result)
+        else:
+            self.journal.record(self._task_key(task), FAILED, error=result.error,
+                                status_code=result.status_code)
     
     def _generate_single_image(self, task: Dict) -> Any:
         """Generate a single image"""
+        return self._start_single_image(task).result()
+    
+    def _start_single_image(self, task: Dict) -> Future:
+        """Start generating a single image; the Future resolves after it is journaled and cached"""
         
         prompt = task["prompt"]
         provider = task["provider"]
@@ -272,22 +598,76 @@ class GenerationPipeline:
         if not generator:
             raise Exception(f"Generator not available: {provider}")
         
-        return generator.generate(
-            prompt=prompt["prompt"],
-            prompt_id=prompt["id"],
-            model=model,
-            output_dir=Config.RAW_DIR
-        )
+        token = submission_listener.set(self._submission_recorder(task))
+        try:
+            started = generator.start_generation(
+                prompt=prompt["prompt"],
+                prompt_id=prompt["id"],
+                model=model,
+                output_dir=Config.RAW_DIR,
+                **task["params"]
+            )
+        finally:
+            submission_listener.reset(token)
+        
+        finished = Future()
+        
+        def finish(done: Future):
+            try:
+                result = done.result()
+                self._finish_task(task, result)
+                finished.set_result(result)
+            except Exception as e:
+                finished.set_exception(e)
+        
+        started.add_done_callback(finish)
+        return finished
+    
+    async def _agenerate_single_image(self, task: Dict) -> Any:
+        """Generate a single image on the event loop"""
+        
+        prompt = task["prompt"]
+        provider = task["provider"]
+        model = task["model"]
+        
+        generator = model_registry.get_generator(provider)
+        if not generator:
+            raise Exception(f"Generator not available: {provider}")
+        
+        token = submission_listener.set(self._submission_recorder(task))
+        try:
+            result = await generator.agenerate(
+                prompt=prompt["prompt"],
+                prompt_id=prompt["id"],
+                model=model,
+                output_dir=Config.RAW_DIR,
+                **task["params"]
+            )
+        finally:
+            submission_listener.reset(token)
+        # Cache copies and processing hand-off may block, so keep them off the event loop
+        await asyncio.to_thread(self._finish_task, task, result)
+        return result
     
     def process_images(self, input_dir: Path = None, remove_bg: bool = None, 
-                      create_ico: bool = None) -> Dict[str, List[Path]]:
+                      create_ico: bool = None, input_files: List[Path] = None,
+                      force: bool = False, export_icons: bool = False,
+                      jobs: int = None) -> Dict[str, List[Path]]:
         """
-        Process existing images (background removal, ICO conversion)
+        Process existing images (background removal, ICO conversion, icon export)
+        
+        Inputs whose outputs are up to date in the processing manifest are
+        skipped, so re-running only touches new or changed images.
         
         Args:
             input_dir: Directory containing images to process
             remove_bg: Whether to remove backgrounds
             create_ico: Whether to create ICO files
+            input_files: Process exactly these files instead of globbing input_dir
+            force: Reprocess even when outputs are up to date
+            export_icons: Export ICO, ICNS, favicon, PNG and WebP icon sets
+            jobs: Worker processes for ICO conversion and icon export
+                  (default: PROCESS_JOBS / EXPORT_WORKERS, 0 = one per core)
         
         Returns:
             Dictionary with lists of processed file paths
@@ -297,22 +677,27 @@ class GenerationPipeline:
         remove_bg = remove_bg if remove_bg is not None else Config.REMOVE_BACKGROUND
         create_ico = create_ico if create_ico is not None else Config.CREATE_ICO
         
-        if not input_dir.exists():
-            raise ValueError(f"Input directory does not exist: {input_dir}")
-        
-        # Find image files
-        image_files = []
-        for ext in ['.png', '.jpg', '.jpeg', '.svg']:
-            image_files.extend(input_dir.glob(f"*{ext}"))
+        if input_files is not None:
+            image_files = [Path(f) for f in input_files]
+        else:
+            if not input_dir.exists():
+                raise ValueError(f"Input directory does not exist: {input_dir}")
+            
+            # Find image files
+            image_files = []
+            for ext in ['.png', '.jpg', '.jpeg', '.svg']:
+                image_files.extend(input_dir.glob(f"*{ext}"))
         
         if not image_files:
             self.logger.warning(f"No image files found in {input_dir}")
-            return {"processed": [], "icons": []}
+            return {"processed": [], "icons": [], "exports": [], "skipped": 0}
         
         self.logger.info(f"Processing {len(image_files)} images")
         
         processed_files = []
         ico_files = []
+        export_dirs = []
+        skipped = 0
         
         # Background removal
         if remove_bg and self.background_remover:
@@ -320,7 +705,12 @@ class GenerationPipeline:
             # Filter out SVG files for background removal
             bg_removal_files = [f for f in image_files if f.suffix.lower() != '.svg']
             if bg_removal_files:
-                processed_files = self.background_remover.process_batch(bg_removal_files, Config.PROCESSED_DIR)
+                processed_files, stage_skipped = self._run_incremental(
+                    bg_removal_files, "remove_bg", self._bg_recipe(), force,
+                    lambda files: self.background_remover.process_batch(files, Config.PROCESSED_DIR),
+                    lambda f: Config.PROCESSED_DIR / f"{f.stem}_nobg.png"
+                )
+                skipped += stage_skipped
                 source_files_for_ico = processed_files
             else:
                 source_files_for_ico = image_files
@@ -333,44 +723,117 @@ class GenerationPipeline:
             # Filter out SVG files for ICO conversion
             ico_conversion_files = [f for f in source_files_for_ico if f.suffix.lower() != '.svg']
             if ico_conversion_files:
-                ico_files = self.ico_converter.convert_batch(ico_conversion_files, Config.ICONS_DIR)
-        
-        self.logger.info(f"Processing complete: {len(processed_files)} processed, {len(ico_files)} ICO files")
+                ico_files, stage_skipped = self._run_incremental(
+                    ico_conversion_files, "ico", self._ico_recipe(), force,
+                    lambda files: self.ico_converter.convert_batch(files, Config.ICONS_DIR, jobs=jobs),
+                    lambda f: Config.ICONS_DIR / f"{f.stem}.ico"
+                )
+                skipped += stage_skipped
+        
+        # Multi-format icon export (one decode per image, images in parallel)
+        if export_icons and self.icon_exporter:
+            self.logger.info("Exporting icon sets...")
+            export_source_files = [f for f in source_files_for_ico if f.suffix.lower() != '.svg']
+            if export_source_files:
+                export_dirs, stage_skipped = self._run_incremental(
+                    export_source_files, "export", self._export_recipe(), force,
+                    lambda files: self.icon_exporter.export_batch(files, Config.EXPORTS_DIR, jobs=jobs),
+                    lambda f: Config.EXPORTS_DIR / f.stem
+                )
+                skipped += stage_skipped
+        
+        processing_manifest.save()
+        self.logger.info(f"Processing complete: {len(processed_files)} processed, {len(ico_files)} ICO files, "
+                         f"{len(export_dirs)} icon sets ({skipped} up-to-date steps skipped)")
         
         return {
             "processed": processed_files,
-            "icons": ico_files
+            "icons": ico_files,
+            "exports": export_dirs,
+            "skipped": skipped
         }
     
+    def _run_incremental(self, input_files: List[Path], stage: str, recipe: str, force: bool,
+                         run_batch, output_for) -> tuple:
+        """Run a batch stage on stale inputs only; returns (all outputs, number skipped)"""
+        
+        outputs = []
+        stale = []
+        for input_file in input_files:
+            fresh_output = None if force else processing_manifest.up_to_date(input_file, stage, recipe)
+            if fresh_output is not None:
+                outputs.append(fresh_output)
+            else:
+                stale.append(input_file)
+        
+        skipped = len(input_files) - len(stale)
+        if skipped:
+            self.logger.info(f"{stage}: {skipped} up to date, {len(stale)} to process")
+        
+        if stale:
+            produced = set(run_batch(stale))
+            for input_file in stale:
+                output_file = output_for(input_file)
+                if output_file in produced:
+                    processing_manifest.record(input_file, stage, recipe, output_file)
+                    outputs.append(output_file)
+        
+        return outputs, skipped
+    
+    def _bg_recipe(self) -> str:
+        fast_path = ":fast" if self.background_remover.fast_path else ""
+        return f"rembg:{self.background_remover.model_name}{fast_path}"
+    
+    def _ico_recipe(self) -> str:
+        encoding = "" if self.ico_converter.encoding == "standard" else f":{self.ico_converter.encoding}"
+        return f"ico:pyramid{encoding}:{','.join(str(size) for size in self.ico_converter.ico_sizes)}"
+    
+    def _export_recipe(self) -> str:
+        exporter = self.icon_exporter
+        return (f"export:{','.join(exporter.formats)}:{','.join(str(size) for size in exporter.ico_sizes)}"
+                f":webp{exporter.webp_quality}:{exporter.touch_background}:{exporter.ico_encoding}")
+    
     def run_complete_pipeline(self, models: List[str] = None, prompts: List[str] = None,
-                             remove_bg: bool = True, create_ico: bool = True) -> Dict[str, Any]:
+                             remove_bg: bool = True, create_ico: bool = True,
+                             scheduler_mode: str = None, use_cache: bool = None,
+                             force: bool = False, journal: JobJournal = None) -> Dict[str, Any]:
         """
         Run the complete pipeline: generate + process
         
+        Each successfully generated image is streamed into the background
+        removal and ICO stages as soon as it is saved, so CPU processing
+        overlaps with the remaining network-bound generations.
+        
         Returns:
             Complete results including generation stats and processed files
         """
         
         self.logger.info("Starting complete pipeline...")
         
-        # Generation phase
-        generation_stats = self.generate_images(models, prompts)
-        
-        # Get successful generation files
-        successful_files = []
-        for result in generation_stats["results"]:
-            if result.success and result.file_path:
-                successful_files.append(result.file_path)
-        
-        # Processing phase
-        if successful_files:
-            processing_results = self.process_images(
-                input_dir=Config.RAW_DIR,
-                remove_bg=remove_bg,
-                create_ico=create_ico
+        self.stream = self._create_processing_stream(remove_bg, create_ico).start()
+        try:
+            generation_stats = self.generate_images(
+                models, prompts, scheduler_mode=scheduler_mode, use_cache=use_cache, force=force,
+                journal=journal, job_options={
+                    "process": True, "remove_bg": remove_bg, "create_ico": create_ico,
+                    "bg_model": self.background_remover.model_name if self.background_remover else None
+                }
             )
-        else:
-            processing_results = {"processed": [], "icons": []}
+        finally:
+            stream, self.stream = self.stream, None
+            outputs = stream.close()
+            processing_manifest.save()
+            mask_cache.save()
+        
+        processing_results = {
+            "processed": outputs.get("processed", []),
+            "icons": outputs.get("icons", []),
+            "stream": stream.stats()
+        }
+        self.logger.info(f"Processing complete: {len(processing_results['processed'])} processed, "
+                         f"{len(processing_results['icons'])} ICO files")
+        
+        self._journal_processed(processing_results)
         
         # Combine results
         complete_results = {
@@ -381,6 +844,7 @@ class GenerationPipeline:
                 "images_processed": len(processing_results["processed"]),
                 "ico_files_created": len(processing_results["icons"]),
                 "total_time": generation_stats["total_time"],
+                "processing_drain_time": stream.drain_time,
                 "failed_models": generation_stats["failed_models"],
                 "tasks_skipped": generation_stats["skipped"]
             }
@@ -389,6 +853,90 @@ class GenerationPipeline:
         self.logger.info("Complete pipeline finished")
         return complete_results
     
+    def resume_job(self, job_id: str) -> Dict[str, Any]:
+        """Resume an interrupted job from its journal
+        
+        Finished images are reused, predictions that were still running are
+        re-attached instead of submitted again, and everything else is
+        generated (and processed, if the job included processing) as before.
+        """
+        
+        journal = JobJournal.open(job_id)
+        options = journal.options
+        self.logger.info(f"Resuming job {job_id}: {journal.summary()}")
+        
+        common = dict(
+            models=options.get("models"),
+            prompts=options.get("prompts"),
+            scheduler_mode=options.get("scheduler_mode"),
+            use_cache=options.get("use_cache"),
+            force=options.get("force", False),
+            journal=journal
+        )
+        if options.get("process"):
+            if options.get("bg_model") and self.background_remover:
+                self.background_remover = processor_service.background_remover_for(options["bg_model"])
+            return self.run_complete_pipeline(remove_bg=options.get("remove_bg", True),
+                                              create_ico=options.get("create_ico", True), **common)
+        return self.generate_images(**common)
+    
+    def _create_processing_stream(self, remove_bg: bool, create_ico: bool) -> StreamingPipeline:
+        """Background removal -> ICO stages, mirroring what process_images does in batch"""
+        
+        stages = []
+        if remove_bg and self.background_remover:
+            # Enough stage threads to keep every worker process busy
+            workers = max(Config.STREAM_BG_WORKERS, self.background_remover.workers)
+            stages.append(Stage("processed", self._remove_background, workers=workers))
+        if create_ico and self.ico_converter:
+            stages.append(Stage("icons", self._convert_to_ico, workers=Config.STREAM_ICO_WORKERS))
+        return StreamingPipeline(stages)
+    
+    def _remove_background(self, input_path: Path) -> Optional[Path]:
+        recipe = self._bg_recipe()
+        output_path = processing_manifest.up_to_date(input_path, "remove_bg", recipe)
+        if output_path is not None:
+            return output_path
+        output_path = Config.PROCESSED_DIR / f"{input_path.stem}_nobg.png"
+        if not self.background_remover.process_image(input_path, output_path):
+            return None
+        processing_manifest.record(input_path, "remove_bg", recipe, output_path)
+        return output_path
+    
+    def _convert_to_ico(self, input_path: Path) -> Optional[Path]:
+        recipe = self._ico_recipe()
+        output_path = processing_manifest.up_to_date(input_path, "ico", recipe)
+        if output_path is not None:
+            return output_path
+        output_path = Config.ICONS_DIR / f"{input_path.stem}.ico"
+        if not self.ico_converter.convert_image(input_path, output_path):
+            return None
+        processing_manifest.record(input_path, "ico", recipe, output_path)
+        return output_path
+    
+    def _stream_for_processing(self, result: Any):
+        """Hand a generated image to the processing stream (SVGs are not processed)"""
+        if self.stream is None or not (result.success and result.file_path):
+            return
+        file_path = Path(result.file_path)
+        if file_path.suffix.lower() != ".svg":
+            self.stream.submit(file_path)
+    
+    def _journal_processed(self, processing_results: Dict[str, List[Path]]):
+        """Mark downloaded images whose processed outputs exist as processed in the job journal"""
+        
+        if self.journal is None:
+            return
+        output_stems = {Path(p).stem for p in processing_results["processed"] + processing_results["icons"]}
+        for task, state in list(self.journal.states.items()):
+            file_path = state.get("file_path")
+            if state.get("state") != DOWNLOADED or not file_path:
+                continue
+            # Outputs are named <stem>_nobg.png, <stem>.ico or <stem>_nobg.ico
+            stem = Path(file_path).stem
+            if stem in output_stems or f"{stem}_nobg" in output_stems:
+                self.journal.record(task, PROCESSED, file_path=file_path)
+    
     def _update_detailed_progress(self, task, total_tasks, completed, result):
         """Update progress with detailed prompt/model information"""
         prompt_id = task["prompt"]["id"]
@@ -410,14 +958,16 @@ class GenerationPipeline:
         if result.success and result.file_path:
             latest_image = Path(result.file_path).name
         
+        # Cache hits were counted before execution started
         write_progress(
-            total_tasks=total_tasks,
-            completed=completed,
+            total_tasks=total_tasks + self.cached_count,
+            completed=completed + self.cached_count,
             status="running",
             current_prompt=prompt_id,
             prompt_progress=prompt_progress,
             current_model=model,
             model_progress=model_progress,
             endpoint=provider,
-            latest_image=latest_image
+            latest_image=latest_image,
+            canaries=self.canaries
         )
\ No newline at end of file
@@ -0,0 +1,271 @@
+# src/core/scheduler.py
+"""
+Global cross-model scheduler for generation tasks
+"""
+
+import logging
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .config import Config, PROVIDER_CONCURRENCY
+from .circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from ..generators.base import GenerationResult
+
+class _ModelGroup:
+    """Pending tasks and in-flight bookkeeping for one provider:model"""
+
+    def __init__(self, key: str, provider: str, breaker: CircuitBreaker):
+        self.key = key
+        self.provider = provider
+        self.breaker = breaker
+        self.pending: Deque[Dict] = deque()
+        self.in_flight = 0
+        self.probe_done = False
+        self.skipped = 0
+        self.probe_duration = 0.0
+        self.durations: List[float] = []
+
+class GenerationScheduler:
+    """Run every provider:model group at once under per-provider and per-model caps
+
+    Each model is guarded by a circuit breaker: its first task is a canary
+    that gates the rest, a run of transient failures pauses the model until
+    a timed probe succeeds, and a permanent failure drops its remaining tasks.
+    Canaries and probes run on their own pool outside the worker and provider
+    caps, so every model's canary starts at once when a job begins.
+    Other models keep running in the meantime, so a slow cold boot or a brief
+    outage on one provider no longer blocks everything behind it.
+
+    ``execute`` may return a Future instead of a result (a submitted
+    prediction finishing from the poller). Its worker thread and worker slot
+    are released at once; the task stays in flight against its provider and
+    model caps until the Future resolves.
+    """
+
+    def __init__(self, max_workers: int = None, provider_limits: Dict[str, int] = None,
+                 probe_workers: int = None):
+        self.max_workers = max_workers or Config.SCHEDULER_MAX_WORKERS
+        self.provider_limits = provider_limits if provider_limits is not None else PROVIDER_CONCURRENCY
+        self.probe_workers = probe_workers or Config.CANARY_MAX_WORKERS
+        self.logger = logging.getLogger("scheduler")
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._probe_executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the shared worker pool (reused across runs)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="generation")
+        return self._executor
+
+    def _get_probe_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the canary/probe pool (threads are only started on demand)"""
+        if self._probe_executor is None:
+            self._probe_executor = ThreadPoolExecutor(max_workers=self.probe_workers,
+                                                      thread_name_prefix="canary")
+        return self._probe_executor
+
+    def shutdown(self):
+        """Stop the worker pools"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._probe_executor is not None:
+            self._probe_executor.shutdown(wait=True)
+            self._probe_executor = None
+
+    def _provider_limit(self, provider: str) -> int:
+        return self.provider_limits.get(provider, Config.MAX_CONCURRENT_PER_PROVIDER)
+
+    def run(self, tasks: List[Dict], execute: Callable[[Dict], Any],
+            model_limit: int = None,
+            breakers: CircuitBreakerRegistry = None,
+            on_result: Callable[[Dict, Any], None] = None,
+            on_canary: Callable[[Dict, Optional[Any], float], None] = None) -> Dict[str, Any]:
+        """
+        Execute tasks across all models concurrently
+
+        Args:
+            tasks: Generation task dicts (must contain "provider", "model" and "prompt")
+            execute: Callable run in a worker thread for each task; returns a result
+                or a Future of one
+            model_limit: Max in-flight tasks per provider:model
+            breakers: Circuit breakers to use (a fresh registry per run by default)
+            on_result: Called from the scheduling thread for every finished task
+            on_canary: Called with (task, None, 0.0) when a model's canary starts and
+                with (task, result, duration) when it returns
+
+        Returns:
+            Dictionary with results, failed models and timing statistics
+        """
+
+        start_time = time.time()
+        model_limit = model_limit or Config.MAX_WORKERS
+        executor = self._get_executor()
+        probe_executor = self._get_probe_executor()
+        breakers = breakers or CircuitBreakerRegistry()
+
+        groups: "OrderedDict[str, _ModelGroup]" = OrderedDict()
+        for task in tasks:
+            key = f"{task['provider']}:{task['model']}"
+            if key not in groups:
+                groups[key] = _ModelGroup(key, task["provider"], breakers.get(key))
+            groups[key].pending.append(task)
+
+        # Worker and provider slots only count regular tasks, not canaries/probes;
+        # worker slots also skip deferred tasks, which hold no thread
+        provider_in_flight: Dict[str, int] = defaultdict(int)
+        in_flight: Dict[Future, tuple] = {}
+        results = []
+
+        def admit(group: _ModelGroup) -> Optional[bool]:
+            """None if the group cannot dispatch now, otherwise whether it is a probe"""
+            if not group.pending or group.in_flight >= model_limit:
+                return None
+            if (workers_busy() < self.max_workers
+                    and provider_in_flight[group.provider] < self._provider_limit(group.provider)):
+                return group.breaker.admit()
+            if group.breaker.state != CircuitBreaker.CLOSED:
+                # No free slot, but a probe may still go out on the probe pool
+                return group.breaker.admit() or None
+            return None
+
+        def workers_busy() -> int:
+            return sum(1 for _, _, probe, deferred in in_flight.values() if not probe and not deferred)
+
+        def dispatch():
+            # Round-robin across models so every group gets a fair share of slots
+            progressed = True
+            while progressed:
+                progressed = False
+                for group in groups.values():
+                    probe = admit(group)
+                    if probe is None:
+                        continue
+                    task = group.pending.popleft()
+                    group.in_flight += 1
+                    if probe:
+                        if not group.probe_done and on_canary:
+                            on_canary(task, None, 0.0)
+                        future = probe_executor.submit(self._timed, execute, task)
+                    else:
+                        provider_in_flight[group.provider] += 1
+                        future = executor.submit(self._timed, execute, task)
+                    in_flight[future] = (group, task, probe, False)
+                    progressed = True
+
+        def drop_dead_groups():
+            for group in groups.values():
+                if group.breaker.dead and group.pending:
+                    group.skipped += len(group.pending)
+                    group.pending.clear()
+                    self.logger.warning(f"Model {group.key} failed with: {group.breaker.last_error}")
+                    self.logger.warning(f"Skipping remaining {group.skipped} tasks for this model")
+
+        def next_retry() -> Optional[float]:
+            """Seconds until an open breaker with pending tasks allows a probe"""
+            delays = [group.breaker.retry_in() for group in groups.values() if group.pending]
+            delays = [delay for delay in delays if delay]
+            return min(delays) if delays else None
+
+        self.logger.info(f"Scheduling {len(tasks)} tasks across {len(groups)} models "
+                         f"(workers={self.max_workers}, per-model={model_limit})")
+
+        dispatch()
+        while in_flight or any(group.pending for group in groups.values()):
+            if not in_flight:
+                # Everything left is waiting for a breaker cooldown
+                time.sleep(next_retry() or 0.05)
+                dispatch()
+                continue
+
+            done, _ = wait(list(in_flight), timeout=next_retry(), return_when=FIRST_COMPLETED)
+            for future in done:
+                group, task, probe, _ = in_flight.pop(future)
+
+                try:
+                    result, duration = future.result()
+                    if isinstance(result, Future):
+                        # Submitted; keep the task in flight without its worker thread
+                        in_flight[result] = (group, task, probe, True)
+                        continue
+                except Exception as e:
+                    self.logger.error(f"Task execution failed: {group.key} {task['prompt']['id']} - {e}")
+                    result = GenerationResult(
+                        success=False,
+                        prompt_id=task['prompt']['id'],
+                        model=group.key,
+                        error=str(e)
+                    )
+                    duration = 0.0
+
+                group.in_flight -= 1
+                if not probe:
+                    provider_in_flight[group.provider] -= 1
+
+                if not group.probe_done:
+                    # The breaker starts half-open, so the first task back is the canary
+                    group.probe_done = True
+                    group.probe_duration = duration
+                    if on_canary:
+                        on_canary(task, result, duration)
+                else:
+                    group.durations.append(duration)
+
+                results.append(result)
+                if on_result:
+                    on_result(task, result)
+
+                group.breaker.record(probe, result.success,
+                                     getattr(result, "status_code", None), result.error)
+
+            drop_dead_groups()
+            dispatch()
+
+        wall_time = time.time() - start_time
+        sequential_time = self._estimate_sequential_time(groups.values(), model_limit)
+
+        return {
+            "results": results,
+            "failed_models": [g.key for g in groups.values() if g.breaker.dead],
+            "wall_time": wall_time,
+            "estimated_sequential_time": sequential_time,
+            "time_saved": max(0.0, sequential_time - wall_time)
+        }
+
+    @staticmethod
+    def _timed(execute: Callable[[Dict], Any], task: Dict) -> tuple:
+        """(result, duration), or (Future of (result, duration), None) when execute defers"""
+        start = time.time()
+        result = execute(task)
+        if not isinstance(result, Future):
+            return result, time.time() - start
+
+        timed = Future()
+
+        def finish(done: Future):
+            try:
+                timed.set_result((done.result(), time.time() - start))
+            except Exception as e:
+                timed.set_exception(e)
+
+        result.add_done_callback(finish)
+        return timed, None
+
+    @staticmethod
+    def _estimate_sequential_time(groups, workers: int) -> float:
+        """Estimate wall time of the old one-model-at-a-time mode from observed durations
+
+        Each group ran its probe serially, then the remaining tasks on a pool of
+        ``workers`` threads, so a group costs at least its longest task and at
+        least its total work spread over the pool.
+        """
+        total = 0.0
+        for group in groups:
+            total += group.probe_duration
+            if group.durations:
+                lanes = min(workers, len(group.durations))
+                total += max(max(group.durations), sum(group.durations) / lanes)
+        return total
@@ -0,0 +1,130 @@
+# src/core/streaming.py
+"""
+Staged streaming processing connected by bounded queues
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import Config
+
+_DONE = object()
+
+class Stage:
+    """One processing step: func(item) returns the output for the next stage, or None on failure"""
+
+    def __init__(self, name: str, func: Callable[[Any], Optional[Any]], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.completed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+
+class StreamingPipeline:
+    """Run items through a chain of stages while they are still being produced
+
+    Each stage has its own worker threads and a bounded input queue, so a
+    slow stage applies back-pressure to the one before it (and ultimately
+    to submit()) instead of buffering without limit. Successful outputs of
+    every stage are collected under the stage name.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = None):
+        self.stages = stages
+        self.queue_size = queue_size or Config.STREAM_QUEUE_SIZE
+        self.logger = logging.getLogger("streaming")
+        self.outputs: Dict[str, List[Any]] = {stage.name: [] for stage in stages}
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        self._threads: List[threading.Thread] = []
+        self._remaining = [stage.workers for stage in stages]
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._closed_at: Optional[float] = None
+        self.drain_time: Optional[float] = None
+
+    def start(self) -> "StreamingPipeline":
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(index,),
+                                          name=f"stream-{stage.name}-{worker}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, item: Any):
+        """Feed an item to the first stage (blocks while its queue is full)"""
+        if not self.stages:
+            return
+        with self._lock:
+            self._submitted += 1
+        self._queues[0].put(item)
+
+    def close(self) -> Dict[str, List[Any]]:
+        """Signal end of input, wait for every stage to drain and return the outputs"""
+        self._closed_at = time.time()
+        if self.stages:
+            for _ in range(self.stages[0].workers):
+                self._queues[0].put(_DONE)
+        for thread in self._threads:
+            thread.join()
+        self.drain_time = time.time() - self._closed_at
+        self.logger.info(f"Streaming processing drained {self.drain_time:.1f}s after input closed "
+                         f"({self._submitted} items submitted)")
+        return self.outputs
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        next_queue = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = self._queues[index].get()
+            if item is _DONE:
+                break
+
+            start = time.time()
+            try:
+                output = stage.func(item)
+            except Exception as e:
+                self.logger.error(f"Stage {stage.name} failed on {item}: {e}")
+                output = None
+            elapsed = time.time() - start
+
+            with self._lock:
+                stage.busy_time += elapsed
+                if output is None:
+                    stage.failed += 1
+                    continue
+                stage.completed += 1
+                self.outputs[stage.name].append(output)
+
+            if next_queue is not None:
+                next_queue.put(output)
+
+        # The last worker of a stage to finish closes the next stage
+        with self._lock:
+            self._remaining[index] -= 1
+            last = self._remaining[index] == 0
+        if last and next_queue is not None:
+            for _ in range(self.stages[index + 1].workers):
+                next_queue.put(_DONE)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage counts and busy time, plus how long processing ran past the end of input"""
+        with self._lock:
+            return {
+                "submitted": self._submitted,
+                "stages": {
+                    stage.name: {
+                        "completed": stage.completed,
+                        "failed": stage.failed,
+                        "workers": stage.workers,
+                        "busy_time": round(stage.busy_time, 2)
+                    }
+                    for stage in self.stages
+                },
+                "drain_time": round(self.drain_time, 2) if self.drain_time is not None else None
+            }
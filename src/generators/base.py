@@ -4,20 +4,48 @@ Base generator class for all image generation APIs
 """
 
 import time
+import asyncio
+import contextvars
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 import logging
+import httpx
 
 from ..utils.naming import generate_filename
-from ..utils.file_utils import download_image
+from ..utils.file_utils import download_image, adownload_image
+from ..utils.http_utils import get_session
+from ..utils.rate_limiter import rate_limiters, parse_retry_after
+from ..core.config import Config
+from .poller import completed
+
+# Set by the pipeline around a generate() call to learn the provider's
+# prediction id as soon as it is submitted: listener(provider, prediction_id, details)
+submission_listener: contextvars.ContextVar[Optional[Callable[[str, str, Dict[str, Any]], None]]] = \
+    contextvars.ContextVar("submission_listener", default=None)
+
+class ProviderAPIError(Exception):
+    """Provider API returned an error status"""
+    
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"API error {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+    
+    @classmethod
+    def from_response(cls, response) -> "ProviderAPIError":
+        """Build from a requests/httpx response"""
+        return cls(response.status_code, response.text,
+                   parse_retry_after(response.headers.get("Retry-After")))
 
 class GenerationResult:
     """Result of an image generation attempt"""
     
     def __init__(self, success: bool, prompt_id: str, model: str, 
                  file_path: Optional[Path] = None, error: Optional[str] = None,
-                 duration: float = 0.0, metadata: Optional[Dict] = None):
+                 duration: float = 0.0, metadata: Optional[Dict] = None,
+                 status_code: Optional[int] = None):
         self.success = success
         self.prompt_id = prompt_id
         self.model = model
@@ -25,6 +53,7 @@ class GenerationResult:
         self.error = error
         self.duration = duration
         self.metadata = metadata or {}
+        self.status_code = status_code
     
     def __repr__(self):
         status = "SUCCESS" if self.success else "FAILED"
@@ -33,10 +62,16 @@ class GenerationResult:
 class BaseGenerator(ABC):
     """Abstract base class for all image generators"""
     
+    # Request params (prompt "params"/"seed") the provider API accepts; None passes everything on
+    SUPPORTED_PARAMS: Optional[frozenset] = None
+    
     def __init__(self, api_key: str, provider_name: str):
         self.api_key = api_key
         self.provider_name = provider_name
         self.logger = logging.getLogger(f"generator.{provider_name}")
+        self.session = get_session(provider_name)
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop = None
         
         if not api_key:
             raise ValueError(f"API key required for {provider_name}")
@@ -47,6 +82,25 @@ class BaseGenerator(ABC):
         """Generate image and save to output_dir"""
         pass
     
+    async def agenerate(self, prompt: str, prompt_id: str, model: str,
+                        output_dir: Path, **kwargs) -> GenerationResult:
+        """Generate image without blocking the event loop
+        
+        Providers override this with a native async implementation; the default
+        falls back to running the sync generate() in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate, prompt, prompt_id, model, output_dir, **kwargs)
+    
+    def start_generation(self, prompt: str, prompt_id: str, model: str,
+                         output_dir: Path, **kwargs) -> Future:
+        """Start a generation and return a Future of its GenerationResult
+        
+        Providers with asynchronous predictions override this to return as
+        soon as the prediction is submitted, finishing it from the poller;
+        the default runs generate() to completion first.
+        """
+        return completed(self.generate(prompt, prompt_id, model, output_dir, **kwargs))
+    
     @abstractmethod
     def get_available_models(self) -> List[str]:
         """Get list of available models for this provider"""
@@ -57,6 +111,31 @@ class BaseGenerator(ABC):
         """Check if model is valid for this provider"""
         pass
     
+    def filter_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop request params the provider API does not accept"""
+        if self.SUPPORTED_PARAMS is None:
+            return dict(params)
+        dropped = sorted(set(params) - self.SUPPORTED_PARAMS)
+        if dropped:
+            self.logger.debug(f"[{self.provider_name}] Ignoring unsupported params: {', '.join(dropped)}")
+        return {name: value for name, value in params.items() if name in self.SUPPORTED_PARAMS}
+    
+    def resume(self, submission: Dict[str, Any], prompt_id: str, model: str,
+               output_dir: Path) -> Optional[GenerationResult]:
+        """Re-attach to a prediction submitted by an interrupted run
+        
+        ``submission`` holds the prediction id and details reported through
+        _notify_submitted. Returns None for providers without resumable
+        predictions, in which case the task is generated again.
+        """
+        return None
+    
+    def _notify_submitted(self, prediction_id: str, **details):
+        """Report a submitted prediction to the active submission listener, if any"""
+        listener = submission_listener.get()
+        if listener is not None:
+            listener(self.provider_name, prediction_id, details)
+    
     def _download_and_save(self, image_url: str, prompt_id: str, model: str, 
                           output_dir: Path, extension: str = "png") -> Optional[Path]:
         """Download image from URL and save with consistent naming"""
@@ -64,7 +143,21 @@ class BaseGenerator(ABC):
         filename = generate_filename(prompt_id, model, extension)
         output_path = output_dir / filename
         
-        if download_image(image_url, output_path):
+        if download_image(image_url, output_path, session=self.session):
+            self.logger.info(f"Saved: {filename} ({output_path.stat().st_size / 1024:.1f} KB)")
+            return output_path
+        else:
+            self.logger.error(f"Failed to download image for {prompt_id}")
+            return None
+    
+    async def _adownload_and_save(self, image_url: str, prompt_id: str, model: str,
+                                  output_dir: Path, extension: str = "png") -> Optional[Path]:
+        """Async variant of _download_and_save"""
+        
+        filename = generate_filename(prompt_id, model, extension)
+        output_path = output_dir / filename
+        
+        if await adownload_image(image_url, output_path, self._get_async_client()):
             self.logger.info(f"Saved: {filename} ({output_path.stat().st_size / 1024:.1f} KB)")
             return output_path
         else:
@@ -73,50 +166,209 @@ class BaseGenerator(ABC):
     
     def _handle_generation(self, prompt: str, prompt_id: str, model: str,
                           output_dir: Path, generation_func, **kwargs) -> GenerationResult:
-        """Common generation handling with timing and error management"""
+        """Common generation handling with timing, rate limiting and error management"""
         
         start_time = time.time()
+        limits = rate_limiters.get(self.provider_name, model)
         
         try:
             self.logger.info(f"[{self.provider_name}] Generating {prompt_id} with {model}")
             
-            # Call the specific generation function
-            result = generation_func(prompt, prompt_id, model, output_dir, **kwargs)
-            
-            duration = time.time() - start_time
+            attempt = 0
+            while True:
+                limits.acquire()
+                try:
+                    # Call the specific generation function
+                    result = generation_func(prompt, prompt_id, model, output_dir, **kwargs)
+                    limits.on_success()
+                    break
+                except Exception as e:
+                    retry_after = self._rate_limit_backoff(e, attempt)
+                    if retry_after is None:
+                        raise
+                    limits.throttle(retry_after)
+                    attempt += 1
+                finally:
+                    limits.release()
             
-            if result:
-                self.logger.info(f"[{self.provider_name}] SUCCESS: {model} | {duration:.2f}s")
-                return GenerationResult(
-                    success=True,
-                    prompt_id=prompt_id, 
-                    model=model,
-                    file_path=result,
-                    duration=duration
-                )
-            else:
-                self.logger.error(f"[{self.provider_name}] FAILED: {model}")
-                return GenerationResult(
-                    success=False,
-                    prompt_id=prompt_id,
-                    model=model, 
-                    error="Generation returned no result",
-                    duration=duration
-                )
+            return self._build_result(result, prompt_id, model, time.time() - start_time)
                 
         except Exception as e:
-            duration = time.time() - start_time
-            error_msg = str(e)
-            self.logger.error(f"[{self.provider_name}] ERROR: {model} | {error_msg}")
+            return self._build_error_result(e, prompt_id, model, time.time() - start_time)
+    
+    def _start_handle_generation(self, prompt: str, prompt_id: str, model: str,
+                                 output_dir: Path, submit_func, **kwargs) -> Future:
+        """Deferred variant of _handle_generation for submit functions returning a Future of the saved file
+        
+        Submission is rate limited and retried on 429 as usual; the limiter
+        slot is released and the GenerationResult built when the returned
+        Future resolves, without a thread waiting for it.
+        """
+        
+        start_time = time.time()
+        limits = rate_limiters.get(self.provider_name, model)
+        
+        try:
+            self.logger.info(f"[{self.provider_name}] Generating {prompt_id} with {model}")
+            
+            attempt = 0
+            while True:
+                limits.acquire()
+                try:
+                    pending = submit_func(prompt, prompt_id, model, output_dir, **kwargs)
+                    break
+                except Exception as e:
+                    limits.release()
+                    retry_after = self._rate_limit_backoff(e, attempt)
+                    if retry_after is None:
+                        raise
+                    limits.throttle(retry_after)
+                    attempt += 1
+        
+        except Exception as e:
+            return completed(self._build_error_result(e, prompt_id, model, time.time() - start_time))
+        
+        result = Future()
+        
+        def finish(done: Future):
+            limits.release()
+            try:
+                file_path = done.result()
+                limits.on_success()
+                result.set_result(self._build_result(file_path, prompt_id, model, time.time() - start_time))
+            except Exception as e:
+                result.set_result(self._build_error_result(e, prompt_id, model, time.time() - start_time))
+        
+        pending.add_done_callback(finish)
+        return result
+    
+    def _handle_reattach(self, prompt_id: str, model: str, wait_func) -> GenerationResult:
+        """Timing and error handling for re-attaching to an already submitted prediction
+        
+        Nothing is submitted, so no rate limiter slot is taken and limiter
+        state is left alone.
+        """
+        
+        start_time = time.time()
+        try:
+            self.logger.info(f"[{self.provider_name}] Re-attaching {prompt_id} with {model}")
+            return self._build_result(wait_func(), prompt_id, model, time.time() - start_time)
+        except Exception as e:
+            return self._build_error_result(e, prompt_id, model, time.time() - start_time)
+    
+    async def _ahandle_generation(self, prompt: str, prompt_id: str, model: str,
+                                  output_dir: Path, generation_func, **kwargs) -> GenerationResult:
+        """Async variant of _handle_generation for coroutine generation functions"""
+        
+        start_time = time.time()
+        limits = rate_limiters.get(self.provider_name, model)
+        
+        try:
+            self.logger.info(f"[{self.provider_name}] Generating {prompt_id} with {model} (async)")
             
+            attempt = 0
+            while True:
+                await limits.aacquire()
+                try:
+                    result = await generation_func(prompt, prompt_id, model, output_dir, **kwargs)
+                    limits.on_success()
+                    break
+                except Exception as e:
+                    retry_after = self._rate_limit_backoff(e, attempt)
+                    if retry_after is None:
+                        raise
+                    limits.throttle(retry_after)
+                    attempt += 1
+                finally:
+                    limits.release()
+            
+            return self._build_result(result, prompt_id, model, time.time() - start_time)
+                
+        except Exception as e:
+            return self._build_error_result(e, prompt_id, model, time.time() - start_time)
+    
+    def _rate_limit_backoff(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited call, or None to give up"""
+        if self._error_status(error) != 429 or attempt >= Config.RATE_LIMIT_RETRIES:
+            return None
+        
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None:
+            response = getattr(error, "response", None)
+            headers = getattr(response, "headers", None) or {}
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+        
+        delay = retry_after if retry_after is not None else 2.0 * (2 ** attempt)
+        self.logger.warning(f"[{self.provider_name}] Rate limited, retrying in {delay:.1f}s "
+                            f"(attempt {attempt + 1}/{Config.RATE_LIMIT_RETRIES})")
+        return delay
+    
+    @staticmethod
+    def _error_status(error: Exception) -> Optional[int]:
+        """HTTP status carried by a generation error (ProviderAPIError or SDK errors)"""
+        status = getattr(error, "status_code", None)
+        if status == 429 and getattr(error, "code", None) == "insufficient_quota":
+            return 402  # OpenAI reports an exhausted quota as a 429; it will not recover by waiting
+        return status if isinstance(status, int) else None
+    
+    def _build_result(self, result: Optional[Path], prompt_id: str, model: str,
+                      duration: float) -> GenerationResult:
+        """Turn the output of a generation function into a GenerationResult"""
+        
+        if result:
+            self.logger.info(f"[{self.provider_name}] SUCCESS: {model} | {duration:.2f}s")
+            return GenerationResult(
+                success=True,
+                prompt_id=prompt_id, 
+                model=model,
+                file_path=result,
+                duration=duration
+            )
+        else:
+            self.logger.error(f"[{self.provider_name}] FAILED: {model}")
             return GenerationResult(
                 success=False,
                 prompt_id=prompt_id,
-                model=model,
-                error=error_msg,
+                model=model, 
+                error="Generation returned no result",
                 duration=duration
             )
     
+    def _build_error_result(self, error: Exception, prompt_id: str, model: str,
+                            duration: float) -> GenerationResult:
+        """Turn an exception raised during generation into a failed GenerationResult"""
+        
+        error_msg = str(error)
+        self.logger.error(f"[{self.provider_name}] ERROR: {model} | {error_msg}")
+        
+        return GenerationResult(
+            success=False,
+            prompt_id=prompt_id,
+            model=model,
+            error=error_msg,
+            duration=duration,
+            status_code=self._error_status(error)
+        )
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the async HTTP client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                timeout=Config.TIMEOUT_SECONDS,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=Config.ASYNC_MAX_IN_FLIGHT)
+            )
+            self._async_client_loop = loop
+        return self._async_client
+    
+    async def aclose(self):
+        """Close the async HTTP client (call before the event loop shuts down)"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+    
     def test_connection(self) -> bool:
         """Test if the API connection is working"""
         try:
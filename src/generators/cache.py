@@ -0,0 +1,68 @@
+# src/generators/cache.py
+"""
+Content-addressed cache of generated images keyed on provider, model config and prompt
+"""
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import Config, MODEL_CONFIGS
+from ..utils.cache_utils import DiskLRUCache, make_cache_key
+from ..utils.naming import generate_filename
+
+class GenerationCache:
+    """Reuse a previous output when provider, model config, prompt text and params are unchanged
+
+    The key covers the model's full MODEL_CONFIGS entry, so changing a
+    model's endpoint or version invalidates its cached images. The prompt
+    id is not part of the key; a hit is copied to a freshly named file in
+    the output directory, exactly as a new generation would be.
+    """
+
+    def __init__(self, cache_dir: Path = None):
+        self.store = DiskLRUCache(
+            cache_dir or Config.CACHE_DIR / "generations",
+            max_bytes=Config.GENERATION_CACHE_MAX_MB * 1024 * 1024,
+            max_entries=Config.GENERATION_CACHE_MAX_ENTRIES,
+            name="generations"
+        )
+        self.logger = logging.getLogger("generator.cache")
+
+    def key(self, provider: str, model: str, prompt: str, params: Dict[str, Any] = None) -> str:
+        model_config = MODEL_CONFIGS.get(provider, {}).get(model)
+        return make_cache_key(provider, model, model_config, prompt, params or {})
+
+    def lookup(self, provider: str, model: str, prompt: str, prompt_id: str,
+               output_dir: Path, params: Dict[str, Any] = None) -> Optional[Path]:
+        """Copy a cached image into output_dir and return its path, or None on a miss"""
+        cached = self.store.get(self.key(provider, model, prompt, params))
+        if cached is None:
+            return None
+
+        output_path = output_dir / generate_filename(prompt_id, model, cached.suffix.lstrip(".") or "png")
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached, output_path)
+        except Exception as e:
+            self.logger.warning(f"Failed to restore cached image for {prompt_id}: {e}")
+            return None
+
+        self.logger.info(f"Cache hit: {provider}:{model} {prompt_id} -> {output_path.name}")
+        return output_path
+
+    def store_result(self, provider: str, model: str, prompt: str, file_path: Path,
+                     params: Dict[str, Any] = None):
+        """Cache a successfully generated image"""
+        self.store.put(self.key(provider, model, prompt, params), file_path,
+                       meta={"provider": provider, "model": model})
+
+    def save(self):
+        self.store.save()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+# Global generation cache instance
+generation_cache = GenerationCache()
@@ -3,13 +3,17 @@
 Fal.ai image generator
 """
 
-import requests
-import time
+import asyncio
+from concurrent.futures import Future
+from urllib.parse import quote
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
-from .base import BaseGenerator, GenerationResult
-from ..core.config import MODEL_CONFIGS
+from .base import BaseGenerator, GenerationResult, ProviderAPIError
+from .poller import completed, prediction_poller
+from .latency import PollSchedule, latency_history
+from .webhooks import timestamp_fresh, webhook_receiver
+from ..core.config import MODEL_CONFIGS, Config
 
 class FalAIGenerator(BaseGenerator):
     """Generator for Fal.ai models"""
@@ -20,6 +24,9 @@ class FalAIGenerator(BaseGenerator):
             "Authorization": f"Key {api_key}",  # Fal.ai uses "Key" not "Bearer"
             "Content-Type": "application/json"
         }
+        self.queue_base_url = "https://queue.fal.run"
+        self.direct_base_url = "https://fal.run"
+        webhook_receiver.register("fal_ai", self._handle_webhook, self._verify_webhook)
     
     def get_available_models(self) -> List[str]:
         """Get available Fal.ai models"""
@@ -41,20 +48,51 @@ class FalAIGenerator(BaseGenerator):
                 error=f"Invalid model: {model}"
             )
         
-        return self._handle_generation(
-            prompt, prompt_id, model, output_dir, 
-            self._generate_fal_ai, **kwargs
+        return self.start_generation(prompt, prompt_id, model, output_dir, **kwargs).result()
+    
+    def start_generation(self, prompt: str, prompt_id: str, model: str,
+                         output_dir: Path, **kwargs) -> Future:
+        """Queue the request and return a Future of the GenerationResult without waiting for it"""
+        
+        if not self.validate_model(model):
+            return completed(GenerationResult(
+                success=False,
+                prompt_id=prompt_id,
+                model=model,
+                error=f"Invalid model: {model}"
+            ))
+        
+        return self._start_handle_generation(
+            prompt, prompt_id, model, output_dir,
+            self._submit_fal_ai, **kwargs
         )
     
-    def _generate_fal_ai(self, prompt: str, prompt_id: str, model: str,
-                        output_dir: Path, **kwargs) -> Optional[Path]:
-        """Internal Fal.ai generation logic"""
+    async def agenerate(self, prompt: str, prompt_id: str, model: str,
+                        output_dir: Path, **kwargs) -> GenerationResult:
+        """Generate image using Fal.ai without blocking the event loop"""
+        
+        if not self.validate_model(model):
+            return GenerationResult(
+                success=False,
+                prompt_id=prompt_id,
+                model=model,
+                error=f"Invalid model: {model}"
+            )
+        
+        return await self._ahandle_generation(
+            prompt, prompt_id, model, output_dir,
+            self._agenerate_fal_ai, **kwargs
+        )
+    
+    def _submit_fal_ai(self, prompt: str, prompt_id: str, model: str,
+                       output_dir: Path, **kwargs) -> Future:
+        """Internal Fal.ai generation logic; a queued request is downloaded from the poller"""
         
         model_config = MODEL_CONFIGS["fal_ai"][model]
         model_endpoint = model_config["model"]
         
         # Try queue endpoint first (async)
-        queue_url = f"https://queue.fal.run/{model_endpoint}"
+        queue_url = self._queue_url(model_endpoint)
         
         payload = {
             "prompt": prompt,
@@ -62,7 +100,11 @@ class FalAIGenerator(BaseGenerator):
         }
         
         # Submit to queue
-        response = requests.post(queue_url, json=payload, headers=self.headers, timeout=30)
+        response = self.session.post(queue_url, json=payload, headers=self.headers, timeout=30)
+        
+        if response.status_code == 429:
+            # Do not hit the direct endpoint too; let the rate limiter back off
+            raise ProviderAPIError.from_response(response)
         
         if response.status_code == 200:
             data = response.json()
@@ -70,73 +112,195 @@ class FalAIGenerator(BaseGenerator):
             # Check if we got a direct response or need to poll
             if "images" in data:
                 # Direct response
+                image_url = data["images"][0]["url"]
+                return completed(self._download_and_save(image_url, prompt_id, model, output_dir))
+            
+            elif "response_url" in data:
+                # Download once the poller (or a webhook) reports completion
+                self._notify_submitted(data.get("request_id") or data["response_url"],
+                                       response_url=data["response_url"])
+                def finish(result_url: Optional[str]) -> Optional[Path]:
+                    if result_url:
+                        return self._download_and_save(result_url, prompt_id, model, output_dir)
+                    return self._generate_direct(model_endpoint, payload, prompt_id, model, output_dir)
+                
+                return prediction_poller.then(
+                    self._track_request(data["response_url"], model, None, data.get("request_id")),
+                    finish
+                )
+        
+        return completed(self._generate_direct(model_endpoint, payload, prompt_id, model, output_dir))
+    
+    def _generate_direct(self, model_endpoint: str, payload: Dict[str, Any], prompt_id: str,
+                         model: str, output_dir: Path) -> Optional[Path]:
+        """Fallback to the direct (synchronous) endpoint"""
+        direct_url = f"{self.direct_base_url}/{model_endpoint}"
+        response = self.session.post(direct_url, json=payload, headers=self.headers, timeout=60)
+        
+        if response.status_code == 200:
+            data = response.json()
+            if "images" in data and data["images"]:
                 image_url = data["images"][0]["url"]
                 return self._download_and_save(image_url, prompt_id, model, output_dir)
+        
+        if response.status_code != 200:
+            raise ProviderAPIError.from_response(response)
+        raise Exception(f"Fal.ai generation failed: {response.status_code} {response.text}")
+    
+    async def _agenerate_fal_ai(self, prompt: str, prompt_id: str, model: str,
+                               output_dir: Path, **kwargs) -> Optional[Path]:
+        """Internal Fal.ai generation logic (async)"""
+        
+        model_endpoint = MODEL_CONFIGS["fal_ai"][model]["model"]
+        client = self._get_async_client()
+        
+        payload = {
+            "prompt": prompt,
+            **kwargs
+        }
+        
+        # Submit to queue
+        response = await client.post(self._queue_url(model_endpoint),
+                                     json=payload, headers=self.headers, timeout=30)
+        
+        if response.status_code == 429:
+            # Do not hit the direct endpoint too; let the rate limiter back off
+            raise ProviderAPIError.from_response(response)
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            if "images" in data:
+                image_url = data["images"][0]["url"]
+                return await self._adownload_and_save(image_url, prompt_id, model, output_dir)
             
             elif "response_url" in data:
-                # Need to poll for results
-                result_url = self._poll_fal_queue(data["response_url"])
+                self._notify_submitted(data.get("request_id") or data["response_url"],
+                                       response_url=data["response_url"])
+                result_url = await self._apoll_fal_queue(data["response_url"], model=model,
+                                                         request_id=data.get("request_id"))
                 if result_url:
-                    return self._download_and_save(result_url, prompt_id, model, output_dir)
+                    return await self._adownload_and_save(result_url, prompt_id, model, output_dir)
         
         # Fallback to direct endpoint
-        direct_url = f"https://fal.run/{model_endpoint}"
-        response = requests.post(direct_url, json=payload, headers=self.headers, timeout=60)
+        response = await client.post(f"{self.direct_base_url}/{model_endpoint}",
+                                     json=payload, headers=self.headers, timeout=60)
         
         if response.status_code == 200:
             data = response.json()
             if "images" in data and data["images"]:
                 image_url = data["images"][0]["url"]
-                return self._download_and_save(image_url, prompt_id, model, output_dir)
+                return await self._adownload_and_save(image_url, prompt_id, model, output_dir)
         
+        if response.status_code != 200:
+            raise ProviderAPIError.from_response(response)
         raise Exception(f"Fal.ai generation failed: {response.status_code} {response.text}")
     
-    def _poll_fal_queue(self, response_url: str, timeout: int = 120) -> Optional[str]:
+    def resume(self, submission: Dict[str, Any], prompt_id: str, model: str,
+               output_dir: Path) -> Optional[GenerationResult]:
+        """Wait for a queued request from an interrupted run instead of submitting it again"""
+        
+        response_url = submission.get("response_url")
+        if not response_url:
+            return None
+        
+        def reattach() -> Optional[Path]:
+            result_url = self._track_request(response_url, model, None, submission.get("prediction_id"),
+                                             resumed=True).result()
+            if not result_url:
+                raise Exception("Resumed request failed or timed out")
+            return self._download_and_save(result_url, prompt_id, model, output_dir)
+        
+        return self._handle_reattach(prompt_id, model, reattach)
+    
+    def _poll_fal_queue(self, response_url: str, model: str = None,
+                        timeout: int = None, request_id: str = None) -> Optional[str]:
         """Poll Fal.ai queue for async results"""
+        return self._track_request(response_url, model, timeout, request_id).result()
+    
+    async def _apoll_fal_queue(self, response_url: str, model: str = None,
+                               timeout: int = None, request_id: str = None) -> Optional[str]:
+        """Async variant of _poll_fal_queue"""
+        return await asyncio.wrap_future(self._track_request(response_url, model, timeout, request_id))
+    
+    def _track_request(self, response_url: str, model: Optional[str], timeout: Optional[int],
+                       request_id: Optional[str] = None, resumed: bool = False) -> Future:
+        """Hand the queued request to the shared poller with a schedule learned for the model
         
-        start_time = time.time()
+        A resumed request was submitted before tracking started, so its
+        completion time is not recorded as a latency sample.
+        """
         
-        while time.time() - start_time < timeout:
-            try:
-                response = requests.get(response_url, headers=self.headers, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Check for completion
-                    if data.get("status") == "COMPLETED" or "images" in data:
-                        images = data.get("images", [])
-                        if images:
-                            return images[0]["url"]
-                
-                elif response.status_code == 202:
-                    # Still processing
-                    time.sleep(3)
-                    continue
-                
-                elif response.status_code == 400:
-                    # Check if it's "still in progress"
-                    try:
-                        error_data = response.json()
-                        if "still in progress" in error_data.get("detail", "").lower():
-                            time.sleep(3)
-                            continue
-                    except:
-                        pass
-                    
-                    self.logger.warning(f"Fal.ai poll error: {response.status_code}")
-                    break
+        def check():
+            response = self.session.get(response_url, headers=self.headers, timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
                 
-                else:
-                    self.logger.error(f"Fal.ai poll failed: {response.status_code} {response.text}")
-                    break
-                    
-            except Exception as e:
-                self.logger.error(f"Fal.ai polling error: {e}")
-                break
+                # Check for completion
+                if data.get("status") == "COMPLETED" or "images" in data:
+                    images = data.get("images", [])
+                    if images:
+                        return True, images[0]["url"]
+                return False, None
+            
+            elif response.status_code == 202 or self._is_still_in_progress(response):
+                # Still processing
+                return False, None
+            
+            elif response.status_code == 400:
+                self.logger.warning(f"Fal.ai poll error: {response.status_code}")
+                return True, None
+            
+            self.logger.error(f"Fal.ai poll failed: {response.status_code} {response.text}")
+            return True, None
         
-        self.logger.warning(f"Fal.ai polling timed out after {timeout}s")
-        return None
+        model_key = f"fal_ai:{model}" if model else None
+        if timeout is not None:
+            schedule = PollSchedule.fixed(3, timeout)
+        else:
+            schedule = latency_history.schedule(model_key, default_interval=3,
+                                                default_timeout=Config.TIMEOUT_SECONDS)
+        if webhook_receiver.enabled and request_id:
+            # Completion is pushed to us; polling only catches lost callbacks
+            schedule = schedule.with_fallback_interval(Config.WEBHOOK_FALLBACK_INTERVAL)
+        
+        return prediction_poller.track(f"fal_ai:{request_id or response_url}", check, schedule,
+                                       None if resumed else model_key)
+    
+    def _queue_url(self, model_endpoint: str) -> str:
+        """Queue submit URL, asking Fal.ai to call back when webhooks are enabled"""
+        queue_url = f"{self.queue_base_url}/{model_endpoint}"
+        callback_url = webhook_receiver.callback_url("fal_ai")
+        if callback_url:
+            queue_url += f"?fal_webhook={quote(callback_url, safe='')}"
+        return queue_url
+    
+    def _handle_webhook(self, payload: Dict[str, Any]) -> Optional[tuple]:
+        """Map a Fal.ai webhook to its poller key and result"""
+        request_id = payload.get("request_id")
+        if not request_id:
+            return None
+        
+        if payload.get("status") != "OK":
+            self.logger.error(f"Fal.ai request {request_id} failed: {payload.get('error')}")
+            return f"fal_ai:{request_id}", None
+        
+        images = (payload.get("payload") or {}).get("images") or []
+        return f"fal_ai:{request_id}", images[0]["url"] if images else None
+    
+    def _verify_webhook(self, body: bytes, headers) -> bool:
+        """Reject stale callbacks (the URL token authenticates them)"""
+        return timestamp_fresh(headers.get("x-fal-webhook-timestamp"))
+    
+    def _is_still_in_progress(self, response) -> bool:
+        """Check for the 400 "still in progress" reply Fal.ai sends while a request runs"""
+        if response.status_code != 400:
+            return False
+        try:
+            return "still in progress" in response.json().get("detail", "").lower()
+        except Exception:
+            return False
     
     def test_connection(self) -> bool:
         """Test Fal.ai connection"""
@@ -145,7 +309,7 @@ class FalAIGenerator(BaseGenerator):
             test_url = "https://fal.run/fal-ai/flux/schnell"
             test_payload = {"prompt": "test"}
             
-            response = requests.post(test_url, json=test_payload, headers=self.headers, timeout=10)
+            response = self.session.post(test_url, json=test_payload, headers=self.headers, timeout=10)
             
             # Even if generation fails, 200/401 means we can reach the API
             return response.status_code in [200, 400, 401]
@@ -0,0 +1,138 @@
+# src/generators/latency.py
+"""
+Per-model completion latency history and adaptive poll schedules
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..core.config import Config
+
+class PollSchedule:
+    """When to poll a prediction and when to give up on it"""
+
+    def __init__(self, first_delay: float, interval: float, timeout: float,
+                 slow_after: float = None, slow_interval: float = None):
+        self.first_delay = first_delay
+        self.interval = interval
+        self.timeout = timeout
+        self.slow_after = slow_after if slow_after is not None else timeout
+        self.slow_interval = slow_interval or interval
+
+    @classmethod
+    def fixed(cls, interval: float, timeout: float) -> "PollSchedule":
+        """Poll every ``interval`` seconds until ``timeout`` (the pre-history behaviour)"""
+        return cls(first_delay=interval, interval=interval, timeout=timeout)
+
+    def with_fallback_interval(self, interval: float) -> "PollSchedule":
+        """Slow schedule used as a safety net when completion is pushed via webhook"""
+        return PollSchedule(first_delay=max(self.first_delay, interval), interval=interval,
+                            timeout=self.timeout)
+
+    def next_delay(self, elapsed: float) -> float:
+        """Delay before the next poll given the time since submission"""
+        return self.interval if elapsed < self.slow_after else self.slow_interval
+
+    def __repr__(self):
+        return (f"PollSchedule(first={self.first_delay:.1f}s, every={self.interval:.1f}s, "
+                f"slow_after={self.slow_after:.1f}s, timeout={self.timeout:.0f}s)")
+
+class LatencyHistory:
+    """Record prediction completion times per provider:model and derive poll schedules
+
+    Until a model has MIN_SAMPLES recorded completions it is polled on the
+    provider's fixed interval. After that the first poll waits until just
+    before the fastest typical completion (p10), polls tightly through the
+    p10-p90 band around the median, backs off to the provider default past
+    p90, and times out at a multiple of p99.
+    """
+
+    MIN_SAMPLES = 5
+    MAX_SAMPLES = 200
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, history_file: Path = None):
+        self.history_file = history_file or Config.CACHE_DIR / "model_latency.json"
+        self.logger = logging.getLogger("generator.latency")
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = self._load()
+        self._last_save = time.time()
+        self._dirty = False
+
+    def record(self, model_key: str, seconds: float):
+        """Add a completion time sample for a model"""
+        with self._lock:
+            samples = self._samples.setdefault(model_key, [])
+            samples.append(round(seconds, 3))
+            del samples[:-self.MAX_SAMPLES]
+            self._dirty = True
+            should_save = time.time() - self._last_save > self.SAVE_INTERVAL
+        if should_save:
+            self.save()
+
+    def percentile(self, model_key: str, pct: float) -> Optional[float]:
+        """Completion time percentile (0-100) for a model, or None without history"""
+        with self._lock:
+            samples = sorted(self._samples.get(model_key, []))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def sample_count(self, model_key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(model_key, []))
+
+    def schedule(self, model_key: str, default_interval: float,
+                 default_timeout: float) -> PollSchedule:
+        """Build a poll schedule for a model from its recorded latency distribution"""
+
+        if self.sample_count(model_key) < self.MIN_SAMPLES:
+            return PollSchedule.fixed(default_interval, default_timeout)
+
+        p10 = self.percentile(model_key, 10)
+        p50 = self.percentile(model_key, 50)
+        p90 = self.percentile(model_key, 90)
+        p99 = self.percentile(model_key, 99)
+
+        # Tight polling around the median, bounded so fast models are not hammered
+        interval = min(default_interval, max(Config.POLL_MIN_INTERVAL, (p90 - p10) / 4, p50 * 0.1))
+
+        return PollSchedule(
+            first_delay=max(Config.POLL_MIN_INTERVAL, p10 * 0.9),
+            interval=interval,
+            timeout=max(Config.POLL_MIN_TIMEOUT, p99 * Config.POLL_TIMEOUT_FACTOR),
+            slow_after=p90,
+            slow_interval=default_interval
+        )
+
+    def save(self):
+        """Persist samples to disk (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {key: list(samples) for key, samples in self._samples.items()}
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.history_file.with_suffix(self.history_file.suffix + ".tmp")
+            tmp.write_text(json.dumps(data, indent=2))
+            tmp.replace(self.history_file)
+        except Exception as e:
+            self.logger.warning(f"Failed to save latency history: {e}")
+
+    def _load(self) -> Dict[str, List[float]]:
+        try:
+            if self.history_file.exists():
+                return json.loads(self.history_file.read_text())
+        except Exception as e:
+            self.logger.warning(f"Failed to load latency history: {e}")
+        return {}
+
+# Global latency history instance
+latency_history = LatencyHistory()
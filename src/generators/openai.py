@@ -5,7 +5,7 @@ OpenAI DALL-E image generator
 
 import openai
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 
 from .base import BaseGenerator, GenerationResult
 from ..core.config import MODEL_CONFIGS
@@ -13,9 +13,15 @@ from ..core.config import MODEL_CONFIGS
 class OpenAIGenerator(BaseGenerator):
     """Generator for OpenAI DALL-E models"""
     
+    # images.generate rejects anything else (there is no seed)
+    SUPPORTED_PARAMS = frozenset({"size", "quality", "style", "user", "background",
+                                  "moderation", "output_compression", "output_format"})
+    
     def __init__(self, api_key: str):
         super().__init__(api_key, "openai")
         self.client = openai.OpenAI(api_key=api_key)
+        self.async_client = None
+        self._async_http_client = None
     
     def get_available_models(self) -> List[str]:
         """Get available OpenAI models"""
@@ -42,21 +48,28 @@ class OpenAIGenerator(BaseGenerator):
             self._generate_openai, **kwargs
         )
     
+    async def agenerate(self, prompt: str, prompt_id: str, model: str,
+                        output_dir: Path, **kwargs) -> GenerationResult:
+        """Generate image using OpenAI DALL-E without blocking the event loop"""
+        
+        if not self.validate_model(model):
+            return GenerationResult(
+                success=False,
+                prompt_id=prompt_id,
+                model=model,
+                error=f"Invalid model: {model}"
+            )
+        
+        return await self._ahandle_generation(
+            prompt, prompt_id, model, output_dir,
+            self._agenerate_openai, **kwargs
+        )
+    
     def _generate_openai(self, prompt: str, prompt_id: str, model: str,
                         output_dir: Path, **kwargs) -> Optional[Path]:
         """Internal OpenAI generation logic"""
         
-        model_config = MODEL_CONFIGS["openai"][model]
-        
-        # Build parameters
-        params = {
-            "model": model_config["model"],
-            "prompt": f"logo, minimalist, {prompt}",  # Add prefix for better results
-            **model_config["params"]
-        }
-        
-        # Override with any kwargs
-        params.update(kwargs)
+        params = self._build_params(prompt, model, **kwargs)
         
         # Generate image
         response = self.client.images.generate(**params)
@@ -67,6 +80,41 @@ class OpenAIGenerator(BaseGenerator):
         # Download and save
         return self._download_and_save(image_url, prompt_id, model, output_dir)
     
+    async def _agenerate_openai(self, prompt: str, prompt_id: str, model: str,
+                               output_dir: Path, **kwargs) -> Optional[Path]:
+        """Internal OpenAI generation logic (async)"""
+        
+        # Rebuild the client whenever the underlying HTTP client moved to a new event loop
+        http_client = self._get_async_client()
+        if self.async_client is None or self._async_http_client is not http_client:
+            self.async_client = openai.AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+            self._async_http_client = http_client
+        
+        response = await self.async_client.images.generate(**self._build_params(prompt, model, **kwargs))
+        
+        return await self._adownload_and_save(response.data[0].url, prompt_id, model, output_dir)
+    
+    def _build_params(self, prompt: str, model: str, **kwargs) -> Dict[str, Any]:
+        """Build image generation parameters from model config, overridden by kwargs"""
+        
+        model_config = MODEL_CONFIGS["openai"][model]
+        
+        params = {
+            "model": model_config["model"],
+            "prompt": f"logo, minimalist, {prompt}",  # Add prefix for better results
+            **model_config["params"]
+        }
+        
+        # Override with any kwargs the API accepts
+        params.update(self.filter_params(kwargs))
+        return params
+    
+    async def aclose(self):
+        """Close async clients"""
+        self.async_client = None
+        self._async_http_client = None
+        await super().aclose()
+    
     def test_connection(self) -> bool:
         """Test OpenAI connection"""
         try:
@@ -0,0 +1,185 @@
+# src/generators/poller.py
+"""
+Shared background poller for asynchronous provider predictions
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..core.config import Config
+from .latency import PollSchedule, latency_history
+
+# check() performs one status request and returns (finished, value)
+StatusCheck = Callable[[], Tuple[bool, Any]]
+
+def completed(value: Any) -> Future:
+    """A Future that is already resolved to ``value``"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+class _PendingPrediction:
+    """A tracked prediction and its polling schedule"""
+
+    def __init__(self, key: str, check: StatusCheck, schedule: PollSchedule,
+                 model_key: Optional[str] = None):
+        self.key = key
+        self.check = check
+        self.schedule = schedule
+        self.model_key = model_key
+        self.started = time.time()
+        self.deadline = self.started + schedule.timeout
+        self.next_poll = self.started + schedule.first_delay
+        self.future: Future = Future()
+        self.polls = 0
+
+class PredictionPoller:
+    """Poll all pending predictions from one background thread
+
+    Generators register a status check per prediction and get a Future back
+    instead of sleeping in their own loop. Due checks are swept round-robin
+    and run on a small pool of checker threads sharing the pooled sessions,
+    so poll traffic for every in-flight prediction is coalesced in one place.
+    then() chains the work that follows a prediction (download and save) onto
+    a completion pool, so no caller thread has to wait on the Future.
+    """
+
+    def __init__(self, check_workers: int = None):
+        self.check_workers = check_workers or Config.POLLER_WORKERS
+        self.logger = logging.getLogger("generator.poller")
+        self._pending: Dict[str, _PendingPrediction] = {}
+        # Results pushed (e.g. by webhooks) before the prediction was tracked
+        self._early: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._checkers: Optional[ThreadPoolExecutor] = None
+        self._completions: Optional[ThreadPoolExecutor] = None
+
+    def track(self, key: str, check: StatusCheck, schedule: PollSchedule,
+              model_key: Optional[str] = None) -> Future:
+        """Start polling a prediction; the Future resolves to its value (None on failure/timeout)
+
+        Successful completions are recorded against ``model_key`` in the
+        latency history so later schedules for that model can adapt; pass
+        None when tracking did not start at submission (e.g. on resume).
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = _PendingPrediction(key, check, schedule, model_key)
+                early = self._early.pop(key, None)
+                if early is not None:
+                    pending.future.set_result(early[0])
+                    return pending.future
+                self._pending[key] = pending
+            self._ensure_running()
+        self._wakeup.set()
+        return pending.future
+
+    def resolve(self, key: str, value: Any) -> bool:
+        """Resolve a prediction from outside the poll loop (e.g. a webhook callback)
+
+        A result that arrives before the prediction is tracked is kept for a
+        while and handed out by the matching track() call.
+        """
+        with self._lock:
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                now = time.time()
+                self._early = {k: v for k, v in self._early.items() if now - v[1] < Config.TIMEOUT_SECONDS}
+                self._early[key] = (value, now)
+                return False
+        self._finish(pending, value)
+        return True
+
+    def then(self, future: Future, callback: Callable[[Any], Any]) -> Future:
+        """Future of callback(value), run on the completion pool once ``future`` resolves"""
+        chained = Future()
+
+        def run(done: Future):
+            try:
+                chained.set_result(callback(done.result()))
+            except Exception as e:
+                chained.set_exception(e)
+
+        future.add_done_callback(lambda done: self._get_completions().submit(run, done))
+        return chained
+
+    def _get_completions(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._completions is None:
+                self._completions = ThreadPoolExecutor(max_workers=Config.POLLER_COMPLETION_WORKERS,
+                                                       thread_name_prefix="poll-complete")
+            return self._completions
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_running(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._checkers = ThreadPoolExecutor(max_workers=self.check_workers,
+                                                thread_name_prefix="poll-check")
+            self._thread = threading.Thread(target=self._run, name="prediction-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            now = time.time()
+            with self._lock:
+                expired = [p for p in self._pending.values() if now >= p.deadline]
+                for pending in expired:
+                    del self._pending[pending.key]
+                due = sorted((p for p in self._pending.values() if now >= p.next_poll),
+                             key=lambda p: p.next_poll)
+                for pending in due:
+                    # Push the schedule forward now so a slow check is not re-queued
+                    pending.next_poll = float("inf")
+
+            for pending in expired:
+                self.logger.error(f"Prediction {pending.key} timed out after {pending.schedule.timeout:.0f}s")
+                self._finish(pending, None)
+
+            for pending in due:
+                self._checkers.submit(self._check, pending)
+
+            with self._lock:
+                next_times = [p.next_poll for p in self._pending.values()]
+                next_times += [p.deadline for p in self._pending.values()]
+            wait = min(next_times) - time.time() if next_times else 1.0
+            self._wakeup.wait(timeout=max(0.05, min(wait, 1.0)))
+            self._wakeup.clear()
+
+    def _check(self, pending: _PendingPrediction):
+        pending.polls += 1
+        try:
+            done, value = pending.check()
+        except Exception as e:
+            self.logger.error(f"Error checking prediction {pending.key}: {e}")
+            done, value = True, None
+
+        with self._lock:
+            if self._pending.get(pending.key) is not pending:
+                return  # Resolved or expired while the check was running
+            if done:
+                del self._pending[pending.key]
+            else:
+                now = time.time()
+                pending.next_poll = now + pending.schedule.next_delay(now - pending.started)
+
+        if done:
+            self._finish(pending, value)
+        self._wakeup.set()
+
+    def _finish(self, pending: _PendingPrediction, value: Any):
+        if value is not None and pending.model_key:
+            latency_history.record(pending.model_key, time.time() - pending.started)
+        if not pending.future.done():
+            pending.future.set_result(value)
+
+# Global poller instance
+prediction_poller = PredictionPoller()
@@ -3,13 +3,16 @@
 Replicate image generator (community and official models)
 """
 
-import requests
-import time
 import json
+import asyncio
+from concurrent.futures import Future
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
-from .base import BaseGenerator, GenerationResult
+from .base import BaseGenerator, GenerationResult, ProviderAPIError
+from .poller import completed, prediction_poller
+from .latency import PollSchedule, latency_history
+from .webhooks import timestamp_fresh, verify_signature, webhook_receiver
 from ..core.config import MODEL_CONFIGS, Config
 
 class ReplicateGenerator(BaseGenerator):
@@ -24,6 +27,7 @@ class ReplicateGenerator(BaseGenerator):
         }
         self.version_cache_file = Config.CACHE_DIR / "replicate_versions.json"
         self.version_cache = self._load_version_cache()
+        webhook_receiver.register("replicate", self._handle_webhook, self._verify_webhook)
     
     def get_available_models(self) -> List[str]:
         """Get available Replicate models"""
@@ -45,14 +49,45 @@ class ReplicateGenerator(BaseGenerator):
                 error=f"Invalid model: {model}"
             )
         
-        return self._handle_generation(
-            prompt, prompt_id, model, output_dir, 
-            self._generate_replicate, **kwargs
+        return self.start_generation(prompt, prompt_id, model, output_dir, **kwargs).result()
+    
+    def start_generation(self, prompt: str, prompt_id: str, model: str,
+                         output_dir: Path, **kwargs) -> Future:
+        """Submit the prediction and return a Future of the GenerationResult without waiting for it"""
+        
+        if not self.validate_model(model):
+            return completed(GenerationResult(
+                success=False,
+                prompt_id=prompt_id,
+                model=model,
+                error=f"Invalid model: {model}"
+            ))
+        
+        return self._start_handle_generation(
+            prompt, prompt_id, model, output_dir,
+            self._submit_replicate, **kwargs
         )
     
-    def _generate_replicate(self, prompt: str, prompt_id: str, model: str,
-                           output_dir: Path, **kwargs) -> Optional[Path]:
-        """Internal Replicate generation logic"""
+    async def agenerate(self, prompt: str, prompt_id: str, model: str,
+                        output_dir: Path, **kwargs) -> GenerationResult:
+        """Generate image using Replicate without blocking the event loop"""
+        
+        if not self.validate_model(model):
+            return GenerationResult(
+                success=False,
+                prompt_id=prompt_id,
+                model=model,
+                error=f"Invalid model: {model}"
+            )
+        
+        return await self._ahandle_generation(
+            prompt, prompt_id, model, output_dir,
+            self._agenerate_replicate, **kwargs
+        )
+    
+    def _submit_replicate(self, prompt: str, prompt_id: str, model: str,
+                          output_dir: Path, **kwargs) -> Future:
+        """Internal Replicate generation logic: create the prediction, then download from the poller"""
         
         model_config = MODEL_CONFIGS["replicate"][model]
         model_name = model_config["model"]
@@ -66,22 +101,80 @@ class ReplicateGenerator(BaseGenerator):
         
         if not prediction:
             raise Exception("Failed to create prediction")
+        self._notify_submitted(prediction["id"])
+        
+        # Download and save once the poller (or a webhook) reports completion
+        return prediction_poller.then(
+            self._track_prediction(prediction["id"], model, None),
+            lambda result_url: self._save_result(result_url, prompt_id, model, output_dir)
+        )
+    
+    def _save_result(self, result_url: Optional[str], prompt_id: str, model: str,
+                     output_dir: Path) -> Optional[Path]:
+        """Download a finished prediction's image"""
+        if not result_url:
+            raise Exception("Prediction failed or timed out")
+        return self._download_and_save(result_url, prompt_id, model, output_dir,
+                                       self._extension_from_url(result_url))
+    
+    async def _agenerate_replicate(self, prompt: str, prompt_id: str, model: str,
+                                   output_dir: Path, **kwargs) -> Optional[Path]:
+        """Internal Replicate generation logic (async)"""
+        
+        model_config = MODEL_CONFIGS["replicate"][model]
+        model_name = model_config["model"]
+        
+        # Create prediction
+        if model_config["type"] == "official":
+            url = f"{self.base_url}/models/{model_name}/predictions"
+            payload = {"input": {"prompt": prompt, **kwargs}, **self._webhook_fields()}
+        else:
+            # Version lookups are cached on disk, so this only blocks on a cold cache
+            version = await asyncio.to_thread(self._resolve_model_version, model_name)
+            if not version:
+                raise Exception(f"Could not resolve version for {model_name}")
+            url = f"{self.base_url}/predictions"
+            payload = {"version": version, "input": {"prompt": prompt, **kwargs}, **self._webhook_fields()}
+        
+        client = self._get_async_client()
+        response = await client.post(url, json=payload, headers=self.headers, timeout=30)
+        
+        if response.status_code not in [200, 201]:
+            self.logger.error(f"Prediction failed: {response.status_code} {response.text}")
+            raise ProviderAPIError.from_response(response)
+        
+        prediction_id = response.json()["id"]
+        self._notify_submitted(prediction_id)
         
         # Wait for completion
-        result_url = self._wait_for_completion(prediction["id"])
+        result_url = await self._await_completion(prediction_id, model=model)
         
         if not result_url:
             raise Exception("Prediction failed or timed out")
         
-        # Determine file extension from URL
-        extension = "png"
-        if result_url.lower().endswith('.svg'):
-            extension = "svg"
-        elif result_url.lower().endswith(('.jpg', '.jpeg')):
-            extension = "jpg"
+        return await self._adownload_and_save(result_url, prompt_id, model, output_dir,
+                                              self._extension_from_url(result_url))
+    
+    def resume(self, submission: Dict[str, Any], prompt_id: str, model: str,
+               output_dir: Path) -> Optional[GenerationResult]:
+        """Wait for a prediction created by an interrupted run instead of paying for it again"""
+        
+        def reattach() -> Optional[Path]:
+            result_url = self._track_prediction(submission["prediction_id"], model, None, resumed=True).result()
+            if not result_url:
+                raise Exception("Resumed prediction failed or timed out")
+            return self._download_and_save(result_url, prompt_id, model, output_dir,
+                                           self._extension_from_url(result_url))
         
-        # Download and save
-        return self._download_and_save(result_url, prompt_id, model, output_dir, extension)
+        return self._handle_reattach(prompt_id, model, reattach)
+    
+    def _extension_from_url(self, url: str) -> str:
+        """Determine file extension from result URL"""
+        if url.lower().endswith('.svg'):
+            return "svg"
+        elif url.lower().endswith(('.jpg', '.jpeg')):
+            return "jpg"
+        return "png"
     
     def _create_official_prediction(self, model_name: str, prompt: str, **kwargs) -> Optional[Dict]:
         """Create prediction for official models"""
@@ -91,16 +184,17 @@ class ReplicateGenerator(BaseGenerator):
             "input": {
                 "prompt": prompt,
                 **kwargs
-            }
+            },
+            **self._webhook_fields()
         }
         
-        response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+        response = self.session.post(url, json=payload, headers=self.headers, timeout=30)
         
         if response.status_code in [200, 201]:
             return response.json()
         else:
             self.logger.error(f"Official model prediction failed: {response.status_code} {response.text}")
-            return None
+            raise ProviderAPIError.from_response(response)
     
     def _create_community_prediction(self, model_name: str, prompt: str, **kwargs) -> Optional[Dict]:
         """Create prediction for community models with version resolution"""
@@ -117,16 +211,17 @@ class ReplicateGenerator(BaseGenerator):
             "input": {
                 "prompt": prompt,
                 **kwargs
-            }
+            },
+            **self._webhook_fields()
         }
         
-        response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+        response = self.session.post(url, json=payload, headers=self.headers, timeout=30)
         
         if response.status_code in [200, 201]:
             return response.json()
         else:
             self.logger.error(f"Community model prediction failed: {response.status_code} {response.text}")
-            return None
+            raise ProviderAPIError.from_response(response)
     
     def _resolve_model_version(self, model_name: str) -> Optional[str]:
         """Resolve model version with caching"""
@@ -139,7 +234,7 @@ class ReplicateGenerator(BaseGenerator):
         url = f"{self.base_url}/models/{model_name}/versions?limit=1"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -160,49 +255,96 @@ class ReplicateGenerator(BaseGenerator):
         
         return None
     
-    def _wait_for_completion(self, prediction_id: str, timeout: int = 120) -> Optional[str]:
+    def _wait_for_completion(self, prediction_id: str, model: str = None,
+                             timeout: int = None) -> Optional[str]:
         """Wait for prediction to complete and return image URL"""
+        return self._track_prediction(prediction_id, model, timeout).result()
+    
+    async def _await_completion(self, prediction_id: str, model: str = None,
+                                timeout: int = None) -> Optional[str]:
+        """Async variant of _wait_for_completion"""
+        return await asyncio.wrap_future(self._track_prediction(prediction_id, model, timeout))
+    
+    def _track_prediction(self, prediction_id: str, model: Optional[str],
+                          timeout: Optional[int], resumed: bool = False) -> Future:
+        """Hand the prediction to the shared poller with a schedule learned for the model
+        
+        A resumed prediction was submitted before tracking started, so its
+        completion time is not recorded as a latency sample.
+        """
         
-        start_time = time.time()
         url = f"{self.base_url}/predictions/{prediction_id}"
         
-        while time.time() - start_time < timeout:
-            try:
-                response = requests.get(url, headers=self.headers, timeout=10)
-                
-                if response.status_code != 200:
-                    self.logger.error(f"Failed to check prediction status: {response.status_code}")
-                    return None
-                
-                data = response.json()
-                status = data.get("status")
-                
-                if status == "succeeded":
-                    output = data.get("output")
-                    if output:
-                        # Handle different output formats
-                        if isinstance(output, list):
-                            return output[0]
-                        elif isinstance(output, str):
-                            return output
-                        else:
-                            self.logger.error(f"Unexpected output format: {type(output)}")
-                            return None
-                
-                elif status in ["failed", "canceled"]:
-                    error = data.get("error", "Unknown error")
-                    self.logger.error(f"Prediction failed: {error}")
-                    return None
-                
-                # Still processing, wait and retry
-                time.sleep(2)
-                
-            except Exception as e:
-                self.logger.error(f"Error checking prediction: {e}")
-                return None
+        def check():
+            response = self.session.get(url, headers=self.headers, timeout=10)
+            
+            if response.status_code != 200:
+                self.logger.error(f"Failed to check prediction status: {response.status_code}")
+                return True, None
+            
+            return self._parse_prediction(response.json())
         
-        self.logger.error(f"Prediction timed out after {timeout}s")
-        return None
+        model_key = f"replicate:{model}" if model else None
+        if timeout is not None:
+            schedule = PollSchedule.fixed(2, timeout)
+        else:
+            schedule = latency_history.schedule(model_key, default_interval=2,
+                                                default_timeout=Config.TIMEOUT_SECONDS)
+        if webhook_receiver.enabled:
+            # Completion is pushed to us; polling only catches lost callbacks
+            schedule = schedule.with_fallback_interval(Config.WEBHOOK_FALLBACK_INTERVAL)
+        
+        return prediction_poller.track(f"replicate:{prediction_id}", check, schedule,
+                                       None if resumed else model_key)
+    
+    def _webhook_fields(self) -> Dict[str, Any]:
+        """Prediction fields asking Replicate to call us back on completion"""
+        callback_url = webhook_receiver.callback_url("replicate")
+        if not callback_url:
+            return {}
+        return {"webhook": callback_url, "webhook_events_filter": ["completed"]}
+    
+    def _handle_webhook(self, payload: Dict[str, Any]) -> Optional[tuple]:
+        """Map a Replicate webhook (a prediction object) to its poller key and result"""
+        prediction_id = payload.get("id")
+        if not prediction_id:
+            return None
+        
+        done, result_url = self._parse_prediction(payload)
+        if not done:
+            return None
+        return f"replicate:{prediction_id}", result_url
+    
+    def _verify_webhook(self, body: bytes, headers) -> bool:
+        """Reject stale callbacks, and check the signature when REPLICATE_WEBHOOK_SECRET is configured"""
+        secret = Config.REPLICATE_WEBHOOK_SECRET
+        if not secret:
+            return timestamp_fresh(headers.get("webhook-timestamp"))
+        return verify_signature(secret, body, headers)
+    
+    def _parse_prediction(self, data: Dict[str, Any]) -> tuple:
+        """Parse prediction status, returning (finished, image URL or None)"""
+        
+        status = data.get("status")
+        
+        if status == "succeeded":
+            output = data.get("output")
+            if output:
+                # Handle different output formats
+                if isinstance(output, list):
+                    return True, output[0]
+                elif isinstance(output, str):
+                    return True, output
+                else:
+                    self.logger.error(f"Unexpected output format: {type(output)}")
+                    return True, None
+        
+        elif status in ["failed", "canceled"]:
+            error = data.get("error", "Unknown error")
+            self.logger.error(f"Prediction failed: {error}")
+            return True, None
+        
+        return False, None
     
     def _load_version_cache(self) -> Dict[str, str]:
         """Load version cache from file"""
@@ -228,7 +370,7 @@ class ReplicateGenerator(BaseGenerator):
         """Test Replicate connection"""
         try:
             url = f"{self.base_url}/models"
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             return response.status_code == 200
         except Exception as e:
             self.logger.error(f"Replicate connection test failed: {e}")
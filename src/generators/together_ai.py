@@ -2,11 +2,10 @@
 Together AI image generator (FLUX models, etc.)
 """
 
-import requests
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
-from .base import BaseGenerator, GenerationResult
+from .base import BaseGenerator, GenerationResult, ProviderAPIError
 from ..core.config import MODEL_CONFIGS
 
 class TogetherAIGenerator(BaseGenerator):
@@ -45,24 +44,52 @@ class TogetherAIGenerator(BaseGenerator):
             self._generate_together_ai, **kwargs
         )
     
+    async def agenerate(self, prompt: str, prompt_id: str, model: str,
+                        output_dir: Path, **kwargs) -> GenerationResult:
+        """Generate image using Together AI without blocking the event loop"""
+        
+        if not self.validate_model(model):
+            return GenerationResult(
+                success=False,
+                prompt_id=prompt_id,
+                model=model,
+                error=f"Invalid model: {model}"
+            )
+        
+        return await self._ahandle_generation(
+            prompt, prompt_id, model, output_dir,
+            self._agenerate_together_ai, **kwargs
+        )
+    
     def _generate_together_ai(self, prompt: str, prompt_id: str, model: str,
                              output_dir: Path, **kwargs) -> Optional[Path]:
         """Internal Together AI generation logic"""
         
-        model_config = MODEL_CONFIGS["together_ai"][model]
+        payload = self._build_payload(prompt, model, **kwargs)
         
-        # Build request payload
-        payload = {
-            "model": model_config["model"],
-            "prompt": prompt,
-            **model_config["params"]
-        }
+        # Make API request
+        response = self.session.post(
+            self.base_url,
+            json=payload,
+            headers=self.headers,
+            timeout=120
+        )
         
-        # Override with any kwargs
-        payload.update(kwargs)
+        if response.status_code != 200:
+            raise ProviderAPIError.from_response(response)
         
-        # Make API request
-        response = requests.post(
+        image_url = self._extract_image_url(response.json())
+        
+        # Download and save
+        return self._download_and_save(image_url, prompt_id, model, output_dir)
+    
+    async def _agenerate_together_ai(self, prompt: str, prompt_id: str, model: str,
+                                    output_dir: Path, **kwargs) -> Optional[Path]:
+        """Internal Together AI generation logic (async)"""
+        
+        payload = self._build_payload(prompt, model, **kwargs)
+        
+        response = await self._get_async_client().post(
             self.base_url,
             json=payload,
             headers=self.headers,
@@ -70,18 +97,33 @@ class TogetherAIGenerator(BaseGenerator):
         )
         
         if response.status_code != 200:
-            raise Exception(f"API error {response.status_code}: {response.text}")
+            raise ProviderAPIError.from_response(response)
+        
+        image_url = self._extract_image_url(response.json())
+        
+        return await self._adownload_and_save(image_url, prompt_id, model, output_dir)
+    
+    def _build_payload(self, prompt: str, model: str, **kwargs) -> Dict[str, Any]:
+        """Build request payload from model config, overridden by kwargs"""
+        
+        model_config = MODEL_CONFIGS["together_ai"][model]
         
-        data = response.json()
+        payload = {
+            "model": model_config["model"],
+            "prompt": prompt,
+            **model_config["params"]
+        }
         
-        # Extract image URL
+        # Override with any kwargs
+        payload.update(kwargs)
+        return payload
+    
+    def _extract_image_url(self, data: Dict[str, Any]) -> str:
+        """Extract image URL from API response"""
         if "data" not in data or not data["data"]:
             raise Exception("No image data in response")
         
-        image_url = data["data"][0]["url"]
-        
-        # Download and save
-        return self._download_and_save(image_url, prompt_id, model, output_dir)
+        return data["data"][0]["url"]
     
     def test_connection(self) -> bool:
         """Test Together AI connection"""
@@ -96,7 +138,7 @@ class TogetherAIGenerator(BaseGenerator):
                 "n": 1
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.base_url,
                 json=test_payload,
                 headers=self.headers,
@@ -0,0 +1,180 @@
+# src/generators/webhooks.py
+"""
+Webhook receiver that resolves pending predictions when a provider calls back
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..core.config import Config
+from .poller import prediction_poller
+
+# handler(payload) -> (poller key, value) or None if the payload is not a final state
+WebhookHandler = Callable[[Dict[str, Any]], Optional[Tuple[str, Any]]]
+# verifier(raw body, headers) -> True if the callback is authentic
+WebhookVerifier = Callable[[bytes, Mapping[str, str]], bool]
+
+WEBHOOK_PATH = "/api/webhooks"
+
+def timestamp_fresh(timestamp: Optional[str], max_age: float = None) -> bool:
+    """Whether a callback's Unix timestamp header is within WEBHOOK_MAX_AGE_SECONDS of now"""
+    max_age = max_age if max_age is not None else Config.WEBHOOK_MAX_AGE_SECONDS
+    try:
+        return abs(time.time() - int(timestamp)) <= max_age
+    except (TypeError, ValueError):
+        return False
+
+def verify_signature(secret: str, body: bytes, headers: Mapping[str, str]) -> bool:
+    """Check a Standard Webhooks signature (webhook-id/-timestamp/-signature headers, as sent by Replicate)
+
+    The secret is "whsec_<base64 key>"; the signature is an HMAC-SHA256 of
+    "<id>.<timestamp>.<body>", and a stale timestamp fails verification.
+    """
+    timestamp = headers.get("webhook-timestamp")
+    if not timestamp_fresh(timestamp):
+        return False
+    try:
+        key = base64.b64decode(secret.split("_", 1)[-1])
+        signed = f"{headers.get('webhook-id')}.{timestamp}.".encode() + body
+        expected = base64.b64encode(hmac.new(key, signed, hashlib.sha256).digest()).decode()
+    except Exception:
+        return False
+
+    # Header holds space-separated "v1,<signature>" entries
+    signatures = headers.get("webhook-signature", "").split()
+    return any(hmac.compare_digest(expected, sig.split(",", 1)[-1]) for sig in signatures)
+
+class WebhookReceiver:
+    """Route provider callbacks to the shared prediction poller
+
+    Generators register a handler that turns a callback payload into the
+    poller key and result for a prediction. Callbacks arrive either through
+    the Flask route in app.py or through the standalone listener started for
+    CLI runs. Polling keeps running at a slow fallback interval, so a lost
+    callback only costs latency.
+
+    Every callback URL carries a shared token (WEBHOOK_TOKEN, or a random one
+    per run), and callbacks without it are rejected before any provider
+    verifier runs, so nobody who can merely reach the port can resolve a
+    prediction with a result URL of their choosing.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("generator.webhooks")
+        self.token = Config.WEBHOOK_TOKEN or secrets.token_urlsafe(32)
+        self._handlers: Dict[str, Tuple[WebhookHandler, Optional[WebhookVerifier]]] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(Config.WEBHOOK_BASE_URL)
+
+    def register(self, provider: str, handler: WebhookHandler, verifier: WebhookVerifier = None):
+        """Register the callback handler for a provider"""
+        self._handlers[provider] = (handler, verifier)
+
+    def callback_url(self, provider: str) -> Optional[str]:
+        """Public URL a provider should call back, or None when webhooks are disabled"""
+        if not self.enabled:
+            return None
+        return f"{Config.WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}/{provider}?token={self.token}"
+
+    def dispatch(self, provider: str, body: bytes, headers: Mapping[str, str],
+                 token: Optional[str] = None) -> bool:
+        """Handle one callback; returns True if it resolved a pending prediction
+
+        ``token`` is the callback URL's token query parameter.
+        """
+
+        registered = self._handlers.get(provider)
+        if registered is None:
+            self.logger.warning(f"Webhook for unknown provider: {provider}")
+            return False
+
+        if not hmac.compare_digest((token or "").encode(), self.token.encode()):
+            self.logger.warning(f"Rejected {provider} webhook without a valid token")
+            return False
+
+        handler, verifier = registered
+        if verifier and not verifier(body, headers):
+            self.logger.warning(f"Rejected {provider} webhook that failed verification "
+                                f"(bad signature or stale timestamp)")
+            return False
+
+        try:
+            payload = json.loads(body or b"{}")
+            resolved = handler(payload)
+        except Exception as e:
+            self.logger.error(f"Failed to handle {provider} webhook: {e}")
+            return False
+
+        if resolved is None:
+            return False
+
+        key, value = resolved
+        self.logger.debug(f"Webhook resolved {key}")
+        prediction_poller.resolve(key, value)
+        return True
+
+    def start_listener(self, port: int = None, host: str = None):
+        """Start the standalone callback listener in a background thread (idempotent)"""
+
+        with self._lock:
+            if self._server is not None:
+                return
+
+            receiver = self
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_POST(self):
+                    prefix = WEBHOOK_PATH + "/"
+                    url = urlsplit(self.path)
+                    if not url.path.startswith(prefix):
+                        self.send_error(404)
+                        return
+                    provider = url.path[len(prefix):].strip("/")
+                    token = parse_qs(url.query).get("token", [None])[0]
+                    length = int(self.headers.get("Content-Length", 0))
+                    handled = receiver.dispatch(provider, self.rfile.read(length), self.headers, token)
+                    body = json.dumps({"handled": handled}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    receiver.logger.debug((format % args).replace(receiver.token, "<token>"))
+
+            self._server = ThreadingHTTPServer(
+                (host or Config.WEBHOOK_LISTEN_HOST, port if port is not None else Config.WEBHOOK_LISTEN_PORT),
+                _Handler
+            )
+            threading.Thread(target=self._server.serve_forever, name="webhook-listener",
+                             daemon=True).start()
+            self.logger.info(f"Webhook listener on port {self._server.server_port}")
+
+    @property
+    def listener_port(self) -> Optional[int]:
+        return self._server.server_port if self._server else None
+
+    def stop_listener(self):
+        """Stop the standalone listener"""
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+# Global receiver instance
+webhook_receiver = WebhookReceiver()
@@ -4,46 +4,263 @@ Background removal processor using rembg
 """
 
 import logging
+import os
+import threading
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, List
-from PIL import Image
+from typing import Any, Callable, Dict, Optional, List, Tuple
+from PIL import Image, ImageOps
 import rembg
 
+from ..core.config import Config
+from ..utils.parallel_utils import create_process_pool, threads_per_worker
+from .mask_cache import encode_mask, mask_cache
+from .rembg_batch import batch_spec, cutout, predict_masks
+from .segmentation_models import create_session, resolve_model_name
+from .solid_background import decision_log, remove_solid_background
+
+logger = logging.getLogger("processor.background_remover")
+
+def _save(output_img: Image.Image, output_path: Path):
+    # Ensure output directory exists
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Save as PNG to preserve transparency
+    output_img.save(output_path, 'PNG', optimize=True)
+
+def _load_image(input_path: Path) -> Image.Image:
+    """Decode an image upright (rembg.remove applies EXIF orientation too)"""
+    with Image.open(input_path) as img:
+        img = ImageOps.exif_transpose(img)
+        return img if img.mode in ('RGB', 'RGBA') else img.convert('RGB')
+
+# (error message or None, PNG-encoded mask when requested) per image
+ModelResult = Tuple[Optional[str], Optional[bytes]]
+
+def _cut_out(img: Image.Image, mask: Image.Image, output_path: Path, return_mask: bool) -> ModelResult:
+    _save(cutout(img, mask), output_path)
+    return None, encode_mask(mask) if return_mask else None
+
+def _remove_background_safe(session, input_path: Path, output_path: Path, return_mask: bool) -> ModelResult:
+    """rembg's own pipeline for one image; the mask is applied like rembg's default cutout"""
+    try:
+        img = _load_image(input_path)
+        return _cut_out(img, rembg.remove(img, session=session, only_mask=True), output_path, return_mask)
+    except Exception as e:
+        return str(e), None
+
+def _remove_with_model(session, jobs: List[Tuple[Path, Path]], return_masks: bool = False) -> List[ModelResult]:
+    """Remove backgrounds with one ONNX call for the whole chunk when the model allows it
+    
+    Returns an error message (None on success) and, with return_masks, the
+    compressed mask per job. Falls back to one rembg.remove call per image
+    when the session cannot batch or the batched call fails.
+    """
+    
+    spec = batch_spec(session) if len(jobs) > 1 else None
+    if spec is None:
+        return [_remove_background_safe(session, input_path, output_path, return_masks)
+                for input_path, output_path in jobs]
+    
+    results: List[ModelResult] = [(None, None)] * len(jobs)
+    images = {}
+    for index, (input_path, _) in enumerate(jobs):
+        try:
+            images[index] = _load_image(input_path)
+        except Exception as e:
+            results[index] = (str(e), None)
+    if not images:
+        return results
+    
+    try:
+        masks = predict_masks(session, list(images.values()), spec)
+    except Exception as e:
+        logger.warning(f"Batched inference failed ({e}); processing {len(images)} images one at a time")
+        return [results[index] if index not in images else
+                _remove_background_safe(session, *jobs[index], return_masks) for index in range(len(jobs))]
+    
+    for (index, img), mask in zip(images.items(), masks):
+        try:
+            results[index] = _cut_out(img, mask, jobs[index][1], return_masks)
+        except Exception as e:
+            results[index] = (str(e), None)
+    return results
+
+BatchResult = Tuple[Optional[str], Dict[str, Any], Optional[bytes]]
+
+def _remove_background_batch(get_session: Callable[[], Any], jobs: List[Tuple[Path, Path]],
+                             fast_path: bool, return_masks: bool = False) -> List[BatchResult]:
+    """Try the solid-background fast path on each image, then run the model on the rest
+    
+    Returns (error message or None, decision, model mask PNG or None) per
+    job. The session is only requested when some image actually needs the
+    model.
+    """
+    
+    results: List[BatchResult] = []
+    neural = []
+    for index, (input_path, output_path) in enumerate(jobs):
+        if not fast_path:
+            results.append((None, {"method": "rembg", "reason": "fast path disabled"}, None))
+            neural.append(index)
+            continue
+        try:
+            output_img, decision = remove_solid_background(_load_image(input_path))
+            if output_img is not None:
+                _save(output_img, output_path)
+        except Exception as e:
+            results.append((str(e), {"method": "error", "reason": str(e)}, None))
+            continue
+        results.append((None, decision, None))
+        if output_img is None:
+            neural.append(index)
+    
+    if neural:
+        outcomes = _remove_with_model(get_session(), [jobs[index] for index in neural], return_masks)
+        for index, (error, mask_png) in zip(neural, outcomes):
+            results[index] = (error, results[index][1], mask_png)
+    return results
+
+# Session of a pool worker process, loaded on the first image that needs the model
+_worker_config: Tuple[str, int] = ("u2net", 0)
+_worker_session = None
+
+def _init_worker(model_name: str, intra_op_threads: int):
+    global _worker_config
+    _worker_config = (model_name, intra_op_threads)
+
+def _get_worker_session():
+    global _worker_session
+    if _worker_session is None:
+        _worker_session = create_session(*_worker_config)
+    return _worker_session
+
+def _worker_ready() -> int:
+    _get_worker_session()
+    return os.getpid()
+
+def _worker_process_batch(jobs: List[Tuple[Path, Path]], fast_path: bool,
+                          return_masks: bool) -> List[BatchResult]:
+    """Runs in a pool worker; errors are returned because worker logging is not configured,
+    and masks are returned so only the parent process writes the mask cache"""
+    return _remove_background_batch(_get_worker_session, jobs, fast_path, return_masks)
+
 class BackgroundRemover:
-    """Remove backgrounds from images using AI models"""
+    """Remove backgrounds from images using AI models
+    
+    With workers > 1, images are handed to a pool of worker processes that
+    each load the rembg session once and keep it for the pool's lifetime.
+    Each worker's ONNX intra-op thread pool defaults to its share of the
+    cores, so the workers do not oversubscribe the CPU.
     
-    def __init__(self, model_name: str = "u2net"):
-        self.model_name = model_name
-        self.logger = logging.getLogger("processor.background_remover")
+    With batch_size > 1, process_batch stacks that many images into a
+    single ONNX Runtime call (u2net and isnet models with a dynamic batch
+    dimension) and splits the masks back out.
+    
+    With fast_path, logos on a flat solid-color background are cut out
+    with a NumPy color key instead (milliseconds instead of seconds); only
+    ambiguous images reach the model. Every decision is appended to the
+    decision log (logs/bg_decisions.jsonl).
+    
+    With use_mask_cache, model masks are kept in the mask cache keyed by
+    image content and model, so processing an unchanged image again only
+    composites the cached mask.
+    """
+    
+    def __init__(self, model_name: str = None, workers: int = None,
+                 intra_op_threads: int = None, batch_size: int = None,
+                 fast_path: bool = None, use_mask_cache: bool = None):
+        self.model_name = resolve_model_name(model_name or Config.BG_MODEL)
+        self.fast_path = fast_path if fast_path is not None else Config.BG_FAST_PATH
+        self.use_mask_cache = use_mask_cache if use_mask_cache is not None else Config.MASK_CACHE_ENABLED
+        self.workers = max(1, workers if workers is not None else Config.BG_WORKERS)
+        self.batch_size = max(1, batch_size if batch_size is not None else Config.BG_BATCH_SIZE)
+        intra_op_threads = intra_op_threads if intra_op_threads is not None else Config.BG_INTRA_OP_THREADS
+        if not intra_op_threads and self.workers > 1:
+            intra_op_threads = threads_per_worker(self.workers)
+        self.intra_op_threads = intra_op_threads
+        self.logger = logger
         self._session = None
+        self._session_lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = threading.Lock()
     
     @property
     def session(self):
-        """Lazy load the rembg session"""
+        """Lazy load the rembg session (once, even with several worker threads)"""
         if self._session is None:
-            self.logger.info(f"Loading background removal model: {self.model_name}")
-            self._session = rembg.new_session(self.model_name)
-            self.logger.info("Background removal model loaded")
+            with self._session_lock:
+                if self._session is None:
+                    self.logger.info(f"Loading background removal model: {self.model_name}")
+                    self._session = create_session(self.model_name, self.intra_op_threads)
+                    self.logger.info("Background removal model loaded")
         return self._session
     
+    @property
+    def pool(self):
+        """Worker process pool, started on first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self.logger.info(f"Starting {self.workers} background removal workers "
+                                     f"({self.intra_op_threads} ONNX threads each)")
+                    self._pool = create_process_pool(self.workers, _init_worker,
+                                                     (self.model_name, self.intra_op_threads))
+        return self._pool
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the model (or its worker pool) has been loaded"""
+        return self._session is not None or self._pool is not None
+    
+    def warm_up(self):
+        """Load the model now (in every worker when pooled) instead of on the first image"""
+        if self.workers > 1:
+            futures = [self.pool.submit(_worker_ready) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+        else:
+            self.session
+    
+    def close(self):
+        """Stop the worker processes"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next pooled call starts a fresh one (unless another thread already has)"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+    
     def process_image(self, input_path: Path, output_path: Path) -> bool:
         """Remove background from a single image"""
         try:
-            with Image.open(input_path) as img:
-                # Convert to RGB if necessary
-                if img.mode not in ('RGB', 'RGBA'):
-                    img = img.convert('RGB')
-                
-                # Remove background
-                output_img = rembg.remove(img, session=self.session)
-                
-                # Ensure output directory exists
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Save as PNG to preserve transparency
-                output_img.save(output_path, 'PNG', optimize=True)
+            job, keys = self._serve_cached([(input_path, output_path)])
+            if not job:
+                return True
+            results = None
+            if self.workers > 1:
+                pool = self.pool
+                try:
+                    results = pool.submit(_worker_process_batch, job, self.fast_path, bool(keys)).result()
+                except BrokenProcessPool as e:
+                    self.logger.error(f"Background removal workers died ({e}); "
+                                      f"processing {input_path.name} in-process")
+                    self._discard_pool(pool)
+            if results is None:
+                results = _remove_background_batch(lambda: self.session, job, self.fast_path, bool(keys))
+            (error, decision, mask_png), = results
+            self._record(input_path, output_path, error, decision)
+            self._cache_mask(keys.get(input_path), mask_png)
+            if error is not None:
+                raise RuntimeError(error)
                 
-            self.logger.info(f"Background removed: {input_path.name} -> {output_path.name}")
+            self.logger.info(f"Background removed ({decision['method']}): {input_path.name} -> {output_path.name}")
             return True
             
         except Exception as e:
@@ -53,18 +270,107 @@ class BackgroundRemover:
     def process_batch(self, input_paths: List[Path], output_dir: Path) -> List[Path]:
         """Process multiple images, returning list of successful outputs"""
         
-        successful_outputs = []
+        # Generate output filenames with _nobg suffix
+        jobs = [(input_path, output_dir / f"{input_path.stem}_nobg.png") for input_path in input_paths]
         
-        for input_path in input_paths:
-            # Generate output filename with _nobg suffix
-            output_filename = f"{input_path.stem}_nobg.png"
-            output_path = output_dir / output_filename
-            
-            if self.process_image(input_path, output_path):
-                successful_outputs.append(output_path)
+        if self.batch_size > 1 or (self.workers > 1 and len(jobs) > 1):
+            succeeded = self._process_chunks(jobs)
+        else:
+            succeeded = {input_path for input_path, output_path in jobs
+                         if self.process_image(input_path, output_path)}
+        if self.use_mask_cache:
+            mask_cache.save()
+        
+        # Keep input order regardless of completion order
+        successful_outputs = [output_path for input_path, output_path in jobs if input_path in succeeded]
         
         self.logger.info(f"Background removal complete: {len(successful_outputs)}/{len(input_paths)} successful")
         return successful_outputs
+    
+    def _process_chunks(self, jobs: List[Tuple[Path, Path]]) -> set:
+        """Run batch_size chunks in-process or on the worker pool; falls back to in-process if the pool breaks"""
+        
+        remaining, keys = self._serve_cached(jobs)
+        succeeded = {input_path for input_path, _ in jobs} - {input_path for input_path, _ in remaining}
+        chunks = [remaining[i:i + self.batch_size] for i in range(0, len(remaining), self.batch_size)]
+        return_masks = bool(keys)
+        
+        def collect(chunk: List[Tuple[Path, Path]], results: List[BatchResult]):
+            for (input_path, output_path), (error, decision, mask_png) in zip(chunk, results):
+                self._record(input_path, output_path, error, decision)
+                self._cache_mask(keys.get(input_path), mask_png)
+                if error is None:
+                    succeeded.add(input_path)
+                    self.logger.info(f"Background removed ({decision['method']}): "
+                                     f"{input_path.name} -> {output_path.name}")
+                else:
+                    self.logger.error(f"Failed to remove background from {input_path.name}: {error}")
+        
+        if self.workers == 1:
+            for chunk in chunks:
+                collect(chunk, _remove_background_batch(lambda: self.session, chunk, self.fast_path, return_masks))
+            return succeeded
+        
+        pending = set(range(len(chunks)))
+        pool = self.pool
+        try:
+            futures = {pool.submit(_worker_process_batch, chunk, self.fast_path, return_masks): index
+                       for index, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                index = futures[future]
+                collect(chunks[index], future.result())
+                pending.discard(index)
+        except BrokenProcessPool as e:
+            self.logger.error(f"Background removal workers died ({e}); "
+                              f"processing {len(pending)} remaining chunks in-process")
+            self._discard_pool(pool)
+            for index in sorted(pending):
+                collect(chunks[index], _remove_background_batch(lambda: self.session, chunks[index],
+                                                                self.fast_path, return_masks))
+        return succeeded
+    
+    def _serve_cached(self, jobs: List[Tuple[Path, Path]]) -> Tuple[List[Tuple[Path, Path]], Dict[Path, str]]:
+        """Composite cached masks in this process
+        
+        Returns the jobs that still need processing and the mask cache key of
+        each, so their model masks can be stored afterwards.
+        """
+        
+        if not self.use_mask_cache:
+            return jobs, {}
+        
+        remaining = []
+        keys = {}
+        for input_path, output_path in jobs:
+            try:
+                key = mask_cache.key(input_path, self.model_name)
+                mask = mask_cache.lookup(key)
+                if mask is not None:
+                    img = _load_image(input_path)
+                    if mask.size == img.size:
+                        _save(cutout(img, mask), output_path)
+                        self._record(input_path, output_path, None, {"method": "mask_cache", "reason": "cached mask"})
+                        self.logger.info(f"Background removed (mask_cache): {input_path.name} -> {output_path.name}")
+                        continue
+                keys[input_path] = key
+            except Exception as e:
+                self.logger.warning(f"Mask cache lookup failed for {input_path.name}: {e}")
+            remaining.append((input_path, output_path))
+        return remaining, keys
+    
+    def _cache_mask(self, key: Optional[str], mask_png: Optional[bytes]):
+        if key is not None and mask_png is not None:
+            mask_cache.store_mask(key, mask_png, self.model_name)
+    
+    def _record(self, input_path: Path, output_path: Path, error: Optional[str], decision: Dict[str, Any]):
+        """Append the image's fast-path/model decision to the decision log"""
+        if error is not None:
+            decision = {**decision, "error": error}
+        try:
+            decision_log.record(input_path, None if error else output_path, decision)
+        except Exception as e:
+            self.logger.warning(f"Failed to record background removal decision: {e}")
+
 
 # src/processors/ico_converter.py
 """
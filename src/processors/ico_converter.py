@@ -4,95 +4,144 @@ ICO file converter using Pillow
 """
 
 import logging
+import time
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from PIL import Image
 
+from ..core.config import Config
+from ..utils.parallel_utils import map_processes, resolve_jobs
+from .ico_encoder import ICO_ENCODINGS, write_compact_ico
+from .ico_header import read_ico_frames
+from .resampling import build_pyramid
+
+def write_ico(frames: Dict[int, Image.Image], output_path: Path):
+    """Write prepared square frames as an ICO
+
+    Pillow uses a provided image as-is when its size matches a requested
+    size, so the frames are stored without being resampled again. The
+    largest frame is the base image because Pillow skips sizes above it.
+    """
+
+    sizes = sorted(frames)
+    base = frames[sizes[-1]]
+    base.save(
+        output_path,
+        format='ICO',
+        sizes=[(size, size) for size in sizes],
+        append_images=[frames[size] for size in sizes[:-1]]
+    )
+
+def save_ico(frames: Dict[int, Image.Image], output_path: Path, encoding: str = "standard") -> int:
+    """Write frames with an ICO_ENCODINGS encoding; returns bytes saved versus standard"""
+    if encoding == "compact":
+        return write_compact_ico(frames, output_path)
+    write_ico(frames, output_path)
+    return 0
+
 class ICOConverter:
     """Convert images to ICO format with multiple sizes"""
     
-    def __init__(self, ico_sizes: List[int] = None):
+    def __init__(self, ico_sizes: List[int] = None, encoding: str = None):
         self.ico_sizes = ico_sizes or [16, 32, 48, 64, 128, 256]
+        self.encoding = encoding or Config.ICO_ENCODING
+        if self.encoding not in ICO_ENCODINGS:
+            raise ValueError(f"Unknown ICO encoding '{self.encoding}' (choose from {', '.join(ICO_ENCODINGS)})")
         self.logger = logging.getLogger("processor.ico_converter")
     
     def convert_image(self, input_path: Path, output_path: Path) -> bool:
         """Convert single image to ICO format"""
         try:
-            with Image.open(input_path) as img:
-                # Convert to RGBA for transparency support
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-                
-                # Create different sizes
-                resized_images = []
-                
-                for size in self.ico_sizes:
-                    # Resize maintaining aspect ratio
-                    resized = img.resize((size, size), Image.Resampling.LANCZOS)
-                    resized_images.append(resized)
-                
-                # Ensure output directory exists
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Save as ICO with multiple sizes
-                img.save(
-                    output_path, 
-                    format='ICO', 
-                    sizes=[(size, size) for size in self.ico_sizes],
-                    append_images=resized_images[1:] if len(resized_images) > 1 else None
-                )
-                
-            self.logger.info(f"ICO created: {input_path.name} -> {output_path.name}")
+            saved = self._convert(input_path, output_path)
+            self._log_created(input_path, output_path, saved)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to convert {input_path.name} to ICO: {e}")
             return False
     
-    def convert_batch(self, input_paths: List[Path], output_dir: Path) -> List[Path]:
-        """Convert multiple images to ICO format"""
+    def _convert(self, input_path: Path, output_path: Path) -> int:
+        """Write the ICO, raising on failure (also runs in worker processes); returns bytes saved"""
         
-        successful_outputs = []
+        # Decode once; every size comes from the halving pyramid
+        with Image.open(input_path) as img:
+            frames = build_pyramid(img, self.ico_sizes)
         
-        for input_path in input_paths:
-            # Generate output filename
-            output_filename = f"{input_path.stem}.ico"
-            output_path = output_dir / output_filename
-            
-            if self.convert_image(input_path, output_path):
+        # Ensure output directory exists
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        return save_ico(frames, output_path, self.encoding)
+    
+    def _log_created(self, input_path: Path, output_path: Path, saved: int):
+        if self.encoding == "compact":
+            size_kb = output_path.stat().st_size / 1024
+            self.logger.info(f"ICO created: {input_path.name} -> {output_path.name} "
+                             f"({size_kb + saved / 1024:.1f} KB -> {size_kb:.1f} KB, {saved} bytes saved)")
+        else:
+            self.logger.info(f"ICO created: {input_path.name} -> {output_path.name}")
+    
+    def convert_batch(self, input_paths: List[Path], output_dir: Path, jobs: int = None) -> List[Path]:
+        """Convert multiple images to ICO format over ``jobs`` worker processes (default: PROCESS_JOBS)"""
+        
+        # Generate output filenames
+        conversions = [(input_path, output_dir / f"{input_path.stem}.ico") for input_path in input_paths]
+        outcomes = map_processes(self._convert, conversions, resolve_jobs(jobs, Config.PROCESS_JOBS))
+        
+        # Results come back in input order; a failed image does not affect the others
+        successful_outputs = []
+        total_saved = 0
+        for (input_path, output_path), (saved, error) in zip(conversions, outcomes):
+            if error is None:
                 successful_outputs.append(output_path)
+                total_saved += saved
+                self._log_created(input_path, output_path, saved)
+            else:
+                self.logger.error(f"Failed to convert {input_path.name} to ICO: {error}")
         
-        self.logger.info(f"ICO conversion complete: {len(successful_outputs)}/{len(input_paths)} successful")
+        savings = f", {total_saved / 1024:.1f} KB saved by compact encoding" if self.encoding == "compact" else ""
+        self.logger.info(f"ICO conversion complete: {len(successful_outputs)}/{len(input_paths)} successful{savings}")
         return successful_outputs
     
     def verify_ico(self, ico_path: Path) -> bool:
-        """Verify ICO file is valid and report sizes"""
+        """Verify ICO file is valid and report sizes (reads headers only)"""
         try:
-            with Image.open(ico_path) as img:
-                # ICO files can contain multiple images
-                sizes_found = []
-                
-                try:
-                    # Try to get all sizes
-                    for i in range(100):  # Arbitrary limit
-                        img.seek(i)
-                        sizes_found.append(img.size)
-                except EOFError:
-                    # Normal - reached end of ICO frames
-                    pass
-                
-                self.logger.info(f"ICO verified: {ico_path.name} contains {len(sizes_found)} sizes: {sizes_found}")
-                return True
+            frames = read_ico_frames(ico_path)
+            sizes_found = [(frame["width"], frame["height"]) for frame in frames]
+            self.logger.info(f"ICO verified: {ico_path.name} contains {len(sizes_found)} sizes: {sizes_found}")
+            return True
                 
         except Exception as e:
             self.logger.error(f"ICO verification failed for {ico_path.name}: {e}")
             return False
     
+    def verify_batch(self, ico_paths: List[Path]) -> Dict[str, Any]:
+        """Check many ICOs from their headers; each must hold every size in ico_sizes"""
+        
+        start = time.perf_counter()
+        invalid = {}
+        for ico_path in ico_paths:
+            try:
+                sizes = {frame["width"] for frame in read_ico_frames(ico_path)}
+                missing = [size for size in self.ico_sizes if size not in sizes]
+                if missing:
+                    invalid[str(ico_path)] = f"missing sizes {missing}"
+            except Exception as e:
+                invalid[str(ico_path)] = str(e)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        for path, error in invalid.items():
+            self.logger.error(f"ICO verification failed for {Path(path).name}: {error}")
+        self.logger.info(f"ICO verification: {len(ico_paths) - len(invalid)}/{len(ico_paths)} valid "
+                         f"in {elapsed_ms:.1f} ms")
+        return {"checked": len(ico_paths), "valid": len(ico_paths) - len(invalid),
+                "invalid": invalid, "elapsed_ms": round(elapsed_ms, 2)}
+    
     def get_ico_info(self, ico_path: Path) -> dict:
-        """Get detailed information about ICO file"""
+        """Get detailed information about ICO file (frame sizes, bit depths, PNG/BMP encoding, offsets)"""
         info = {
             "valid": False,
             "sizes": [],
+            "frames": [],
             "file_size_kb": 0,
             "format": None
         }
@@ -101,18 +150,10 @@ class ICOConverter:
             if ico_path.exists():
                 info["file_size_kb"] = ico_path.stat().st_size / 1024
                 
-                with Image.open(ico_path) as img:
-                    info["format"] = img.format
-                    
-                    # Get all sizes in the ICO
-                    try:
-                        for i in range(100):
-                            img.seek(i)
-                            info["sizes"].append(img.size)
-                    except EOFError:
-                        pass
-                    
-                    info["valid"] = len(info["sizes"]) > 0
+                info["frames"] = read_ico_frames(ico_path)
+                info["format"] = "ICO"
+                info["sizes"] = [(frame["width"], frame["height"]) for frame in info["frames"]]
+                info["valid"] = len(info["sizes"]) > 0
                     
         except Exception as e:
             self.logger.error(f"Failed to get ICO info for {ico_path}: {e}")
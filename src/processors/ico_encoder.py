@@ -0,0 +1,100 @@
+# src/processors/ico_encoder.py
+"""
+Size-optimized ICO encoding (smallest PNG encoding per frame, palettized where it is lossless enough)
+"""
+
+import io
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from ..core.config import Config
+from .ico_header import ICONDIR, ICONDIRENTRY
+
+ICO_ENCODINGS = ["standard", "compact"]
+
+def _png(img: Image.Image, **params) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG", **params)
+    return buffer.getvalue()
+
+def exact_palette(frame: Image.Image) -> Optional[Image.Image]:
+    """Lossless P-mode copy of an RGBA frame with at most 256 distinct colors, else None
+
+    Palette entries are ordered by alpha so the PNG tRNS chunk stops at
+    the last translucent entry.
+    """
+    pixels = np.ascontiguousarray(np.asarray(frame)).view(np.uint32).reshape(-1)
+    colors, index = np.unique(pixels, return_inverse=True)
+    if len(colors) > 256:
+        return None
+    rgba = colors.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(rgba[:, 3], kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    palettized = Image.fromarray(rank[index].reshape(frame.height, frame.width).astype(np.uint8), "P")
+    palettized.putpalette(rgba[order].tobytes(), "RGBA")
+    return palettized
+
+def palette_error(frame: Image.Image, palettized: Image.Image) -> float:
+    """Worst of the mean premultiplied-color and mean alpha differences (0-255 scale)"""
+    original = np.asarray(frame, dtype=np.float32)
+    restored = np.asarray(palettized.convert("RGBA"), dtype=np.float32)
+    color_error = np.abs(original[..., :3] * original[..., 3:] - restored[..., :3] * restored[..., 3:]).mean() / 255
+    alpha_error = np.abs(original[..., 3] - restored[..., 3]).mean()
+    return float(max(color_error, alpha_error))
+
+def encode_frame(frame: Image.Image, max_palette_error: float = None) -> tuple:
+    """(standard PNG, smallest PNG) for one RGBA frame
+
+    The standard encoding is what Pillow's ICO writer stores. Candidates
+    are that, an optimized RGBA PNG, an exact palette when the frame has
+    at most 256 colors, and a 256-color octree palette (alpha-aware) when
+    its mean error stays within max_palette_error.
+    """
+
+    max_palette_error = max_palette_error if max_palette_error is not None else Config.ICO_PALETTE_MAX_ERROR
+    standard = _png(frame)
+    candidates = [standard, _png(frame, optimize=True)]
+
+    palettized = exact_palette(frame)
+    if palettized is None:
+        palettized = frame.quantize(256, method=Image.Quantize.FASTOCTREE)
+        if palette_error(frame, palettized) > max_palette_error:
+            palettized = None
+    if palettized is not None:
+        candidates.append(_png(palettized, optimize=True))
+
+    return standard, min(candidates, key=len)
+
+def write_compact_ico(frames: Dict[int, Image.Image], output_path: Path,
+                      max_palette_error: float = None) -> int:
+    """Write frames as an ICO of each frame's smallest PNG; returns bytes saved versus the standard writer
+
+    Every frame is PNG-compressed (as Pillow's writer also does), so the
+    directory and header are the same size either way and the saving is
+    the difference in frame data. Sizes above 256 are skipped, as ICO
+    cannot store them.
+    """
+
+    sizes = [size for size in sorted(frames) if size <= 256]
+    blobs: List[bytes] = []
+    saved = 0
+    for size in sizes:
+        standard, compact = encode_frame(frames[size], max_palette_error)
+        blobs.append(compact)
+        saved += len(standard) - len(compact)
+
+    offset = ICONDIR.size + ICONDIRENTRY.size * len(blobs)
+    with open(output_path, "wb") as f:
+        f.write(ICONDIR.pack(0, 1, len(blobs)))
+        for size, blob in zip(sizes, blobs):
+            # 0 means 256; PNG frames declare 32 bits like Pillow's writer does
+            dimension = size if size < 256 else 0
+            f.write(ICONDIRENTRY.pack(dimension, dimension, 0, 0, 1, 32, len(blob), offset))
+            offset += len(blob)
+        for blob in blobs:
+            f.write(blob)
+    return saved
@@ -0,0 +1,82 @@
+# src/processors/ico_header.py
+"""
+ICO directory reader that lists frames without decoding any pixels
+"""
+
+import struct
+from pathlib import Path
+from typing import Any, Dict, List
+
+# ICONDIR: reserved (0), type (1 = icon), frame count
+ICONDIR = struct.Struct("<HHH")
+# ICONDIRENTRY: width, height (0 = 256), palette colors, reserved, planes, bit count, bytes, offset
+ICONDIRENTRY = struct.Struct("<BBBBHHII")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Channels per PNG color type (gray, RGB, palette, gray + alpha, RGBA)
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Enough of a frame to read a PNG IHDR (8 + 8 + 13) or a BITMAPINFOHEADER's bit count (16)
+_FRAME_HEAD = 29
+
+class ICOFormatError(ValueError):
+    """The file is not a well-formed ICO"""
+
+def _frame_format(head: bytes, entry_bits: int) -> tuple:
+    """(encoding, bits per pixel) from the first bytes of a frame"""
+    if head.startswith(PNG_SIGNATURE):
+        if len(head) < _FRAME_HEAD or head[12:16] != b"IHDR":
+            raise ICOFormatError("PNG frame without an IHDR chunk")
+        bit_depth, color_type = head[24], head[25]
+        if color_type not in PNG_CHANNELS:
+            raise ICOFormatError(f"PNG frame with unknown color type {color_type}")
+        # IHDR is authoritative: writers declare 32 bits even for palettized PNG frames
+        return "png", bit_depth * PNG_CHANNELS[color_type]
+
+    if len(head) < 16 or struct.unpack_from("<I", head)[0] < 16:
+        raise ICOFormatError("frame is neither PNG nor a DIB with a BITMAPINFOHEADER")
+    return "bmp", entry_bits or struct.unpack_from("<H", head, 14)[0]
+
+def read_ico_frames(ico_path: Path) -> List[Dict[str, Any]]:
+    """Size, bit depth, encoding (png/bmp) and byte range of every frame
+
+    Reads the ICONDIR, its entries and the first few bytes of each frame
+    (the PNG signature and IHDR, or the DIB header), so it costs a handful
+    of small reads per file. Raises ICOFormatError for a bad header, a
+    truncated directory or a frame outside the file.
+    """
+
+    file_size = ico_path.stat().st_size
+    with open(ico_path, "rb") as f:
+        header = f.read(ICONDIR.size)
+        if len(header) < ICONDIR.size:
+            raise ICOFormatError("file too short for an ICO header")
+        reserved, kind, count = ICONDIR.unpack(header)
+        if reserved != 0 or kind != 1:
+            raise ICOFormatError("not an ICO file (bad ICONDIR header)")
+        if count == 0:
+            raise ICOFormatError("ICO contains no frames")
+
+        directory = f.read(count * ICONDIRENTRY.size)
+        if len(directory) < count * ICONDIRENTRY.size:
+            raise ICOFormatError(f"directory truncated ({count} entries declared)")
+
+        frames = []
+        for index in range(count):
+            width, height, colors, _, planes, bit_count, size, offset = \
+                ICONDIRENTRY.unpack_from(directory, index * ICONDIRENTRY.size)
+            if offset < ICONDIR.size + count * ICONDIRENTRY.size or offset + size > file_size:
+                raise ICOFormatError(f"frame {index} lies outside the file (offset {offset}, {size} bytes)")
+
+            f.seek(offset)
+            encoding, bits = _frame_format(f.read(min(size, _FRAME_HEAD)), bit_count)
+            frames.append({
+                "width": width or 256,
+                "height": height or 256,
+                "bit_count": bits,
+                "colors": colors,
+                "encoding": encoding,
+                "offset": offset,
+                "bytes": size
+            })
+    return frames
@@ -0,0 +1,152 @@
+# src/processors/icon_exporter.py
+"""
+Multi-format icon export (ICO, ICNS, favicon set, PNG sizes, WebP) from a single decode
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageColor, features
+
+from ..core.config import Config
+from ..utils.parallel_utils import map_processes, resolve_jobs
+from .ico_converter import save_ico
+from .resampling import build_pyramid
+
+EXPORT_FORMATS = ["ico", "icns", "favicon", "apple-touch", "manifest", "webp"]
+
+FAVICON_SIZES = [16, 32, 48]
+ICNS_SIZES = [32, 64, 128, 256, 512, 1024]  # every size Pillow's ICNS writer stores
+APPLE_TOUCH_SIZE = 180
+MANIFEST_SIZES = [192, 512]
+WEBP_SIZES = [192, 512]
+
+def parse_formats(formats: str) -> List[str]:
+    """Validated list of export formats from a comma-separated string"""
+    names = [name.strip().lower() for name in formats.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s) {', '.join(unknown)} "
+                         f"(choose from {', '.join(EXPORT_FORMATS)})")
+    return names
+
+def frame_sizes(formats: List[str], ico_sizes: List[int]) -> List[int]:
+    """Every frame size the requested formats need, so each is resampled once"""
+    sizes = set()
+    if "ico" in formats:
+        sizes.update(ico_sizes)
+    if "icns" in formats:
+        sizes.update(ICNS_SIZES)
+    if "favicon" in formats:
+        sizes.update(FAVICON_SIZES)
+    if "apple-touch" in formats:
+        sizes.add(APPLE_TOUCH_SIZE)
+    if "manifest" in formats:
+        sizes.update(MANIFEST_SIZES)
+    if "webp" in formats:
+        sizes.update(WEBP_SIZES)
+    return sorted(sizes)
+
+def _save_png(frame: Image.Image, path: Path):
+    frame.save(path, "PNG", optimize=True)
+
+def export_icons(input_path: Path, output_dir: Path, formats: List[str], ico_sizes: List[int],
+                 webp_quality: int, touch_background: str = "", ico_encoding: str = "standard") -> List[Path]:
+    """Decode the source once, resample every size once and write each format from those frames
+
+    Returns the files written. The apple-touch icon is flattened onto
+    touch_background when one is given, since iOS fills transparency with
+    black.
+    """
+
+    with Image.open(input_path) as img:
+        frames = build_pyramid(img, frame_sizes(formats, ico_sizes))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    def target(name: str) -> Path:
+        path = output_dir / name
+        written.append(path)
+        return path
+
+    def subset(sizes: List[int]) -> Dict[int, Image.Image]:
+        return {size: frames[size] for size in sizes}
+
+    if "ico" in formats:
+        save_ico(subset(ico_sizes), target(f"{input_path.stem}.ico"), ico_encoding)
+    if "icns" in formats:
+        frames[ICNS_SIZES[-1]].save(target(f"{input_path.stem}.icns"), format="ICNS",
+                                    append_images=[frames[size] for size in ICNS_SIZES])
+    if "favicon" in formats:
+        save_ico(subset(FAVICON_SIZES), target("favicon.ico"), ico_encoding)
+    if "apple-touch" in formats:
+        touch = frames[APPLE_TOUCH_SIZE]
+        if touch_background:
+            background = Image.new("RGBA", touch.size, ImageColor.getrgb(touch_background))
+            touch = Image.alpha_composite(background, touch).convert("RGB")
+        _save_png(touch, target("apple-touch-icon.png"))
+    if "manifest" in formats:
+        for size in MANIFEST_SIZES:
+            _save_png(frames[size], target(f"icon-{size}.png"))
+    if "webp" in formats:
+        for size in WEBP_SIZES:
+            frames[size].save(target(f"icon-{size}.webp"), "WEBP", quality=webp_quality, method=4)
+    return written
+
+class IconExporter:
+    """Export each source image as icons for Windows, macOS and the web
+
+    Every image gets its own directory (<stem>/) holding the ICO, ICNS,
+    favicon.ico, apple-touch-icon.png, icon-<size>.png manifest icons and
+    icon-<size>.webp variants, all written from one decode and one set of
+    pyramid frames. Batches are spread over worker processes.
+    """
+
+    def __init__(self, formats: List[str] = None, ico_sizes: List[int] = None, workers: int = None):
+        self.formats = formats or parse_formats(Config.EXPORT_FORMATS)
+        self.ico_sizes = ico_sizes or Config.ICO_SIZES
+        self.workers = resolve_jobs(workers, Config.EXPORT_WORKERS)
+        self.webp_quality = Config.EXPORT_WEBP_QUALITY
+        self.touch_background = Config.EXPORT_TOUCH_BACKGROUND
+        self.ico_encoding = Config.ICO_ENCODING
+        self.logger = logging.getLogger("processor.icon_exporter")
+
+        if "webp" in self.formats and not features.check("webp"):
+            self.logger.warning("Pillow was built without WebP support; skipping WebP export")
+            self.formats = [name for name in self.formats if name != "webp"]
+
+    def _args(self, input_path: Path, output_root: Path) -> tuple:
+        return (input_path, output_root / input_path.stem, self.formats, self.ico_sizes,
+                self.webp_quality, self.touch_background, self.ico_encoding)
+
+    def export_image(self, input_path: Path, output_root: Path) -> Optional[Path]:
+        """Export one image; returns its output directory"""
+        try:
+            written, error = export_icons(*self._args(input_path, output_root)), None
+        except Exception as e:
+            written, error = [], str(e)
+        return self._report(input_path, output_root / input_path.stem, written, error)
+
+    def export_batch(self, input_paths: List[Path], output_root: Path, jobs: int = None) -> List[Path]:
+        """Export multiple images over ``jobs`` worker processes (default: EXPORT_WORKERS),
+        returning the output directories in input order"""
+
+        outcomes = map_processes(export_icons, [self._args(input_path, output_root) for input_path in input_paths],
+                                 resolve_jobs(jobs, self.workers))
+
+        outputs = [self._report(input_path, output_root / input_path.stem, written, error)
+                   for input_path, (written, error) in zip(input_paths, outcomes)]
+        successful_outputs = [output for output in outputs if output is not None]
+
+        self.logger.info(f"Icon export complete: {len(successful_outputs)}/{len(input_paths)} successful")
+        return successful_outputs
+
+    def _report(self, input_path: Path, output_dir: Path, written: Optional[List[Path]],
+                error: Optional[str]) -> Optional[Path]:
+        if error is not None:
+            self.logger.error(f"Failed to export icons for {input_path.name}: {error}")
+            return None
+        self.logger.info(f"Icons exported: {input_path.name} -> {output_dir.name}/ ({len(written)} files)")
+        return output_dir
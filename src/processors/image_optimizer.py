@@ -3,10 +3,59 @@
 Image optimization processor
 """
 
+import io
+import math
 import logging
+import threading
+from functools import partial
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
-from PIL import Image, ImageEnhance
+from PIL import Image, ImageEnhance, ImageFile
+
+from ..core.config import Config
+from ..utils.parallel_utils import map_processes, resolve_jobs
+
+# Pillow format per output suffix (anything else is written as PNG)
+OUTPUT_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP", ".avif": "AVIF"}
+# Lossy formats whose quality is searched against max_size_kb
+LOSSY_FORMATS = {"JPEG", "WEBP", "AVIF"}
+# Chroma subsampling per format, sharpest first (None = encoder default)
+SUBSAMPLING = {"JPEG": ["4:4:4", "4:2:0"], "AVIF": ["4:4:4", "4:2:0"]}
+# Granularity of the quality search
+QUALITY_STEP = 5
+
+# Pillow sizes the optimized-JPEG buffer from the pixel count, which detailed images at
+# 4:4:4 or high quality outgrow when saving to memory; ImageFile.MAXBLOCK is global
+_MAXBLOCK_LOCK = threading.Lock()
+
+def encode_image(img: Image.Image, image_format: str, quality: int = None,
+                 subsampling: Optional[str] = None) -> bytes:
+    """Encode into memory with the optimizer's settings for each format"""
+    params: Dict[str, Any] = {}
+    if image_format in ("PNG", "JPEG"):
+        params["optimize"] = True
+    if image_format in LOSSY_FORMATS:
+        params["quality"] = quality
+    if image_format == "WEBP":
+        params["method"] = 4
+    if subsampling is not None:
+        params["subsampling"] = subsampling
+    buffer = io.BytesIO()
+    try:
+        img.save(buffer, image_format, **params)
+    except OSError:
+        if image_format != "JPEG":
+            raise
+        # "broken data stream": retry with room for a stream larger than the raw pixels
+        buffer = io.BytesIO()
+        with _MAXBLOCK_LOCK:
+            previous = ImageFile.MAXBLOCK
+            ImageFile.MAXBLOCK = max(previous, 4 * img.width * img.height)
+            try:
+                img.save(buffer, image_format, **params)
+            finally:
+                ImageFile.MAXBLOCK = previous
+    return buffer.getvalue()
 
 class ImageOptimizer:
     """Optimize images for size and quality"""
@@ -19,53 +68,59 @@ class ImageOptimizer:
                       enhance: bool = False) -> bool:
         """Optimize single image for file size and optionally enhance"""
         try:
-            with Image.open(input_path) as img:
-                original_size = input_path.stat().st_size / 1024
-                
-                # Apply enhancements if requested
-                if enhance:
-                    img = self._enhance_image(img)
-                
-                # Convert to RGB if needed (for JPEG optimization)
-                if img.mode in ('RGBA', 'LA'):
-                    # Keep RGBA for PNG, convert to RGB for JPEG
-                    if output_path.suffix.lower() in ['.jpg', '.jpeg']:
-                        # Create white background for JPEG
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                        img = background
-                
-                # Ensure output directory exists
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Determine format and optimize
-                if output_path.suffix.lower() == '.png':
-                    img.save(output_path, 'PNG', optimize=True)
-                elif output_path.suffix.lower() in ['.jpg', '.jpeg']:
-                    img.save(output_path, 'JPEG', quality=quality, optimize=True)
-                else:
-                    # Default to PNG
-                    output_path = output_path.with_suffix('.png')
-                    img.save(output_path, 'PNG', optimize=True)
-                
-                # Check file size
-                file_size_kb = output_path.stat().st_size / 1024
-                compression_ratio = (original_size - file_size_kb) / original_size * 100
-                
-                self.logger.info(f"Optimized: {input_path.name} -> {output_path.name} "
-                               f"({original_size:.1f} KB -> {file_size_kb:.1f} KB, "
-                               f"{compression_ratio:.1f}% reduction)")
-                
-                # If still too large, try reducing quality/size
-                if file_size_kb > max_size_kb and output_path.suffix.lower() in ['.jpg', '.jpeg']:
-                    self._reduce_quality(output_path, max_size_kb, quality)
-                
-                return True
+            self._log_result(input_path, *self._optimize(input_path, output_path, max_size_kb, quality, enhance))
+            return True
                 
         except Exception as e:
             self.logger.error(f"Failed to optimize {input_path.name}: {e}")
             return False
     
+    def _optimize(self, input_path: Path, output_path: Path, max_size_kb: int = 500,
+                  quality: int = 85, enhance: bool = False) -> Tuple[Path, float, float]:
+        """Write the optimized image, raising on failure (also runs in worker processes)
+        
+        Returns (output path, original KB, optimized KB).
+        """
+        with Image.open(input_path) as img:
+            original_size = input_path.stat().st_size / 1024
+            
+            # Apply enhancements if requested
+            if enhance:
+                img = self._enhance_image(img)
+            
+            # Default to PNG for unknown suffixes
+            image_format = OUTPUT_FORMATS.get(output_path.suffix.lower())
+            if image_format is None:
+                image_format = "PNG"
+                output_path = output_path.with_suffix('.png')
+            
+            # Convert to RGB if needed (for JPEG optimization)
+            if img.mode in ('RGBA', 'LA'):
+                # Keep RGBA for PNG, WebP and AVIF, convert to RGB for JPEG
+                if image_format == "JPEG":
+                    # Create white background for JPEG
+                    background = Image.new('RGB', img.size, (255, 255, 255))
+                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                    img = background
+            
+            # Ensure output directory exists
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Encode in memory (searching quality for lossy formats) and write once
+            if image_format in LOSSY_FORMATS:
+                data = self._fit_quality(img, image_format, max_size_kb, quality, output_path.name)
+            else:
+                data = encode_image(img, image_format)
+            output_path.write_bytes(data)
+            
+            return output_path, original_size, len(data) / 1024
+    
+    def _log_result(self, input_path: Path, output_path: Path, original_size: float, file_size_kb: float):
+        compression_ratio = (original_size - file_size_kb) / original_size * 100
+        self.logger.info(f"Optimized: {input_path.name} -> {output_path.name} "
+                       f"({original_size:.1f} KB -> {file_size_kb:.1f} KB, "
+                       f"{compression_ratio:.1f}% reduction)")
+    
     def _enhance_image(self, img: Image.Image) -> Image.Image:
         """Apply enhancements to improve image quality"""
         try:
@@ -87,23 +142,73 @@ class ImageOptimizer:
             self.logger.warning(f"Failed to enhance image: {e}")
             return img
     
-    def _reduce_quality(self, image_path: Path, max_size_kb: int, initial_quality: int):
-        """Reduce JPEG quality to meet size requirements"""
+    def _fit_quality(self, img: Image.Image, image_format: str, max_size_kb: int,
+                     quality: int, name: str) -> bytes:
+        """Encoding at a high quality that fits max_size_kb, in at most OPTIMIZE_MAX_ENCODES encodes
+        
+        The requested quality is encoded first with the smallest chroma
+        subsampling. If it fits with room for sharper chroma (half the budget
+        or less) and OPTIMIZE_SUBSAMPLING_SEARCH is on, 4:4:4 is tried too.
+        Otherwise OPTIMIZE_MIN_QUALITY is encoded to bracket the target, and
+        the remaining encodes interpolate quality against log size between
+        the closest fitting and too-large candidates, rounded down to a
+        QUALITY_STEP step. A candidate the encoder fails on counts as too
+        large; when nothing fits, the smallest encoding produced is returned.
+        """
+        max_bytes = max_size_kb * 1024
+        budget = max(2, Config.OPTIMIZE_MAX_ENCODES)
+        options = SUBSAMPLING.get(image_format, [None])
+        subsampling = options[-1]
+        
+        first = self._try_encode(img, image_format, quality, subsampling, name)
+        if first is not None and len(first) <= max_bytes:
+            if Config.OPTIMIZE_SUBSAMPLING_SEARCH and len(options) > 1 and 2 * len(first) <= max_bytes:
+                sharp = self._try_encode(img, image_format, quality, options[0], name)
+                if sharp is not None and len(sharp) <= max_bytes:
+                    return sharp
+            return first
+        
+        lowest = min(Config.OPTIMIZE_MIN_QUALITY, quality)
+        floor = first if lowest == quality else self._try_encode(img, image_format, lowest, subsampling, name)
+        if floor is None or len(floor) > max_bytes:
+            data = min((d for d in (first, floor) if d is not None), key=len, default=None)
+            if data is None:
+                raise OSError(f"{image_format} encoder failed at every quality")
+            self.logger.warning(f"{name} exceeds {max_size_kb} KB even at quality "
+                                f"{lowest}% ({len(data) / 1024:.1f} KB)")
+            return data
+        
+        # Bracket: (quality, size) that fits and (quality, size) that does not
+        best, fits, too_large = floor, (lowest, len(floor)), (quality, len(first) if first else None)
+        for _ in range(budget - 2):
+            if too_large[1] is None:
+                guess = (fits[0] + too_large[0]) / 2
+            else:
+                guess = fits[0] + (too_large[0] - fits[0]) * (math.log(max_bytes / fits[1]) /
+                                                             math.log(too_large[1] / fits[1]))
+            candidate_quality = lowest + int((guess - lowest) // QUALITY_STEP) * QUALITY_STEP
+            if candidate_quality <= fits[0]:
+                candidate_quality = fits[0] + QUALITY_STEP
+            if candidate_quality >= too_large[0]:
+                break
+            candidate = self._try_encode(img, image_format, candidate_quality, subsampling, name)
+            if candidate is not None and len(candidate) <= max_bytes:
+                best, fits = candidate, (candidate_quality, len(candidate))
+            else:
+                too_large = (candidate_quality, len(candidate) if candidate else None)
+        
+        self.logger.info(f"Reduced quality to {fits[0]}% for size optimization")
+        return best
+    
+    def _try_encode(self, img: Image.Image, image_format: str, quality: int,
+                    subsampling: Optional[str], name: str) -> Optional[bytes]:
+        """Candidate encoding, or None when the encoder fails on it"""
         try:
-            with Image.open(image_path) as img:
-                quality = initial_quality
-                
-                while quality > 30:  # Don't go below 30% quality
-                    quality -= 10
-                    img.save(image_path, 'JPEG', quality=quality, optimize=True)
-                    
-                    file_size_kb = image_path.stat().st_size / 1024
-                    if file_size_kb <= max_size_kb:
-                        self.logger.info(f"Reduced quality to {quality}% for size optimization")
-                        break
-                        
-        except Exception as e:
-            self.logger.warning(f"Failed to reduce quality for {image_path.name}: {e}")
+            return encode_image(img, image_format, quality, subsampling)
+        except OSError as e:
+            self.logger.warning(f"{image_format} encode of {name} failed at quality {quality}% "
+                                f"({subsampling or 'default'} subsampling): {e}")
+            return None
     
     def resize_image(self, input_path: Path, output_path: Path, 
                     target_size: Tuple[int, int], maintain_aspect: bool = True) -> bool:
@@ -125,16 +230,21 @@ class ImageOptimizer:
             self.logger.error(f"Failed to resize {input_path.name}: {e}")
             return False
     
-    def batch_optimize(self, input_paths: List[Path], output_dir: Path, **kwargs) -> List[Path]:
-        """Optimize multiple images"""
+    def batch_optimize(self, input_paths: List[Path], output_dir: Path, jobs: int = None,
+                       **kwargs) -> List[Path]:
+        """Optimize multiple images over ``jobs`` worker processes (default: PROCESS_JOBS)"""
         
-        successful_outputs = []
+        items = [(input_path, output_dir / input_path.name) for input_path in input_paths]
+        outcomes = map_processes(partial(self._optimize, **kwargs), items, resolve_jobs(jobs, Config.PROCESS_JOBS))
         
-        for input_path in input_paths:
-            output_path = output_dir / input_path.name
-            
-            if self.optimize_image(input_path, output_path, **kwargs):
-                successful_outputs.append(output_path)
+        # Results come back in input order; a failed image does not affect the others
+        successful_outputs = []
+        for (input_path, _), (result, error) in zip(items, outcomes):
+            if error is None:
+                self._log_result(input_path, *result)
+                successful_outputs.append(result[0])
+            else:
+                self.logger.error(f"Failed to optimize {input_path.name}: {error}")
         
         self.logger.info(f"Optimization complete: {len(successful_outputs)}/{len(input_paths)} successful")
         return successful_outputs
@@ -0,0 +1,121 @@
+# src/processors/manifest.py
+"""
+Processing manifest for make-style up-to-date checks
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import Config
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ProcessingManifest:
+    """Remember which inputs each processing stage has already handled
+
+    Every record stores the input's mtime, size and content hash, the
+    stage's recipe (model, sizes, ...) and the output path. An input is up
+    to date when its output still exists, the recipe is unchanged and the
+    input's mtime and size match, which costs a single stat(). If only the
+    mtime moved (e.g. the file was copied), the content hash decides.
+    """
+
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, manifest_file: Path = None):
+        self.manifest_file = manifest_file or Config.CACHE_DIR / "processing_manifest.json"
+        self.logger = logging.getLogger("processor.manifest")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+        self._dirty = False
+        self._last_save = time.time()
+
+    def up_to_date(self, input_path: Path, stage: str, recipe: str) -> Optional[Path]:
+        """Output of a previous run of this stage on an unchanged input, or None"""
+
+        key = str(Path(input_path).resolve())
+        with self._lock:
+            record = self._entries.get(key, {}).get(stage)
+        if not record or record["recipe"] != recipe:
+            return None
+
+        output_path = Path(record["output"])
+        try:
+            stat = Path(input_path).stat()
+            if not output_path.exists():
+                return None
+        except OSError:
+            return None
+
+        if stat.st_mtime_ns == record["mtime_ns"] and stat.st_size == record["size"]:
+            return output_path
+
+        if stat.st_size == record["size"] and file_sha256(input_path) == record["sha256"]:
+            with self._lock:
+                record["mtime_ns"] = stat.st_mtime_ns
+                self._dirty = True
+            return output_path
+
+        return None
+
+    def record(self, input_path: Path, stage: str, recipe: str, output_path: Path):
+        """Remember that a stage turned input_path into output_path"""
+
+        input_path = Path(input_path)
+        try:
+            stat = input_path.stat()
+            sha256 = file_sha256(input_path)
+        except OSError as e:
+            self.logger.warning(f"Cannot record {input_path.name} in processing manifest: {e}")
+            return
+
+        with self._lock:
+            self._entries.setdefault(str(input_path.resolve()), {})[stage] = {
+                "recipe": recipe,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": sha256,
+                "output": str(Path(output_path).resolve())
+            }
+            self._dirty = True
+            should_save = time.time() - self._last_save > self.SAVE_INTERVAL
+        if should_save:
+            self.save()
+
+    def save(self):
+        """Persist the manifest (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries, indent=2)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.manifest_file.with_suffix(".json.tmp")
+            tmp.write_text(data)
+            tmp.replace(self.manifest_file)
+        except Exception as e:
+            self.logger.warning(f"Failed to save processing manifest: {e}")
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            if self.manifest_file.exists():
+                return json.loads(self.manifest_file.read_text())
+        except Exception as e:
+            self.logger.warning(f"Failed to load processing manifest: {e}")
+        return {}
+
+# Global manifest instance
+processing_manifest = ProcessingManifest()
@@ -0,0 +1,69 @@
+# src/processors/mask_cache.py
+"""
+On-disk cache of segmentation masks keyed by image content and model
+"""
+
+import io
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+from ..core.config import Config
+from ..utils.cache_utils import DiskLRUCache, make_cache_key
+from .manifest import file_sha256
+
+def encode_mask(mask: Image.Image) -> bytes:
+    """Mask as a compressed single-channel PNG"""
+    buffer = io.BytesIO()
+    mask.convert("L").save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+class MaskCache:
+    """Reuse the model's mask when the same image is processed again with the same model
+
+    The key is the SHA-256 of the input file plus the resolved model name,
+    so renamed or copied images still hit and an edited image misses.
+    Only model masks are stored; the solid-background fast path is cheap
+    enough to recompute. A hit reduces background removal to decoding the
+    image and compositing the mask as alpha.
+    """
+
+    def __init__(self, cache_dir: Path = None):
+        self.store = DiskLRUCache(
+            cache_dir or Config.CACHE_DIR / "masks",
+            max_bytes=Config.MASK_CACHE_MAX_MB * 1024 * 1024,
+            max_entries=Config.MASK_CACHE_MAX_ENTRIES,
+            name="masks"
+        )
+        self.logger = logging.getLogger("processor.mask_cache")
+
+    def key(self, input_path: Path, model_name: str) -> str:
+        return make_cache_key("mask", file_sha256(input_path), model_name)
+
+    def lookup(self, key: str) -> Optional[Image.Image]:
+        """Cached mask for a key, or None on a miss"""
+        cached = self.store.get(key)
+        if cached is None:
+            return None
+        try:
+            with Image.open(cached) as mask:
+                return mask.convert("L")
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cached mask {cached.name}: {e}")
+            self.store.discard(key)
+            return None
+
+    def store_mask(self, key: str, mask_png: bytes, model_name: str):
+        """Cache a PNG-encoded mask produced by the model"""
+        self.store.put_bytes(key, mask_png, ".png", meta={"model": model_name})
+
+    def save(self):
+        self.store.save()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+# Global mask cache instance
+mask_cache = MaskCache()
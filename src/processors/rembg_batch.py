@@ -0,0 +1,67 @@
+# src/processors/rembg_batch.py
+"""
+Batched ONNX inference for rembg's u2net/isnet sessions
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Input normalization (mean, std, size) rembg uses for each model family
+_U2NET = ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320))
+_ISNET = ((0.485, 0.456, 0.406), (1.0, 1.0, 1.0), (1024, 1024))
+
+BATCH_SPECS = {
+    "u2net": _U2NET,
+    "u2netp": _U2NET,
+    "u2net_human_seg": _U2NET,
+    "silueta": _U2NET,
+    "isnet-general-use": _ISNET,
+    "isnet-anime": _ISNET
+}
+
+BatchSpec = Tuple[Tuple[float, ...], Tuple[float, ...], Tuple[int, int]]
+
+def batch_spec(session) -> Optional[BatchSpec]:
+    """Normalization for a session that accepts a batch dimension, or None
+
+    Models exported with a fixed batch size of 1, and sessions from other
+    model families (which post-process masks differently), must go through
+    rembg.remove one image at a time.
+    """
+    spec = BATCH_SPECS.get(getattr(session, "model_name", None))
+    inner = getattr(session, "inner_session", None)
+    if spec is None or inner is None:
+        return None
+    batch_dim = inner.get_inputs()[0].shape[0]
+    if isinstance(batch_dim, int) and batch_dim == 1:
+        return None
+    return spec
+
+def _preprocess(img: Image.Image, spec: BatchSpec) -> np.ndarray:
+    """Same normalization as rembg's BaseSession.normalize, in float32"""
+    mean, std, size = spec
+    im = np.asarray(img.convert("RGB").resize(size, Image.Resampling.LANCZOS), dtype=np.float32)
+    im /= max(float(im.max()), 1e-6)
+    im = (im - np.asarray(mean, dtype=np.float32)) / np.asarray(std, dtype=np.float32)
+    return im.transpose(2, 0, 1)
+
+def predict_masks(session, images: List[Image.Image], spec: BatchSpec) -> List[Image.Image]:
+    """Run every image through the model in one ONNX call and return one L-mode mask per image"""
+
+    inner = session.inner_session
+    batch = np.stack([_preprocess(img, spec) for img in images])
+    outputs = inner.run(None, {inner.get_inputs()[0].name: batch})
+
+    masks = []
+    for img, pred in zip(images, outputs[0][:, 0, :, :]):
+        lo, hi = float(pred.min()), float(pred.max())
+        pred = (pred - lo) / max(hi - lo, 1e-6)
+        mask = Image.fromarray((pred * 255).astype(np.uint8), mode="L")
+        masks.append(mask.resize(img.size, Image.Resampling.LANCZOS))
+    return masks
+
+def cutout(img: Image.Image, mask: Image.Image) -> Image.Image:
+    """Apply a mask as alpha, like rembg's naive cutout"""
+    return Image.composite(img.convert("RGBA"), Image.new("RGBA", img.size, 0), mask)
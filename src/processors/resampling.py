@@ -0,0 +1,37 @@
+# src/processors/resampling.py
+"""
+Image pyramid resampling for multi-size icon frames
+"""
+
+from typing import Dict, Iterable
+
+from PIL import Image
+
+# Halve while a level is at least this many times the target size
+REDUCING_GAP = 4
+
+def build_pyramid(img: Image.Image, sizes: Iterable[int]) -> Dict[int, Image.Image]:
+    """Square RGBA frame for each size, resampled through a halving pyramid
+
+    The source is premultiplied once (so transparent pixels' color does not
+    bleed into edges) and halved with a 2x2 box filter while the level is
+    at least REDUCING_GAP times the next size. Each frame then comes from
+    the nearest such level with one LANCZOS step of 2-4x, instead of a full
+    LANCZOS resize from the source per size; keeping that last step on
+    LANCZOS rather than the box filter preserves small-size sharpness.
+    Non-square sources are squared first, as the direct per-size resize
+    would stretch them.
+    """
+
+    level = img.convert("RGBA").convert("RGBa")
+    if level.width != level.height:
+        side = min(level.size)
+        level = level.resize((side, side), Image.Resampling.LANCZOS)
+
+    frames = {}
+    for size in sorted(set(sizes), reverse=True):
+        while level.width >= REDUCING_GAP * size:
+            level = level.reduce(2)
+        frame = level if level.width == size else level.resize((size, size), Image.Resampling.LANCZOS)
+        frames[size] = frame.convert("RGBA")
+    return frames
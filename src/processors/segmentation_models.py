@@ -0,0 +1,119 @@
+# src/processors/segmentation_models.py
+"""
+Segmentation model selection, int8 quantization and ONNX Runtime session options
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+import onnxruntime as ort
+import rembg
+
+from ..core.config import Config
+
+logger = logging.getLogger("processor.models")
+
+QUANTIZED_SUFFIX = "-int8"
+
+# Short names accepted on the CLI and in BG_MODEL
+MODEL_ALIASES = {
+    "isnet-general": "isnet-general-use"
+}
+
+# Models suited to logos, each also available as an int8-quantized variant
+BASE_MODELS = ["u2net", "u2netp", "silueta", "isnet-general-use", "isnet-anime"]
+AVAILABLE_MODELS = BASE_MODELS + [f"{name}{QUANTIZED_SUFFIX}" for name in BASE_MODELS]
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+}
+
+_quantize_lock = threading.Lock()
+
+def resolve_model_name(model_name: str) -> str:
+    """Canonical model name (aliases expanded, quantized suffix kept)"""
+    base, quantized = split_model_name(model_name)
+    return f"{base}{QUANTIZED_SUFFIX}" if quantized else base
+
+def split_model_name(model_name: str) -> tuple:
+    """(rembg base model, whether the int8 variant was requested)"""
+    quantized = model_name.endswith(QUANTIZED_SUFFIX)
+    base = model_name[:-len(QUANTIZED_SUFFIX)] if quantized else model_name
+    return MODEL_ALIASES.get(base, base), quantized
+
+def session_options(intra_op_threads: int = 0, inter_op_threads: int = None,
+                    graph_optimization: str = None) -> ort.SessionOptions:
+    """ONNX Runtime options from arguments or BG_INTER_OP_THREADS / BG_GRAPH_OPTIMIZATION"""
+    options = ort.SessionOptions()
+    if intra_op_threads:
+        options.intra_op_num_threads = intra_op_threads
+    inter_op_threads = inter_op_threads if inter_op_threads is not None else Config.BG_INTER_OP_THREADS
+    if inter_op_threads:
+        options.inter_op_num_threads = inter_op_threads
+    level = (graph_optimization or Config.BG_GRAPH_OPTIMIZATION).lower()
+    if level not in GRAPH_OPTIMIZATION_LEVELS:
+        raise ValueError(f"Unknown graph optimization level '{level}' "
+                         f"(choose from {', '.join(GRAPH_OPTIMIZATION_LEVELS)})")
+    options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[level]
+    return options
+
+def _session_classes() -> Dict[str, type]:
+    from rembg.sessions import sessions_class
+    return {session_class.name(): session_class for session_class in sessions_class}
+
+def quantized_model_path(base: str) -> Path:
+    """int8 copy of a rembg model, quantized once and kept in CACHE_DIR/models"""
+
+    target = Config.CACHE_DIR / "models" / f"{base}{QUANTIZED_SUFFIX}.onnx"
+    with _quantize_lock:
+        if target.exists():
+            return target
+
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        source = _session_classes()[base].download_models()
+        logger.info(f"Quantizing {base} to int8 (one-time): {target}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Worker processes may quantize concurrently; each writes its own temp file
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        quantize_dynamic(str(source), str(tmp), weight_type=QuantType.QUInt8)
+        tmp.replace(target)
+    return target
+
+def create_session(model_name: str, intra_op_threads: int = 0, inter_op_threads: int = None,
+                   graph_optimization: str = None):
+    """rembg session for a model name from AVAILABLE_MODELS (or any rembg model)
+
+    Sessions are built with explicit SessionOptions because rembg's own
+    new_session only maps OMP_NUM_THREADS to inter-op threads. Quantized
+    variants reuse the base model's session class (and so its
+    preprocessing), loading the int8 file instead of the original.
+    """
+
+    base, quantized = split_model_name(model_name)
+    options = session_options(intra_op_threads, inter_op_threads, graph_optimization)
+
+    try:
+        session_class = _session_classes()[base]
+    except ImportError:
+        # rembg without a sessions package: no way to pass options through
+        if quantized:
+            raise
+        return rembg.new_session(base)
+    except KeyError:
+        raise ValueError(f"Unknown background removal model '{model_name}' "
+                         f"(choose from {', '.join(AVAILABLE_MODELS)})")
+
+    if quantized:
+        model_path = quantized_model_path(base)
+        session_class = type(f"{session_class.__name__}Int8", (session_class,), {
+            "download_models": classmethod(lambda cls, *args, **kwargs: str(model_path))
+        })
+
+    return session_class(base, options)
@@ -0,0 +1,119 @@
+# src/processors/service.py
+"""
+Process-wide processor service sharing one set of loaded processors
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ..core.config import Config
+from .background_remover import BackgroundRemover
+from .ico_converter import ICOConverter
+from .icon_exporter import IconExporter
+from .image_optimizer import ImageOptimizer
+from .mask_cache import mask_cache
+from .segmentation_models import resolve_model_name
+
+class ProcessorService:
+    """Long-lived background remover, ICO converter, icon exporter and image optimizer
+
+    Every pipeline, web request and workflow thread in the process uses the
+    same instances, so the rembg model (or its worker pool) is loaded once
+    and stays loaded instead of being rebuilt per request. Processors are
+    created on first use, with one background remover per segmentation
+    model a job asks for; warm_up() loads the default model ahead of the
+    first request.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("processor.service")
+        self._lock = threading.Lock()
+        self._background_removers: Dict[str, BackgroundRemover] = {}
+        self._ico_converter: Optional[ICOConverter] = None
+        self._icon_exporter: Optional[IconExporter] = None
+        self._image_optimizer: Optional[ImageOptimizer] = None
+        self._warm_thread: Optional[threading.Thread] = None
+        self.warm_time: Optional[float] = None
+
+    @property
+    def background_remover(self) -> BackgroundRemover:
+        return self.background_remover_for(None)
+
+    def background_remover_for(self, model_name: Optional[str]) -> BackgroundRemover:
+        """Shared background remover for a segmentation model (BG_MODEL by default)"""
+        model_name = resolve_model_name(model_name or Config.BG_MODEL)
+        with self._lock:
+            if model_name not in self._background_removers:
+                self._background_removers[model_name] = BackgroundRemover(model_name)
+            return self._background_removers[model_name]
+
+    @property
+    def ico_converter(self) -> ICOConverter:
+        if self._ico_converter is None:
+            with self._lock:
+                if self._ico_converter is None:
+                    self._ico_converter = ICOConverter(Config.ICO_SIZES)
+        return self._ico_converter
+
+    @property
+    def icon_exporter(self) -> IconExporter:
+        if self._icon_exporter is None:
+            with self._lock:
+                if self._icon_exporter is None:
+                    self._icon_exporter = IconExporter()
+        return self._icon_exporter
+    
+    @property
+    def image_optimizer(self) -> ImageOptimizer:
+        if self._image_optimizer is None:
+            with self._lock:
+                if self._image_optimizer is None:
+                    self._image_optimizer = ImageOptimizer()
+        return self._image_optimizer
+
+    def warm_up(self, wait: bool = False):
+        """Load the background removal model in a background thread (once)"""
+        with self._lock:
+            if self._warm_thread is None:
+                self._warm_thread = threading.Thread(target=self._warm, name="processor-warm-up", daemon=True)
+                self._warm_thread.start()
+            thread = self._warm_thread
+        if wait:
+            thread.join()
+
+    def _warm(self):
+        start = time.time()
+        try:
+            self.background_remover.warm_up()
+            self.warm_time = time.time() - start
+            self.logger.info(f"Processors warmed up in {self.warm_time:.1f}s")
+        except Exception as e:
+            self.logger.error(f"Processor warm-up failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            removers = list(self._background_removers.values())
+        return {
+            "background_removers": {
+                remover.model_name: {
+                    "loaded": remover.loaded,
+                    "workers": remover.workers,
+                    "batch_size": remover.batch_size
+                }
+                for remover in removers
+            },
+            "mask_cache": mask_cache.stats(),
+            "warm_time": round(self.warm_time, 2) if self.warm_time is not None else None
+        }
+
+    def shutdown(self):
+        """Stop background removal worker processes"""
+        with self._lock:
+            removers = list(self._background_removers.values())
+        for remover in removers:
+            remover.close()
+
+# Global processor service instance
+processor_service = ProcessorService()
@@ -0,0 +1,172 @@
+# src/processors/solid_background.py
+"""
+Classical background removal for logos on a flat, solid-color background
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..core.config import Config
+
+# Flood fill alternates row and column sweeps; real backgrounds converge in a handful
+_MAX_SWEEPS = 64
+
+def _propagate_rows(reached: np.ndarray, passable: np.ndarray) -> np.ndarray:
+    """Extend reached pixels along each row through runs of passable pixels"""
+    height, width = passable.shape
+    flat = passable.ravel()
+    starts = flat.copy()
+    starts[1:] &= ~flat[:-1]
+    starts[::width] = flat[::width]
+    labels = np.cumsum(starts, dtype=np.int32) * flat
+    hit = np.zeros(int(labels[-1]) + 1 if labels.size else 1, dtype=bool)
+    hit[labels[reached.ravel() & flat]] = True
+    hit[0] = False
+    return hit[labels].reshape(height, width)
+
+def flood_fill(seeds: np.ndarray, passable: np.ndarray) -> np.ndarray:
+    """Pixels 4-connected to a seed through passable pixels"""
+    reached = seeds & passable
+    count = -1
+    for _ in range(_MAX_SWEEPS):
+        reached = _propagate_rows(reached, passable)
+        reached = np.ascontiguousarray(_propagate_rows(np.ascontiguousarray(reached.T),
+                                                       np.ascontiguousarray(passable.T)).T)
+        new_count = int(reached.sum())
+        if new_count == count:
+            break
+        count = new_count
+    return reached
+
+def dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """4-neighbour binary dilation"""
+    grown = mask.copy()
+    for _ in range(radius):
+        step = grown.copy()
+        step[1:] |= grown[:-1]
+        step[:-1] |= grown[1:]
+        step[:, 1:] |= grown[:, :-1]
+        step[:, :-1] |= grown[:, 1:]
+        grown = step
+    return grown
+
+def _border(array: np.ndarray, width: int) -> np.ndarray:
+    return np.concatenate([
+        array[:width].reshape(-1, *array.shape[2:]),
+        array[-width:].reshape(-1, *array.shape[2:]),
+        array[width:-width, :width].reshape(-1, *array.shape[2:]),
+        array[width:-width, -width:].reshape(-1, *array.shape[2:])
+    ])
+
+def remove_solid_background(img: Image.Image, tolerance: float = None, feather: float = None,
+                            min_border: float = None) -> Tuple[Optional[Image.Image], Dict[str, Any]]:
+    """Cut a logo out of a near-uniform background without the neural model
+
+    The background color is the median of a thin border ring. If enough of
+    the border is within ``tolerance`` (RGB distance) of it, the background
+    is the region flood-filled from the border through pixels within
+    tolerance, so interior areas of the same color (e.g. white lettering)
+    stay opaque. Alpha ramps up over ``feather`` distance units in a 2px band
+    around that region, and edge colors are un-blended from the background
+    to avoid halos.
+
+    Returns (RGBA image, decision), or (None, decision) when the image is
+    ambiguous and should go to the neural model. The decision records why.
+    """
+
+    start = time.time()
+    tolerance = tolerance if tolerance is not None else Config.BG_FAST_TOLERANCE
+    feather = max(1.0, feather if feather is not None else Config.BG_FAST_FEATHER)
+    min_border = min_border if min_border is not None else Config.BG_FAST_MIN_BORDER
+
+    decision: Dict[str, Any] = {"method": "rembg"}
+
+    def decide(reason: str, output: Optional[Image.Image] = None):
+        decision["reason"] = reason
+        decision["fast_path_ms"] = round((time.time() - start) * 1000, 1)
+        if output is not None:
+            decision["method"] = "solid"
+        return output, decision
+
+    rgb = np.asarray(img.convert("RGB"), dtype=np.float32)
+    height, width = rgb.shape[:2]
+    if min(height, width) < 16:
+        return decide("image too small")
+
+    ring = max(1, min(height, width) // 100)
+    source_alpha = np.asarray(img.getchannel("A"), dtype=np.float32) / 255 if img.mode == "RGBA" else None
+    if source_alpha is not None and np.mean(_border(source_alpha, ring) < 0.1) >= min_border:
+        return decide("already transparent", img.copy())
+
+    border = _border(rgb, ring)
+    bg_color = np.median(border, axis=0)
+    border_uniformity = float(np.mean(np.linalg.norm(border - bg_color, axis=1) <= tolerance))
+    decision.update({"bg_color": [int(round(c)) for c in bg_color],
+                     "border_uniformity": round(border_uniformity, 4)})
+    if border_uniformity < min_border:
+        return decide("border not uniform")
+
+    distance = np.sqrt(((rgb - bg_color) ** 2).sum(axis=2))
+    seeds = np.zeros((height, width), dtype=bool)
+    seeds[:ring] = seeds[-ring:] = True
+    seeds[:, :ring] = seeds[:, -ring:] = True
+    background = flood_fill(seeds, distance <= tolerance)
+
+    bg_fraction = float(background.mean())
+    decision["bg_fraction"] = round(bg_fraction, 4)
+    if bg_fraction < 0.05:
+        return decide("background region too small")
+    if bg_fraction > 0.995:
+        return decide("no foreground found")
+
+    # Foreground that is mostly close to the background color is a poor fit for a color key
+    foreground = ~background
+    low_contrast = float(np.mean(distance[foreground] < tolerance + feather))
+    decision["low_contrast"] = round(low_contrast, 4)
+    if low_contrast > 0.5:
+        return decide("foreground too close to background color")
+
+    alpha = np.ones((height, width), dtype=np.float32)
+    alpha[background] = 0.0
+    band = dilate(background, 2) & foreground
+    alpha[band] = np.clip((distance[band] - tolerance) / feather, 0.0, 1.0)
+
+    # Un-blend the background color from partially transparent edge pixels
+    edge = band & (alpha > 0) & (alpha < 1)
+    edge_alpha = alpha[edge][:, None]
+    rgb[edge] = np.clip((rgb[edge] - (1 - edge_alpha) * bg_color) / edge_alpha, 0, 255)
+
+    if source_alpha is not None:
+        alpha *= source_alpha
+
+    rgba = np.dstack([rgb, alpha * 255]).round().astype(np.uint8)
+    return decide("solid background", Image.fromarray(rgba, "RGBA"))
+
+class DecisionLog:
+    """Append-only JSONL record of how each image's background was removed
+
+    One line per image (input, output, method, reason and the measurements
+    behind the decision), so fast-path choices can be audited against the
+    neural model later.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path or Config.LOGS_DIR / "bg_decisions.jsonl"
+        self._lock = threading.Lock()
+
+    def record(self, input_path: Path, output_path: Optional[Path], decision: Dict[str, Any]):
+        entry = {"ts": round(time.time(), 3), "input": str(input_path),
+                 "output": str(output_path) if output_path else None, **decision}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+# Global decision log instance
+decision_log = DecisionLog()
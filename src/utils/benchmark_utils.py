@@ -0,0 +1,282 @@
+# src/utils/benchmark_utils.py
+"""
+Throughput benchmarks for the image processing stages
+"""
+
+import io
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from ..core.config import Config
+from .parallel_utils import cpu_count, create_process_pool, threads_per_worker
+
+logger = logging.getLogger("benchmark")
+
+def find_images(input_dir: Path, limit: int = None) -> List[Path]:
+    """Raster images in a directory, sorted by name"""
+    images = sorted(p for p in Path(input_dir).iterdir()
+                    if p.suffix.lower() in (".png", ".jpg", ".jpeg"))
+    return images[:limit] if limit else images
+
+def benchmark_background_removal(input_files: List[Path], worker_counts: List[int],
+                                 model_name: str = None, intra_op_threads: int = None,
+                                 batch_sizes: List[int] = None, fast_path: bool = False) -> Dict[str, Any]:
+    """Background removal throughput for each worker-process count and batch size
+
+    Every configuration processes the same images into a scratch directory.
+    Startup (spawning workers and loading the model) is timed separately
+    from the batch, and throughput is also reported per core in use. Batch
+    size 1 is the per-image rembg.remove path. The solid-background fast
+    path is off unless requested and the mask cache is always off, so the
+    model itself is measured.
+    """
+
+    from ..processors.background_remover import BackgroundRemover
+
+    runs = []
+    configs = [(workers, batch_size) for workers in worker_counts for batch_size in (batch_sizes or [1])]
+    for workers, batch_size in configs:
+        threads = intra_op_threads or threads_per_worker(workers)
+        remover = BackgroundRemover(model_name, workers=workers, intra_op_threads=threads,
+                                    batch_size=batch_size, fast_path=fast_path, use_mask_cache=False)
+        try:
+            start = time.time()
+            remover.warm_up()
+            startup = time.time() - start
+
+            with tempfile.TemporaryDirectory() as scratch:
+                start = time.time()
+                outputs = remover.process_batch(input_files, Path(scratch))
+                elapsed = time.time() - start
+        finally:
+            remover.close()
+
+        cores = min(cpu_count(), workers * threads)
+        throughput = len(outputs) / elapsed if elapsed > 0 else 0.0
+        runs.append({
+            "workers": workers,
+            "intra_op_threads": threads,
+            "batch_size": batch_size,
+            "cores": cores,
+            "images": len(outputs),
+            "startup_s": round(startup, 2),
+            "elapsed_s": round(elapsed, 2),
+            "images_per_s": round(throughput, 3),
+            "images_per_s_per_core": round(throughput / cores, 3)
+        })
+        logger.info(f"workers={workers} threads={threads} batch={batch_size}: {len(outputs)} images in {elapsed:.1f}s "
+                    f"({throughput:.2f} img/s, {throughput / cores:.3f} img/s/core, startup {startup:.1f}s)")
+
+    return {
+        "benchmark": "background_removal",
+        "model": model_name or Config.BG_MODEL,
+        "images": len(input_files),
+        "cpu_count": cpu_count(),
+        "runs": _add_speedups(runs)
+    }
+
+def _add_speedups(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add each run's speedup over the per-image run with the same worker count"""
+    baselines = {run["workers"]: run["images_per_s"] for run in runs if run["batch_size"] == 1}
+    for run in runs:
+        baseline = baselines.get(run["workers"])
+        run["speedup"] = round(run["images_per_s"] / baseline, 2) if baseline else None
+    return runs
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+def _run_model(model_name: str, input_files: List[Path], intra_op_threads: int,
+               graph_optimization: Optional[str]) -> Dict[str, Any]:
+    """Predict a mask per image; runs in a fresh process so peak RSS is this model's alone"""
+
+    from ..processors.segmentation_models import create_session
+
+    start = time.time()
+    session = create_session(model_name, intra_op_threads, graph_optimization=graph_optimization)
+    load_time = time.time() - start
+
+    images = []
+    for path in input_files:
+        with Image.open(path) as img:
+            images.append(img.convert("RGB"))
+
+    # Untimed first call: ONNX Runtime allocates its buffers lazily
+    session.predict(images[0])
+
+    latencies = []
+    masks = []
+    for img in images:
+        start = time.perf_counter()
+        mask = session.predict(img)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        binary = np.asarray(mask) >= 128
+        masks.append((binary.shape, np.packbits(binary).tobytes()))
+
+    return {"load_s": load_time, "latencies_ms": latencies, "masks": masks, "peak_rss_mb": peak_rss_mb()}
+
+def mask_iou(a: np.ndarray, b: np.ndarray) -> float:
+    """Intersection over union of two boolean masks (1.0 when both are empty)"""
+    union = np.logical_or(a, b).sum()
+    return float(np.logical_and(a, b).sum() / union) if union else 1.0
+
+def _unpack(mask) -> np.ndarray:
+    shape, packed = mask
+    return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=shape[0] * shape[1]).reshape(shape).astype(bool)
+
+def benchmark_models(input_files: List[Path], models: List[str], reference: str = "u2net",
+                     intra_op_threads: int = 0, graph_optimization: str = None,
+                     min_iou: float = 0.95) -> Dict[str, Any]:
+    """Latency, peak RSS and mask IoU against a reference model for each segmentation model
+
+    Every model runs alone in a freshly spawned process over the same
+    images. Masks are thresholded at 50% before comparing them with the
+    reference model's masks. The fastest model whose mean IoU reaches
+    min_iou is reported as the recommendation.
+    """
+
+    from ..processors.segmentation_models import resolve_model_name
+
+    models = [resolve_model_name(model) for model in models]
+    reference = resolve_model_name(reference)
+    order = [reference] + [model for model in models if model != reference]
+
+    outcomes = {}
+    for model in order:
+        pool = create_process_pool(1)
+        try:
+            outcomes[model] = pool.submit(_run_model, model, input_files, intra_op_threads,
+                                          graph_optimization).result()
+        except Exception as e:
+            logger.error(f"{model}: benchmark failed: {e}")
+        finally:
+            pool.shutdown()
+
+    reference_masks = [_unpack(mask) for mask in outcomes[reference]["masks"]] if reference in outcomes else None
+
+    runs = []
+    for model, outcome in outcomes.items():
+        latencies = sorted(outcome["latencies_ms"])
+        ious = [mask_iou(_unpack(mask), ref) for mask, ref in zip(outcome["masks"], reference_masks)] \
+            if reference_masks else []
+        run = {
+            "model": model,
+            "load_s": round(outcome["load_s"], 2),
+            "latency_ms_p50": round(statistics.median(latencies), 1),
+            "latency_ms_p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+            "images_per_s": round(1000 / statistics.mean(latencies), 2),
+            "peak_rss_mb": outcome["peak_rss_mb"],
+            "iou_mean": round(statistics.mean(ious), 4) if ious else None,
+            "iou_min": round(min(ious), 4) if ious else None
+        }
+        runs.append(run)
+        logger.info(f"{model}: p50 {run['latency_ms_p50']}ms, p95 {run['latency_ms_p95']}ms, "
+                    f"peak RSS {run['peak_rss_mb']} MB, IoU vs {reference} {run['iou_mean']}")
+
+    acceptable = [run for run in runs if run["iou_mean"] is not None and run["iou_mean"] >= min_iou]
+    recommended = min(acceptable, key=lambda run: run["latency_ms_p50"])["model"] if acceptable else None
+
+    return {
+        "benchmark": "segmentation_models",
+        "reference": reference,
+        "images": len(input_files),
+        "intra_op_threads": intra_op_threads,
+        "graph_optimization": graph_optimization or Config.BG_GRAPH_OPTIMIZATION,
+        "min_iou": min_iou,
+        "recommended": recommended,
+        "runs": runs
+    }
+
+def _direct_ico(img: Image.Image, sizes: List[int]) -> List[Image.Image]:
+    """The original ICO path: a LANCZOS resize from the source per size, then Pillow's save"""
+    rgba = img.convert("RGBA")
+    resized_images = [rgba.resize((size, size), Image.Resampling.LANCZOS) for size in sizes]
+    rgba.save(io.BytesIO(), format="ICO", sizes=[(size, size) for size in sizes],
+              append_images=resized_images[1:])
+    return resized_images
+
+def _pyramid_ico(img: Image.Image, sizes: List[int]) -> List[Image.Image]:
+    from ..processors.ico_converter import write_ico
+    from ..processors.resampling import build_pyramid
+
+    frames = build_pyramid(img, sizes)
+    write_ico(frames, io.BytesIO())
+    return [frames[size] for size in sizes]
+
+def benchmark_ico_resampling(input_files: List[Path], sizes: List[int] = None,
+                             repeats: int = 3) -> Dict[str, Any]:
+    """ICO conversion time with per-size LANCZOS resizes versus the halving pyramid
+
+    Images are decoded up front and ICOs are written to memory, so only
+    resampling and encoding are timed (best of ``repeats`` per image). Each
+    pyramid frame is also compared with the direct LANCZOS frame (mean
+    absolute difference per channel value, 0-255) as a quality check.
+    """
+
+    sizes = sizes or Config.ICO_SIZES
+    images = []
+    for path in input_files:
+        with Image.open(path) as img:
+            images.append(img.convert("RGBA"))
+
+    timings = {"direct": [], "pyramid": []}
+    differences = {size: [] for size in sizes}
+    for img in images:
+        for name, convert in (("direct", _direct_ico), ("pyramid", _pyramid_ico)):
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                frames = convert(img, sizes)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name].append(best)
+            if name == "direct":
+                direct_frames = frames
+        for size, direct, pyramid in zip(sizes, direct_frames, frames):
+            differences[size].append(float(np.abs(np.asarray(direct, dtype=np.int16) -
+                                                  np.asarray(pyramid, dtype=np.int16)).mean()))
+
+    runs = []
+    for name, values in timings.items():
+        runs.append({"path": name, "ms_per_image": round(statistics.mean(values), 2),
+                     "ms_p50": round(statistics.median(values), 2)})
+        logger.info(f"{name}: {statistics.mean(values):.1f} ms/image")
+    speedup = statistics.mean(timings["direct"]) / statistics.mean(timings["pyramid"])
+
+    return {
+        "benchmark": "ico_resampling",
+        "images": len(images),
+        "sizes": sizes,
+        "repeats": repeats,
+        "runs": runs,
+        "speedup": round(speedup, 2),
+        "mean_abs_diff": {str(size): round(statistics.mean(values), 3) for size, values in differences.items()}
+    }
+
+def save_benchmark(results: Dict[str, Any]) -> Path:
+    """Write results to logs/benchmarks/<name>_<timestamp>.json"""
+    output_file = Config.LOGS_DIR / "benchmarks" / f"{results['benchmark']}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text(json.dumps(results, indent=2))
+    return output_file
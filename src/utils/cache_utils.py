@@ -0,0 +1,192 @@
+# src/utils/cache_utils.py
+"""
+Content-addressed on-disk file cache with LRU eviction
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable SHA-256 key for JSON-serializable parts (dict key order does not matter)"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class DiskLRUCache:
+    """Files stored under a content key, evicted least-recently-used first
+
+    Entries live in ``objects/<key[:2]>/<key><suffix>`` with an index.json
+    holding size, last access time and caller metadata. The cache is kept
+    under ``max_bytes`` and ``max_entries``; entries whose file has gone
+    missing are dropped on lookup. The index is written at most every
+    SAVE_INTERVAL seconds, so callers should save() when a run finishes.
+    """
+
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, cache_dir: Path, max_bytes: int, max_entries: int = None,
+                 name: str = "cache"):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index_file = self.cache_dir / "index.json"
+        self.logger = logging.getLogger(f"cache.{name}")
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._last_save = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _entries(self) -> Dict[str, Dict[str, Any]]:
+        """Index loaded on first use (caller holds the lock)"""
+        if self._index is None:
+            self._index = {}
+            try:
+                if self.index_file.exists():
+                    self._index = json.loads(self.index_file.read_text())
+            except Exception as e:
+                self.logger.warning(f"Failed to load cache index, starting empty: {e}")
+        return self._index
+
+    def _object_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / "objects" / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Path of the cached file for a key, or None"""
+        with self._lock:
+            entry = self._entries().get(key)
+            if entry is not None:
+                path = self.cache_dir / entry["file"]
+                if path.exists():
+                    entry["last_access"] = time.time()
+                    self._dirty = True
+                    self.hits += 1
+                    return path
+                del self._index[key]
+                self._dirty = True
+            self.misses += 1
+            return None
+
+    def metadata(self, key: str) -> Optional[Dict[str, Any]]:
+        """Metadata stored with an entry"""
+        with self._lock:
+            entry = self._entries().get(key)
+            return dict(entry.get("meta", {})) if entry else None
+
+    def put(self, key: str, source: Path, meta: Dict[str, Any] = None) -> Optional[Path]:
+        """Copy a file into the cache under a key and evict if over budget"""
+        source = Path(source)
+        try:
+            size = source.stat().st_size
+        except OSError as e:
+            self.logger.warning(f"Failed to cache {source.name}: {e}")
+            return None
+        return self._store(key, source.suffix, source.name, size,
+                           lambda tmp: shutil.copyfile(source, tmp), meta)
+
+    def put_bytes(self, key: str, data: bytes, suffix: str, meta: Dict[str, Any] = None) -> Optional[Path]:
+        """Store in-memory content under a key and evict if over budget"""
+        return self._store(key, suffix, key[:12], len(data), lambda tmp: tmp.write_bytes(data), meta)
+
+    def _store(self, key: str, suffix: str, label: str, size: int, write,
+               meta: Dict[str, Any]) -> Optional[Path]:
+        if size > self.max_bytes:
+            self.logger.debug(f"Not caching {label}: {size / 1024:.1f} KB exceeds the cache budget")
+            return None
+
+        target = self._object_path(key, suffix)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(target, write)
+        except Exception as e:
+            self.logger.warning(f"Failed to cache {label}: {e}")
+            return None
+
+        with self._lock:
+            self._entries()[key] = {
+                "file": str(target.relative_to(self.cache_dir)),
+                "size": target.stat().st_size,
+                "last_access": time.time(),
+                "meta": meta or {}
+            }
+            self._dirty = True
+            self._evict()
+            stored = key in self._index
+            should_save = time.time() - self._last_save > self.SAVE_INTERVAL
+        if should_save:
+            self.save()
+        return target if stored else None
+
+    @staticmethod
+    def _write_atomic(target: Path, write):
+        """Write through a temp file unique to this call, then replace the target
+
+        Concurrent writers of the same key each publish a complete file.
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        os.close(fd)
+        tmp = Path(tmp_name)
+        try:
+            write(tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def discard(self, key: str):
+        """Remove an entry and its file"""
+        with self._lock:
+            entry = self._entries().pop(key, None)
+            if entry is not None:
+                (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+                self._dirty = True
+
+    def _evict(self):
+        """Drop least-recently-used entries until within budget (caller holds the lock)"""
+        entries = self._index
+        total = sum(entry["size"] for entry in entries.values())
+
+        def over_budget() -> bool:
+            if self.max_entries is not None and len(entries) > self.max_entries:
+                return True
+            return total > self.max_bytes
+
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if not over_budget():
+                break
+            entry = entries.pop(key)
+            total -= entry["size"]
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            self.logger.debug(f"Evicted {key[:12]} ({entry['size'] / 1024:.1f} KB)")
+
+    def save(self):
+        """Persist the index (atomic replace)"""
+        with self._lock:
+            if not self._dirty or self._index is None:
+                return
+            data = json.dumps(self._index, indent=2)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(self.index_file, lambda tmp: tmp.write_text(data))
+        except Exception as e:
+            self.logger.warning(f"Failed to save cache index: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._entries()
+            return {
+                "entries": len(entries),
+                "bytes": sum(entry["size"] for entry in entries.values()),
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -4,11 +4,16 @@ File operation utilities
 """
 
 import json
+import logging
 import shutil
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import requests
 
+from .http_utils import get_session
+
+logger = logging.getLogger("file_utils")
+
 def load_prompts(prompts_file: Path) -> List[Dict[str, Any]]:
     """Load prompts from JSON file"""
     try:
@@ -29,24 +34,47 @@ def load_prompts(prompts_file: Path) -> List[Dict[str, Any]]:
     except Exception as e:
         raise RuntimeError(f"Failed to load prompts from {prompts_file}: {e}")
 
-def download_image(url: str, output_path: Path, timeout: int = 30) -> bool:
-    """Download image from URL to file"""
+def download_image(url: str, output_path: Path, timeout: int = 30,
+                   session: Optional[requests.Session] = None) -> bool:
+    """Download image from URL to file over a pooled keep-alive session"""
     try:
-        response = requests.get(url, timeout=timeout, stream=True)
-        response.raise_for_status()
-        
-        # Ensure output directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        session = session or get_session("downloads")
         
-        # Write file
-        with open(output_path, 'wb') as f:
-            shutil.copyfileobj(response.raw, f)
+        # Context manager returns the connection to the pool once the body is read
+        with session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            
+            # Ensure output directory exists
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Write file
+            with open(output_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f)
         
         return True
     except Exception as e:
         print(f"Failed to download {url}: {e}")
         return False
 
+async def adownload_image(url: str, output_path: Path, client, timeout: int = 30) -> bool:
+    """Download image from URL to file using an httpx.AsyncClient"""
+    try:
+        async with client.stream("GET", url, timeout=timeout) as response:
+            response.raise_for_status()
+            
+            # Ensure output directory exists
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Write file
+            with open(output_path, 'wb') as f:
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+        
+        return True
+    except Exception as e:
+        logger.error(f"Failed to download {url}: {e}")
+        return False
+
 def get_file_size_mb(file_path: Path) -> float:
     """Get file size in MB"""
     return file_path.stat().st_size / (1024 * 1024)
@@ -0,0 +1,119 @@
+# src/utils/http_utils.py
+"""
+Pooled keep-alive HTTP sessions shared per provider
+"""
+
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+from ..core.config import Config
+
+class PoolStats:
+    """Thread-safe connection pool hit/miss counters
+
+    ``requests`` counts connection checkouts (a retried request checks out
+    again) and ``misses`` every socket opened, including reconnects of a
+    pooled keep-alive connection the server had dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hits": max(0, self.requests - self.new_connections),
+                "misses": self.new_connections
+            }
+
+class _CountingPoolMixin:
+    """Count connection checkouts"""
+
+    pool_stats: PoolStats = None
+
+    def _get_conn(self, timeout=None):
+        self.pool_stats.record_request()
+        return super()._get_conn(timeout)
+
+class _CountingConnectionMixin:
+    """Count every socket a connection opens, not only brand-new connections
+
+    urllib3 reconnects a dropped pooled connection in place, without
+    going through the pool's _new_conn.
+    """
+
+    pool_stats: PoolStats = None
+
+    def connect(self):
+        self.pool_stats.record_new_connection()
+        return super().connect()
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report hit/miss counts"""
+
+    def __init__(self, pool_stats: PoolStats, **kwargs):
+        self.pool_stats = pool_stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        attrs = {"pool_stats": self.pool_stats}
+        http_conn = type("CountingHTTPConnection", (_CountingConnectionMixin, HTTPConnection), attrs)
+        https_conn = type("CountingHTTPSConnection", (_CountingConnectionMixin, HTTPSConnection), attrs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CountingHTTPConnectionPool", (_CountingPoolMixin, HTTPConnectionPool),
+                         {**attrs, "ConnectionCls": http_conn}),
+            "https": type("CountingHTTPSConnectionPool", (_CountingPoolMixin, HTTPSConnectionPool),
+                          {**attrs, "ConnectionCls": https_conn})
+        }
+
+_sessions: Dict[str, requests.Session] = {}
+_pool_stats: Dict[str, PoolStats] = {}
+_lock = threading.Lock()
+
+def get_session(name: str) -> requests.Session:
+    """Get the shared keep-alive session for a provider (created on first use)"""
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            stats = PoolStats()
+            adapter = PooledAdapter(
+                stats,
+                pool_connections=Config.HTTP_POOL_HOSTS,
+                pool_maxsize=Config.HTTP_POOL_SIZE
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+            _pool_stats[name] = stats
+        return session
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Get hit/miss counters for every session created so far"""
+    with _lock:
+        return {name: stats.as_dict() for name, stats in _pool_stats.items()}
+
+def close_sessions():
+    """Close all shared sessions and their pooled connections"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _pool_stats.clear()
@@ -0,0 +1,113 @@
+# src/utils/parallel_utils.py
+"""
+Process pool helpers for CPU-bound image processing
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+def cpu_count() -> int:
+    """Cores available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+def threads_per_worker(workers: int) -> int:
+    """Split the available cores evenly across worker processes"""
+    return max(1, cpu_count() // max(1, workers))
+
+def create_process_pool(workers: int, initializer: Optional[Callable] = None,
+                        initargs: Tuple = ()) -> ProcessPoolExecutor:
+    """Process pool using the spawn start method
+
+    Spawn is the only method on Windows and is also used elsewhere, because
+    forking a process that already runs HTTP and streaming threads can
+    deadlock the child.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs
+    )
+
+# Pools shared by map_processes calls, by worker count; spawning workers and
+# importing modules costs more than a small batch takes to process
+_shared_pools: Dict[int, ProcessPoolExecutor] = {}
+_shared_pools_lock = threading.Lock()
+
+def shared_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool with ``workers`` workers, created on first use and kept until exit"""
+    with _shared_pools_lock:
+        pool = _shared_pools.get(workers)
+        if pool is None:
+            pool = _shared_pools[workers] = create_process_pool(workers)
+        return pool
+
+def discard_process_pool(pool: ProcessPoolExecutor):
+    """Drop a broken shared pool so the next call starts a fresh one"""
+    with _shared_pools_lock:
+        for workers, shared in list(_shared_pools.items()):
+            if shared is pool:
+                del _shared_pools[workers]
+    pool.shutdown(wait=False)
+
+@atexit.register
+def close_process_pools():
+    """Shut down the shared pools' worker processes"""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+def resolve_jobs(jobs: Optional[int], default: int) -> int:
+    """Worker count from an argument or setting (None = default, 0 = one per core)"""
+    jobs = default if jobs is None else jobs
+    return cpu_count() if jobs == 0 else max(1, jobs)
+
+def map_processes(func: Callable, items: List[Tuple], jobs: int) -> List[Tuple[Any, Optional[str]]]:
+    """(result, None) or (None, error message) for func(*item) per item, in input order
+
+    Runs on up to ``jobs`` spawned worker processes (in-process for
+    jobs <= 1 or a single item) from a pool shared with later calls; func
+    must be picklable, e.g. a module-level function or a bound method of a
+    picklable object. An exception raised for one item becomes that item's
+    error without affecting the others, and if the pool breaks (a worker
+    crashed) it is discarded and the unfinished items are run in-process
+    instead.
+    """
+
+    def call(item: Tuple) -> Tuple[Any, Optional[str]]:
+        try:
+            return func(*item), None
+        except Exception as e:
+            return None, str(e)
+
+    jobs = min(jobs, len(items))
+    if jobs <= 1:
+        return [call(item) for item in items]
+
+    outcomes: List[Optional[Tuple[Any, Optional[str]]]] = [None] * len(items)
+    pool = shared_process_pool(jobs)
+    try:
+        futures = [pool.submit(func, *item) for item in items]
+        for index, future in enumerate(futures):
+            try:
+                outcomes[index] = (future.result(), None)
+            except BrokenProcessPool:
+                discard_process_pool(pool)
+                break
+            except Exception as e:
+                outcomes[index] = (None, str(e))
+    except (BrokenProcessPool, RuntimeError):
+        # Broken or discarded after a crash in another thread's batch
+        discard_process_pool(pool)
+
+    return [outcome if outcome is not None else call(item) for outcome, item in zip(outcomes, items)]
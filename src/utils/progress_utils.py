@@ -47,7 +47,8 @@ def write_progress(
     current_model: str = None,
     model_progress: dict = None,
     endpoint: str = None,
-    latest_image: str = None
+    latest_image: str = None,
+    canaries: dict = None
 ) -> None:
     """Create/overwrite the progress JSON file with detailed tracking.
 
@@ -61,6 +62,7 @@ def write_progress(
         model_progress: Dict with "current" and "total" for model counter.
         endpoint: The API endpoint/provider being used.
         latest_image: Filename of the most recently generated image.
+        canaries: Per-model canary status ("running", "passed" or "failed") and latency.
     """
     if total_tasks <= 0:
         # Avoid division by zero; treat as 100 % complete.
@@ -89,6 +91,8 @@ def write_progress(
         data["endpoint"] = endpoint
     if latest_image:
         data["latest_image"] = latest_image
+    if canaries:
+        data["canaries"] = canaries
     
     # Ensure parent dir exists (it should, but be safe).
     PROGRESS_FILE.parent.mkdir(parents=True, exist_ok=True)
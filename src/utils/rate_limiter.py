@@ -0,0 +1,177 @@
+# src/utils/rate_limiter.py
+"""
+Token-bucket rate limiting per provider and per provider:model
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+from ..core.config import Config, RATE_LIMITS
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+class RateLimiter:
+    """Token bucket (requests/min with a burst) plus an optional concurrency cap
+
+    Callers reserve a token and wait for their slot, so submissions are
+    spread out ahead of the provider's limit instead of bursting into 429s.
+    A 429 pauses the bucket for Retry-After and halves the rate; successes
+    restore it gradually (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, burst: int = None,
+                 max_concurrent: int = None):
+        self.name = name
+        self.configured_rate = requests_per_minute / 60.0
+        self.rate = self.configured_rate
+        self.capacity = float(burst or max(1, int(requests_per_minute // 10)))
+        self.max_concurrent = max_concurrent
+        self.logger = logging.getLogger("rate_limiter")
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        start = max(self._last, self._paused_until)
+        if now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._last = max(now, self._last)
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, self._paused_until - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def _try_enter(self) -> bool:
+        if self.max_concurrent is None:
+            return True
+        with self._cond:
+            if self._active < self.max_concurrent:
+                self._active += 1
+                return True
+            return False
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.max_concurrent is not None:
+            with self._cond:
+                while self._active >= self.max_concurrent:
+                    self._cond.wait()
+                self._active += 1
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        """Wait on the event loop until a request may be sent"""
+        while not self._try_enter():
+            await asyncio.sleep(0.05)
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self):
+        """Mark a request started by acquire() as finished"""
+        if self.max_concurrent is None:
+            return
+        with self._cond:
+            self._active = max(0, self._active - 1)
+            self._cond.notify()
+
+    def throttle(self, retry_after: float):
+        """Pause the bucket after a 429 and back off the sustained rate"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._tokens = min(self._tokens, 0.0)
+            self.rate = max(self.configured_rate / 8, self.rate / 2)
+        self.logger.warning(f"{self.name}: throttled for {retry_after:.1f}s, "
+                            f"rate now {self.rate * 60:.1f}/min")
+
+    def on_success(self):
+        """Recover towards the configured rate after a successful request"""
+        with self._cond:
+            if self.rate < self.configured_rate:
+                self.rate = min(self.configured_rate, self.rate + self.configured_rate * 0.05)
+
+class RateLimitGroup:
+    """The provider-wide limiter combined with an optional per-model limiter"""
+
+    def __init__(self, limiters: List[RateLimiter]):
+        self.limiters = limiters
+
+    def acquire(self):
+        for limiter in self.limiters:
+            limiter.acquire()
+
+    async def aacquire(self):
+        for limiter in self.limiters:
+            await limiter.aacquire()
+
+    def release(self):
+        for limiter in reversed(self.limiters):
+            limiter.release()
+
+    def throttle(self, retry_after: float):
+        for limiter in self.limiters:
+            limiter.throttle(retry_after)
+
+    def on_success(self):
+        for limiter in self.limiters:
+            limiter.on_success()
+
+class RateLimiterRegistry:
+    """Create limiters lazily from RATE_LIMITS ("provider" and "provider:model" keys)"""
+
+    def __init__(self, limits: Dict[str, Dict] = None):
+        self.limits = limits if limits is not None else RATE_LIMITS
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[RateLimiter]:
+        config = self.limits.get(key)
+        if not config:
+            return None
+        with self._lock:
+            if key not in self._limiters:
+                self._limiters[key] = RateLimiter(
+                    key,
+                    requests_per_minute=config.get("requests_per_minute", 60),
+                    burst=config.get("burst"),
+                    max_concurrent=config.get("max_concurrent")
+                )
+            return self._limiters[key]
+
+    def get(self, provider: str, model: str) -> RateLimitGroup:
+        """Limiters that apply to a provider:model call"""
+        if not Config.RATE_LIMIT_ENABLED:
+            return RateLimitGroup([])
+        limiters = [self._get(provider), self._get(f"{provider}:{model}")]
+        return RateLimitGroup([limiter for limiter in limiters if limiter is not None])
+
+# Global registry instance
+rate_limiters = RateLimiterRegistry()
@@ -0,0 +1,9 @@
+# tests/conftest.py
+"""
+Shared test setup: make the project root importable as the ``src`` package
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,105 @@
+# tests/test_async_engine.py
+"""
+Async generation engine behind per-model circuit breakers
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.core.circuit_breaker import CircuitBreakerRegistry
+from src.core.config import Config
+
+pytest.importorskip("openai")  # imported by src.generators.base
+pytest.importorskip("rembg")  # imported by the background remover
+from src.core.pipeline import GenerationPipeline
+from src.generators.base import GenerationResult
+
+def make_tasks(count, model="slow"):
+    return [{"prompt": {"id": f"p{i}", "prompt": "logo"}, "provider": "standin", "model": model,
+             "params": {}, "prompt_idx": i, "prompt_total": count, "model_idx": 0, "model_total": 1}
+            for i in range(count)]
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    for name in ("RAW_DIR", "PROCESSED_DIR", "ICONS_DIR", "LOGS_DIR", "CACHE_DIR"):
+        monkeypatch.setattr(Config, name, tmp_path / name.lower())
+    pipeline = GenerationPipeline()
+    monkeypatch.setattr(pipeline, "_update_detailed_progress", lambda *args: None)
+    return pipeline
+
+def test_tasks_share_one_loop_behind_the_probe(pipeline, monkeypatch):
+    spans = {}
+    active, peak = [0], [0]
+
+    async def generate(task):
+        start = time.time()
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        spans[task["prompt"]["id"]] = (start, time.time())
+        return GenerationResult(True, task["prompt"]["id"], task["model"])
+    monkeypatch.setattr(pipeline, "_agenerate_single_image", generate)
+
+    results = asyncio.run(pipeline._aexecute_generation_tasks(make_tasks(40), 8))
+
+    assert len(results) == 40 and all(result.success for result in results)
+    probe_end = spans.pop("p0")[1]
+    assert all(start >= probe_end for start, _ in spans.values())
+    assert peak[0] == 8
+
+def test_fatal_probe_skips_the_model(pipeline, monkeypatch):
+    calls = []
+
+    async def generate(task):
+        calls.append(task["prompt"]["id"])
+        return GenerationResult(False, task["prompt"]["id"], task["model"],
+                                error="401 Unauthorized", status_code=401)
+    monkeypatch.setattr(pipeline, "_agenerate_single_image", generate)
+
+    results = asyncio.run(pipeline._aexecute_generation_tasks(make_tasks(10), 4))
+
+    assert calls == ["p0"] and len(results) == 1
+
+def count_admits(breakers, monkeypatch):
+    admits = []
+    breaker = breakers.get("standin:slow")
+    admit = breaker.admit
+    monkeypatch.setattr(breaker, "admit", lambda: admits.append(1) or admit())
+    return admits
+
+def test_tasks_wait_for_a_slow_canary_without_spinning(pipeline, monkeypatch):
+    admits = count_admits(pipeline.circuit_breakers, monkeypatch)
+
+    async def generate(task):
+        await asyncio.sleep(0.5 if task["prompt"]["id"] == "p0" else 0)
+        return GenerationResult(True, task["prompt"]["id"], task["model"])
+    monkeypatch.setattr(pipeline, "_agenerate_single_image", generate)
+
+    results = asyncio.run(pipeline._aexecute_generation_tasks(make_tasks(200), 8))
+
+    assert len(results) == 200 and all(result.success for result in results)
+    assert pipeline.canaries["standin:slow"]["status"] == "passed"
+    # One admit per task, plus one retry for each task held back behind the canary
+    assert len(admits) <= 2 * 200
+
+def test_tasks_wait_out_an_open_cooldown(pipeline, monkeypatch):
+    pipeline.circuit_breakers = CircuitBreakerRegistry(open_seconds=0.3)
+    admits = count_admits(pipeline.circuit_breakers, monkeypatch)
+    calls = []
+
+    async def generate(task):
+        calls.append(time.time())
+        if len(calls) == 1:
+            return GenerationResult(False, task["prompt"]["id"], task["model"], error="busy", status_code=503)
+        return GenerationResult(True, task["prompt"]["id"], task["model"])
+    monkeypatch.setattr(pipeline, "_agenerate_single_image", generate)
+
+    start = time.time()
+    results = asyncio.run(pipeline._aexecute_generation_tasks(make_tasks(50), 4))
+
+    assert len(results) == 50
+    assert calls[1] - start >= 0.3
+    assert len(admits) <= 4 * 50
@@ -0,0 +1,48 @@
+# tests/test_cache_utils.py
+"""
+DiskLRUCache storage and eviction
+"""
+
+import threading
+
+from src.utils.cache_utils import DiskLRUCache, make_cache_key
+
+def test_key_ignores_dict_order():
+    assert make_cache_key("a", {"x": 1, "y": 2}) == make_cache_key("a", {"y": 2, "x": 1})
+    assert make_cache_key("a", {"x": 1}) != make_cache_key("a", {"x": 2})
+
+def source_file(tmp_path, name, size):
+    path = tmp_path / f"{name}.bin"
+    path.write_bytes(b"x" * size)
+    return path
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskLRUCache(tmp_path / "cache", max_bytes=250)
+    for key in ("a", "b"):
+        cache.put(key, source_file(tmp_path, key, 100))
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", source_file(tmp_path, "c", 100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 200
+
+def test_entry_larger_than_the_budget_is_not_cached(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=100)
+    cache.put_bytes("small", b"x" * 50, ".bin")
+
+    assert cache.put_bytes("large", b"x" * 101, ".bin") is None
+    assert cache.get("large") is None
+    assert cache.get("small") is not None
+
+def test_concurrent_writers_of_one_key_publish_whole_files(tmp_path):
+    cache = DiskLRUCache(tmp_path, max_bytes=64 * 1024 * 1024)
+    contents = [bytes([i]) * (2 * 1024 * 1024 + i) for i in range(8)]
+    threads = [threading.Thread(target=cache.put_bytes, args=("same", data, ".bin")) for data in contents]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.get("same").read_bytes() in contents
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,95 @@
+# tests/test_circuit_breaker.py
+"""
+Per-model circuit breakers
+"""
+
+import time
+
+import pytest
+
+from src.core.circuit_breaker import (FAILURE_PERMANENT, FAILURE_TRANSIENT, CircuitBreaker,
+                                      CircuitBreakerRegistry, classify_failure)
+
+def make_breaker(**options):
+    defaults = dict(window=4, min_calls=4, failure_rate=0.5, open_seconds=0.1,
+                    max_open_seconds=1.0, max_probes=3)
+    return CircuitBreaker("standin:model", **{**defaults, **options})
+
+def close(breaker):
+    assert breaker.admit() is True
+    breaker.record(True, True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.parametrize("status, kind", [
+    (None, FAILURE_TRANSIENT), (429, FAILURE_TRANSIENT), (503, FAILURE_TRANSIENT),
+    (401, FAILURE_PERMANENT), (404, FAILURE_PERMANENT), (400, None), (422, None)
+])
+def test_classify_failure(status, kind):
+    assert classify_failure(status) == kind
+
+def test_first_call_is_the_only_probe():
+    breaker = make_breaker()
+    assert breaker.admit() is True
+    assert breaker.admit() is None
+    assert breaker.retry_in() == 0.0
+    breaker.record(True, True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.admit() is False
+
+def test_transient_failure_rate_opens_then_probe_closes():
+    breaker = make_breaker()
+    close(breaker)
+    for success in (True, False, True, False):
+        breaker.record(False, success, None if success else 503, "busy")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.admit() is None
+    assert 0 < breaker.retry_in() <= 0.1
+
+    time.sleep(0.11)
+    assert breaker.admit() is True
+    breaker.record(True, True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.trips == 1
+
+def test_request_errors_do_not_count():
+    breaker = make_breaker()
+    close(breaker)
+    for _ in range(8):
+        breaker.record(False, False, 400, "prompt rejected")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_failed_probe_doubles_cooldown_until_dead():
+    breaker = make_breaker(max_probes=2)
+    assert breaker.admit() is True
+    breaker.record(True, False, 503, "busy")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_in() == pytest.approx(0.1, abs=0.02)
+
+    time.sleep(0.11)
+    assert breaker.admit() is True
+    breaker.record(True, False, 503, "busy")
+    assert breaker.dead
+    assert breaker.retry_in() is None
+    assert breaker.admit() is None
+
+def test_permanent_failure_kills_the_model():
+    breaker = make_breaker()
+    close(breaker)
+    breaker.record(False, False, 401, "bad key")
+    assert breaker.dead
+    assert breaker.snapshot() == {"state": "dead", "trips": 0, "failed_probes": 0, "last_error": "bad key"}
+
+def test_registry_reuses_breakers_and_lists_dead_models():
+    registry = CircuitBreakerRegistry(open_seconds=0.1)
+    assert registry.get("a:m") is registry.get("a:m")
+    registry.get("b:m").record(False, False, 403, "forbidden")
+    assert registry.dead_models() == ["b:m"]
+    assert set(registry.snapshot()) == {"a:m", "b:m"}
+
+def test_probe_in_flight():
+    breaker = make_breaker()
+    assert not breaker.probe_in_flight
+    breaker.admit()
+    assert breaker.probe_in_flight
+    breaker.record(True, True)
+    assert not breaker.probe_in_flight
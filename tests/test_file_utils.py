@@ -0,0 +1,28 @@
+# tests/test_file_utils.py
+"""
+Async image download
+"""
+
+import asyncio
+import logging
+
+import httpx
+
+from src.utils.file_utils import adownload_image
+
+def run_download(handler, output_path):
+    async def download():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await adownload_image("http://example.test/a.png", output_path, client)
+    return asyncio.run(download())
+
+def test_download_writes_file(tmp_path):
+    output = tmp_path / "raw" / "a.png"
+    assert run_download(lambda request: httpx.Response(200, content=b"\x89PNG"), output)
+    assert output.read_bytes() == b"\x89PNG"
+
+def test_download_failure_is_logged_not_printed(tmp_path, capsys, caplog):
+    with caplog.at_level(logging.ERROR, logger="file_utils"):
+        assert not run_download(lambda request: httpx.Response(404), tmp_path / "a.png")
+    assert capsys.readouterr().out == ""
+    assert "Failed to download http://example.test/a.png" in caplog.text
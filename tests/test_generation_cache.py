@@ -0,0 +1,34 @@
+# tests/test_generation_cache.py
+"""
+Content-addressed generation cache
+"""
+
+from src.generators.cache import GenerationCache
+
+def test_hit_is_copied_to_a_new_output(tmp_path):
+    cache = GenerationCache(tmp_path / "cache")
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n")
+    cache.store_result("replicate", "flux_schnell", "logo", image)
+
+    restored = cache.lookup("replicate", "flux_schnell", "logo", "p2", tmp_path / "out")
+
+    assert restored.parent == tmp_path / "out" and restored.read_bytes() == image.read_bytes()
+    assert cache.lookup("replicate", "flux_schnell", "other logo", "p3", tmp_path / "out") is None
+    assert cache.lookup("replicate", "flux_dev", "logo", "p4", tmp_path / "out") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+def test_params_and_seed_are_part_of_the_key(tmp_path):
+    cache = GenerationCache(tmp_path / "cache")
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n")
+    params = {"width": 768, "height": 768, "seed": 42}
+    cache.store_result("replicate", "flux_schnell", "logo", image, params=params)
+
+    def lookup(params):
+        return cache.lookup("replicate", "flux_schnell", "logo", "p1", tmp_path / "out", params=params)
+
+    assert lookup({"seed": 42, "height": 768, "width": 768}) is not None
+    assert lookup({**params, "seed": 7}) is None
+    assert lookup({**params, "width": 1024}) is None
+    assert lookup(None) is None
@@ -0,0 +1,26 @@
+# tests/test_generator_params.py
+"""
+Per-provider filtering of prompt request params
+"""
+
+import pytest
+
+pytest.importorskip("openai")  # imported by src.generators.base
+from src.generators.openai import OpenAIGenerator
+from src.generators.replicate import ReplicateGenerator
+
+PROMPT = {"id": "p1", "prompt": "logo", "seed": 42, "params": {"size": "1792x1024", "width": 768}}
+
+def test_openai_drops_params_images_generate_rejects():
+    generator = OpenAIGenerator("test-key")
+    params = generator._build_params("logo", "dalle3", seed=42, width=768, size="1792x1024")
+    assert "seed" not in params and "width" not in params
+    assert params["size"] == "1792x1024"
+
+def test_task_params_are_filtered_per_provider():
+    pytest.importorskip("rembg")  # imported by the pipeline's background remover
+    from src.core.pipeline import GenerationPipeline
+
+    assert GenerationPipeline._generation_params(PROMPT, OpenAIGenerator("test-key")) == {"size": "1792x1024"}
+    assert GenerationPipeline._generation_params(PROMPT, ReplicateGenerator("test-key")) == \
+        {"size": "1792x1024", "width": 768, "seed": 42}
@@ -0,0 +1,48 @@
+# tests/test_http_utils.py
+"""
+Connection pool hit/miss counters against a local server
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.http_utils import close_sessions, get_pool_stats, get_session
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+        # Drop the keep-alive connection without announcing it
+        self.close_connection = self.path == "/drop"
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    close_sessions()
+
+def test_keep_alive_reuse_is_a_hit(server):
+    session = get_session("test-reuse")
+    for _ in range(3):
+        session.get(f"{server}/keep", timeout=5).raise_for_status()
+    assert get_pool_stats()["test-reuse"] == {"requests": 3, "hits": 2, "misses": 1}
+
+def test_reconnect_after_dropped_keep_alive_is_a_miss(server):
+    session = get_session("test-drop")
+    session.get(f"{server}/drop", timeout=5).raise_for_status()
+    time.sleep(0.2)  # let the server close its end
+    session.get(f"{server}/keep", timeout=5).raise_for_status()
+    assert get_pool_stats()["test-drop"] == {"requests": 2, "hits": 0, "misses": 2}
@@ -0,0 +1,68 @@
+# tests/test_ico_converter.py
+"""
+ICO frames built from the halving pyramid
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.processors.ico_converter import ICOConverter
+from src.processors.resampling import build_pyramid
+
+SIZES = [16, 32, 48, 64, 128, 256]
+
+def logo(width=1024, height=1024):
+    """Opaque disc with a colored ring on a transparent background"""
+    y, x = np.mgrid[:height, :width]
+    radius = np.hypot(x - width / 2, y - height / 2) / (min(width, height) / 2)
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[radius < 0.8] = (20, 90, 200, 255)
+    rgba[(radius >= 0.6) & (radius < 0.8)] = (240, 180, 30, 255)
+    # Bright color under full transparency must not bleed into edges
+    rgba[radius >= 0.8, :3] = 255
+    return Image.fromarray(rgba, "RGBA")
+
+def premultiplied(img):
+    rgba = np.asarray(img, dtype=np.float32)
+    return np.concatenate([rgba[..., :3] * rgba[..., 3:] / 255, rgba[..., 3:]], -1)
+
+def test_pyramid_has_every_size():
+    frames = build_pyramid(logo(), SIZES)
+
+    assert sorted(frames) == SIZES
+    for size, frame in frames.items():
+        assert frame.size == (size, size) and frame.mode == "RGBA"
+
+@pytest.mark.parametrize("size", [16, 48, 256])
+def test_pyramid_matches_a_direct_resize(size):
+    source = logo()
+    frame = premultiplied(build_pyramid(source, [size])[size])
+    direct = premultiplied(source.convert("RGBa").resize((size, size), Image.Resampling.LANCZOS).convert("RGBA"))
+
+    assert np.abs(frame - direct).mean() < 1.5
+
+def test_transparent_color_does_not_bleed_into_edges():
+    frame = np.asarray(build_pyramid(logo(), [32])[32], dtype=np.int16)
+    edge = (frame[..., 3] > 0) & (frame[..., 3] < 255)
+
+    assert edge.any()
+    # Straight-alpha resizing would pull the white background into the ring's yellow
+    assert frame[edge][:, 2].max() < 120
+
+def test_non_square_source_is_squared_like_a_direct_resize():
+    source = logo(1200, 600)
+    frame = premultiplied(build_pyramid(source, [64])[64])
+    direct = premultiplied(source.convert("RGBa").resize((64, 64), Image.Resampling.LANCZOS).convert("RGBA"))
+
+    assert frame.shape == (64, 64, 4)
+    assert np.abs(frame - direct).mean() < 1.5
+
+def test_convert_image_writes_every_size(tmp_path):
+    source = tmp_path / "logo.png"
+    logo().save(source)
+    output = tmp_path / "icons" / "logo.ico"
+
+    assert ICOConverter(SIZES).convert_image(source, output)
+    with Image.open(output) as ico:
+        assert sorted(ico.info["sizes"]) == [(size, size) for size in SIZES]
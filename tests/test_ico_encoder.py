@@ -0,0 +1,69 @@
+# tests/test_ico_encoder.py
+"""
+Compact ICO encoding
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.processors.ico_converter import ICOConverter, write_ico
+from src.processors.ico_encoder import encode_frame, exact_palette, palette_error, write_compact_ico
+from src.processors.ico_header import read_ico_frames
+
+def flat_frame(size):
+    """Few-color frame with an anti-aliased-looking translucent border"""
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    rgba[2:-2, 2:-2] = (30, 120, 220, 255)
+    rgba[1, 1:-1] = rgba[-2, 1:-1] = (30, 120, 220, 128)
+    rgba[size // 3:size // 2, size // 3:-size // 3] = (250, 250, 250, 255)
+    return Image.fromarray(rgba, "RGBA")
+
+def noisy_frame(size):
+    rng = np.random.default_rng(1)
+    return Image.fromarray(rng.integers(0, 256, (size, size, 4), dtype=np.uint8), "RGBA")
+
+def test_exact_palette_is_lossless():
+    frame = flat_frame(48)
+    palettized = exact_palette(frame)
+
+    assert palettized.mode == "P"
+    assert np.array_equal(np.asarray(palettized.convert("RGBA")), np.asarray(frame))
+    assert palette_error(frame, palettized) == 0
+    assert exact_palette(noisy_frame(48)) is None
+
+def test_encode_frame_never_grows_the_standard_png():
+    for frame in (flat_frame(64), noisy_frame(64)):
+        standard, compact = encode_frame(frame)
+        assert len(compact) <= len(standard)
+
+    standard, compact = encode_frame(flat_frame(64))
+    assert len(compact) < len(standard)
+
+def test_lossy_palette_is_rejected_above_the_error_limit():
+    frame = noisy_frame(32)
+    standard, compact = encode_frame(frame, max_palette_error=0)
+
+    with Image.open(io.BytesIO(compact)) as img:
+        assert np.array_equal(np.asarray(img.convert("RGBA")), np.asarray(frame))
+
+def test_compact_ico_is_smaller_and_reads_back(tmp_path):
+    frames = {size: flat_frame(size) for size in (16, 32, 48, 256)}
+    standard_path, compact_path = tmp_path / "standard.ico", tmp_path / "compact.ico"
+    write_ico(frames, standard_path)
+
+    saved = write_compact_ico(frames, compact_path)
+
+    assert saved > 0
+    assert compact_path.stat().st_size == standard_path.stat().st_size - saved
+    assert [frame["width"] for frame in read_ico_frames(compact_path)] == [16, 32, 48, 256]
+    with Image.open(compact_path) as ico:
+        for size, frame in frames.items():
+            decoded = ico.ico.getimage((size, size)).convert("RGBA")
+            assert np.array_equal(np.asarray(decoded), np.asarray(frame))
+
+def test_converter_rejects_unknown_encodings():
+    with pytest.raises(ValueError):
+        ICOConverter(encoding="tiny")
@@ -0,0 +1,65 @@
+# tests/test_ico_header.py
+"""
+ICO directory reader
+"""
+
+import io
+import struct
+
+import pytest
+from PIL import Image
+
+from src.processors.ico_converter import ICOConverter
+from src.processors.ico_header import ICOFormatError, read_ico_frames
+
+SIZES = [16, 32, 48, 256]
+
+@pytest.fixture
+def ico(tmp_path):
+    source = tmp_path / "logo.png"
+    Image.new("RGBA", (300, 300), (200, 40, 40, 255)).save(source)
+    output = tmp_path / "logo.ico"
+    assert ICOConverter(SIZES).convert_image(source, output)
+    return output
+
+def test_lists_frames_like_pillow(ico):
+    frames = read_ico_frames(ico)
+
+    assert [(frame["width"], frame["height"]) for frame in frames] == [(size, size) for size in SIZES]
+    assert all(frame["encoding"] == "png" and frame["bit_count"] == 32 for frame in frames)
+    data = ico.read_bytes()
+    for frame in frames:
+        blob = data[frame["offset"]:frame["offset"] + frame["bytes"]]
+        with Image.open(io.BytesIO(blob)) as img:
+            assert img.size == (frame["width"], frame["height"])
+
+def test_bmp_frames_are_recognized(tmp_path):
+    output = tmp_path / "bmp.ico"
+    Image.new("RGBA", (32, 32), (0, 0, 255, 255)).save(output, format="ICO", sizes=[(32, 32)], bitmap_format="bmp")
+
+    [frame] = read_ico_frames(output)
+    assert frame["encoding"] == "bmp" and frame["bit_count"] == 32 and frame["width"] == 32
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:4],                                  # short header
+    lambda data: b"\x00\x00\x02\x00" + data[4:],            # cursor, not icon
+    lambda data: data[:4] + b"\x00\x00" + data[6:],         # no frames
+    lambda data: data[:20],                                 # truncated directory
+    lambda data: data[:-10],                                # last frame runs past the end
+    lambda data: data[:6] + data[6:14] + struct.pack("<II", 64, 1) + data[22:]  # frame inside the directory
+])
+def test_malformed_files_raise(ico, corrupt):
+    ico.write_bytes(corrupt(ico.read_bytes()))
+
+    with pytest.raises(ICOFormatError):
+        read_ico_frames(ico)
+
+def test_verify_batch_reports_bad_and_incomplete_icons(tmp_path, ico):
+    broken = tmp_path / "broken.ico"
+    broken.write_bytes(b"not an icon")
+
+    report = ICOConverter(SIZES + [64]).verify_batch([ico, broken])
+
+    assert report["checked"] == 2 and report["valid"] == 0
+    assert "missing sizes [64]" in report["invalid"][str(ico)]
+    assert str(broken) in report["invalid"]
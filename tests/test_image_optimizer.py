@@ -0,0 +1,97 @@
+# tests/test_image_optimizer.py
+"""
+ImageOptimizer size targeting
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, features
+
+import src.processors.image_optimizer as image_optimizer
+from src.core.config import Config
+from src.processors.image_optimizer import ImageOptimizer, encode_image
+
+@pytest.fixture
+def detailed_png(tmp_path):
+    """800x800 noise image: its optimized 4:4:4 JPEG outgrows Pillow's in-memory buffer"""
+    pixels = (np.random.default_rng(1).random((800, 800, 3)) * 255).astype(np.uint8)
+    path = tmp_path / "detailed.png"
+    Image.fromarray(pixels).save(path)
+    return path
+
+@pytest.fixture
+def noisy_png(tmp_path):
+    """600x600 gradient with mild noise, above 60 KB as a JPEG at quality 85"""
+    y, x = np.mgrid[:600, :600]
+    gradient = np.stack([x * 255 / 600, y * 255 / 600, (x + y) * 255 / 1200], -1)
+    pixels = gradient + np.random.default_rng(2).normal(0, 12, gradient.shape)
+    path = tmp_path / "noisy.png"
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path)
+    return path
+
+@pytest.fixture
+def encodes(monkeypatch):
+    calls = []
+    def counting(*args, **kwargs):
+        calls.append(args[1:])
+        return encode_image(*args, **kwargs)
+    monkeypatch.setattr(image_optimizer, "encode_image", counting)
+    return calls
+
+@pytest.mark.parametrize("suffix", [".jpg", ".webp", ".png"])
+def test_output_fits_and_decodes(noisy_png, tmp_path, suffix):
+    output = tmp_path / f"out{suffix}"
+    assert ImageOptimizer().optimize_image(noisy_png, output, max_size_kb=60)
+    with Image.open(output) as img:
+        img.load()
+    if suffix != ".png":  # lossless output is not size-targeted
+        assert output.stat().st_size <= 60 * 1024
+
+def test_detailed_jpeg_encodes_in_memory(detailed_png):
+    with Image.open(detailed_png) as img:
+        data = encode_image(img, "JPEG", 85, "4:4:4")
+    assert len(data) > 800 * 800  # larger than Pillow's default optimize buffer
+
+@pytest.mark.parametrize("max_size_kb", [2000, 400])
+def test_detailed_jpeg_optimizes(detailed_png, tmp_path, max_size_kb):
+    output = tmp_path / "out.jpg"
+    assert ImageOptimizer().optimize_image(detailed_png, output, max_size_kb=max_size_kb)
+    with Image.open(output) as img:
+        img.load()
+    assert output.stat().st_size <= max_size_kb * 1024
+
+def test_encoder_failure_counts_as_too_large(detailed_png, tmp_path, monkeypatch):
+    def failing_444(img, image_format, quality=None, subsampling=None):
+        if subsampling == "4:4:4":
+            raise OSError("broken data stream when writing image file")
+        return encode_image(img, image_format, quality, subsampling)
+    monkeypatch.setattr(image_optimizer, "encode_image", failing_444)
+
+    output = tmp_path / "out.jpg"
+    assert ImageOptimizer().optimize_image(detailed_png, output, max_size_kb=2000)
+    assert output.stat().st_size <= 2000 * 1024
+
+@pytest.mark.parametrize("suffix", [".jpg", ".webp", ".avif"])
+@pytest.mark.parametrize("max_size_kb", [2000, 200])
+def test_encode_count(detailed_png, tmp_path, encodes, suffix, max_size_kb):
+    if suffix == ".avif" and not features.check("avif"):
+        pytest.skip("Pillow built without AVIF")
+    ImageOptimizer().optimize_image(detailed_png, tmp_path / f"out{suffix}", max_size_kb=max_size_kb)
+    assert 1 <= len(encodes) <= Config.OPTIMIZE_MAX_ENCODES
+    assert len(set(encodes)) == len(encodes)
+
+def test_sharp_chroma_when_budget_allows(tmp_path, encodes):
+    path = tmp_path / "flat.png"
+    Image.new("RGB", (256, 256), (200, 30, 60)).save(path)
+    ImageOptimizer().optimize_image(path, tmp_path / "out.jpg", max_size_kb=500)
+    assert encodes == [("JPEG", 85, "4:2:0"), ("JPEG", 85, "4:4:4")]
+
+def test_search_returns_a_fitting_quality_near_the_best(detailed_png, encodes):
+    with Image.open(detailed_png) as img:
+        img = img.convert("RGB")
+        sizes = {quality: len(encode_image(img, "JPEG", quality, "4:2:0")) for quality in range(30, 90, 5)}
+        encodes.clear()
+        max_bytes = (sizes[50] + sizes[55]) // 2
+        data = ImageOptimizer()._fit_quality(img, "JPEG", max_bytes // 1024, 85, "detailed")
+    assert len(data) <= max_bytes
+    assert len(data) >= sizes[40]
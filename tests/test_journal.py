@@ -0,0 +1,42 @@
+# tests/test_journal.py
+"""
+Append-only job journal
+"""
+
+import pytest
+
+from src.core.config import Config
+from src.core.journal import DOWNLOADED, FAILED, QUEUED, SUBMITTED, JobJournal
+
+@pytest.fixture(autouse=True)
+def logs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "LOGS_DIR", tmp_path)
+
+def test_reopened_journal_replays_options_and_states():
+    journal = JobJournal.create(models=["replicate:flux_schnell"], remove_bg=True)
+    tasks = [JobJournal.task_key("replicate", "flux_schnell", f"p{i}") for i in range(3)]
+    journal.record_many(tasks, QUEUED)
+    journal.record(tasks[0], SUBMITTED, prediction_id="abc")
+    journal.record(tasks[0], DOWNLOADED, file_path="raw/p0.png")
+    journal.record(tasks[1], FAILED, error="HTTP 500")
+
+    reopened = JobJournal.open(journal.job_id)
+
+    assert reopened.options == {"models": ["replicate:flux_schnell"], "remove_bg": True}
+    # Later events update a task without losing fields from earlier ones
+    assert reopened.state(tasks[0])["prediction_id"] == "abc"
+    assert reopened.state(tasks[0])["state"] == DOWNLOADED
+    assert reopened.summary() == {DOWNLOADED: 1, FAILED: 1, QUEUED: 1}
+    assert JobJournal.list_jobs() == [journal.job_id]
+
+def test_torn_last_line_is_ignored():
+    journal = JobJournal.create()
+    journal.record("replicate:flux_schnell:p0", DOWNLOADED)
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"event": "task", "task": "replicate:flux_')
+
+    assert JobJournal.open(journal.job_id).summary() == {DOWNLOADED: 1}
+
+def test_unknown_job_is_an_error():
+    with pytest.raises(ValueError):
+        JobJournal.open("missing")
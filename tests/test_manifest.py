@@ -0,0 +1,69 @@
+# tests/test_manifest.py
+"""
+Processing manifest up-to-date checks
+"""
+
+import os
+import shutil
+
+import pytest
+
+from src.processors.manifest import ProcessingManifest
+
+@pytest.fixture
+def files(tmp_path):
+    source = tmp_path / "logo.png"
+    source.write_bytes(b"image bytes")
+    output = tmp_path / "logo_nobg.png"
+    output.write_bytes(b"processed")
+    return source, output
+
+@pytest.fixture
+def manifest(tmp_path):
+    return ProcessingManifest(tmp_path / "manifest.json")
+
+def test_recorded_input_is_up_to_date(manifest, files):
+    source, output = files
+    assert manifest.up_to_date(source, "rembg", "u2net") is None
+
+    manifest.record(source, "rembg", "u2net", output)
+
+    assert manifest.up_to_date(source, "rembg", "u2net") == output.resolve()
+    assert manifest.up_to_date(source, "ico", "u2net") is None
+
+def test_changed_recipe_content_or_missing_output_is_stale(manifest, files):
+    source, output = files
+    manifest.record(source, "rembg", "u2net", output)
+
+    assert manifest.up_to_date(source, "rembg", "isnet") is None
+
+    source.write_bytes(b"other bytes")
+    assert manifest.up_to_date(source, "rembg", "u2net") is None
+
+    manifest.record(source, "rembg", "u2net", output)
+    output.unlink()
+    assert manifest.up_to_date(source, "rembg", "u2net") is None
+
+def test_touched_but_identical_input_is_up_to_date(manifest, files):
+    source, output = files
+    manifest.record(source, "rembg", "u2net", output)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert manifest.up_to_date(source, "rembg", "u2net") == output.resolve()
+
+def test_saved_manifest_survives_a_restart(tmp_path, manifest, files):
+    source, output = files
+    manifest.record(source, "rembg", "u2net", output)
+    manifest.save()
+
+    reloaded = ProcessingManifest(tmp_path / "manifest.json")
+    assert reloaded.up_to_date(source, "rembg", "u2net") == output.resolve()
+
+def test_copied_input_is_a_different_entry(tmp_path, manifest, files):
+    source, output = files
+    manifest.record(source, "rembg", "u2net", output)
+    copy = tmp_path / "copy.png"
+    shutil.copy(source, copy)
+
+    assert manifest.up_to_date(copy, "rembg", "u2net") is None
@@ -0,0 +1,50 @@
+# tests/test_parallel_utils.py
+"""
+Shared process pool for batch image processing
+"""
+
+import os
+
+from src.utils import parallel_utils
+from src.utils.parallel_utils import close_process_pools, map_processes
+
+# Set in the test process; spawned workers inherit it
+os.environ.setdefault("TEST_PARENT_PID", str(os.getpid()))
+PARENT_PID = int(os.environ["TEST_PARENT_PID"])
+
+def worker_pid(value):
+    if value == "crash" and os.getpid() != PARENT_PID:
+        os._exit(3)
+    if value == "fail":
+        raise ValueError("bad item")
+    return os.getpid()
+
+def test_items_run_in_worker_processes():
+    outcomes = map_processes(worker_pid, [(i,) for i in range(4)], 2)
+    assert len(outcomes) == 4
+    assert all(error is None and pid != PARENT_PID for pid, error in outcomes)
+
+def test_single_job_runs_in_process():
+    assert map_processes(worker_pid, [(1,), (2,)], 1) == [(PARENT_PID, None)] * 2
+
+def test_calls_reuse_one_pool():
+    try:
+        first = map_processes(worker_pid, [(i,) for i in range(4)], 2)
+        second = map_processes(worker_pid, [(i,) for i in range(4)], 2)
+        workers = {pid for pid, _ in first} | {pid for pid, _ in second}
+        assert PARENT_PID not in workers
+        assert len(workers) <= 2
+        assert len(parallel_utils._shared_pools) == 1
+    finally:
+        close_process_pools()
+
+def test_item_errors_and_crashes_are_contained():
+    try:
+        outcomes = map_processes(worker_pid, [(1,), ("fail",), ("crash",), (2,)], 2)
+        assert outcomes[1] == (None, "bad item")
+        assert outcomes[2] == (PARENT_PID, None)  # re-run in-process after the crash
+        assert all(error is None for _, error in outcomes[2:])
+        # The broken pool was replaced
+        assert all(error is None and pid != PARENT_PID for pid, error in map_processes(worker_pid, [(1,), (2,)], 2))
+    finally:
+        close_process_pools()
@@ -0,0 +1,26 @@
+# tests/test_pipeline_journal.py
+"""
+Job journal bookkeeping in the generation pipeline
+"""
+
+import pytest
+
+from src.core.journal import DOWNLOADED, PROCESSED, JobJournal
+
+pytest.importorskip("openai")  # imported by src.generators.base
+pytest.importorskip("rembg")  # imported by the background remover
+from src.core.pipeline import GenerationPipeline
+
+def test_processed_outputs_match_exact_stems(tmp_path):
+    pipeline = GenerationPipeline.__new__(GenerationPipeline)
+    pipeline.journal = JobJournal("job", tmp_path / "job.jsonl")
+    for name in ("logo_1", "logo_10", "logo_2", "logo_3"):
+        pipeline.journal.record(name, DOWNLOADED, file_path=str(tmp_path / f"{name}.png"))
+
+    pipeline._journal_processed({
+        "processed": [tmp_path / "logo_10_nobg.png", tmp_path / "logo_2_nobg.png"],
+        "icons": [tmp_path / "logo_2_nobg.ico", tmp_path / "logo_3.ico"]
+    })
+
+    states = {name: pipeline.journal.state(name)["state"] for name in ("logo_1", "logo_10", "logo_2", "logo_3")}
+    assert states == {"logo_1": DOWNLOADED, "logo_10": PROCESSED, "logo_2": PROCESSED, "logo_3": PROCESSED}
@@ -0,0 +1,82 @@
+# tests/test_poller.py
+"""
+Shared prediction poller and latency samples
+"""
+
+import itertools
+from pathlib import Path
+
+import pytest
+
+from src.generators import poller as poller_module
+from src.generators.latency import LatencyHistory, PollSchedule
+from src.generators.poller import PredictionPoller
+
+@pytest.fixture
+def samples(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(poller_module.latency_history, "record",
+                        lambda model_key, seconds: recorded.append((model_key, seconds)))
+    return recorded
+
+def test_poll_until_done_and_record_latency(samples):
+    polls = itertools.count(1)
+    future = PredictionPoller().track("p1", lambda: (next(polls) >= 3, "url"),
+                                      PollSchedule.fixed(0.01, 5), "standin:model")
+    assert future.result(timeout=5) == "url"
+    assert [key for key, _ in samples] == ["standin:model"]
+
+def test_schedule_adapts_to_recorded_latency(tmp_path):
+    history = LatencyHistory(tmp_path / "latency.json")
+    assert history.schedule("standin:model", 2.0, 120).first_delay == 2.0
+
+    for seconds in range(10, 20):
+        history.record("standin:model", seconds)
+    schedule = history.schedule("standin:model", 2.0, 120)
+
+    assert 9 <= schedule.first_delay < 11
+    assert schedule.interval < 2.0
+    assert schedule.slow_after == history.percentile("standin:model", 90)
+    history.save()
+    assert LatencyHistory(tmp_path / "latency.json").sample_count("standin:model") == 10
+
+def test_failures_and_untracked_models_record_nothing(samples):
+    def broken():
+        raise ConnectionError("reset")
+
+    poller = PredictionPoller()
+    assert poller.track("p1", lambda: (True, None), PollSchedule.fixed(0.01, 5), "standin:model").result(5) is None
+    assert poller.track("p2", broken, PollSchedule.fixed(0.01, 5), "standin:model").result(5) is None
+    assert poller.track("p3", lambda: (False, None), PollSchedule.fixed(0.01, 0.1), "standin:model").result(5) is None
+    assert poller.track("p4", lambda: (True, "url"), PollSchedule.fixed(0.01, 5)).result(5) == "url"
+    assert samples == []
+
+def test_resolve_finishes_a_tracked_prediction(samples):
+    poller = PredictionPoller()
+    future = poller.track("p1", lambda: (False, None), PollSchedule.fixed(60, 60))
+    assert poller.resolve("p1", "url")
+    assert future.result(timeout=1) == "url"
+
+def test_resolve_before_track_is_handed_out(samples):
+    poller = PredictionPoller()
+    assert not poller.resolve("early", "url")
+    assert poller.track("early", lambda: (False, None), PollSchedule.fixed(60, 60)).result(1) == "url"
+
+def test_then_chains_without_waiting():
+    poller = PredictionPoller()
+    future = poller.track("p1", lambda: (True, 2), PollSchedule.fixed(0.01, 5))
+    assert poller.then(future, lambda value: value * 10).result(timeout=5) == 20
+
+def test_resumed_prediction_records_no_latency(samples, tmp_path, monkeypatch):
+    pytest.importorskip("openai")  # imported by src.generators.base
+    from src.generators.replicate import ReplicateGenerator
+
+    generator = ReplicateGenerator("test-key")
+    generator._parse_prediction = lambda data: (True, "http://example.test/a.png")
+    response = type("Response", (), {"status_code": 200, "json": lambda self: {}})()
+    monkeypatch.setattr(generator.session, "get", lambda *args, **kwargs: response)
+    generator._download_and_save = lambda *args: tmp_path / "a.png"
+
+    result = generator.resume({"prediction_id": "p1"}, "p1", "flux_schnell", tmp_path)
+    assert result.success and result.file_path == Path(tmp_path / "a.png")
+    assert samples == []
@@ -0,0 +1,92 @@
+# tests/test_rate_limiter.py
+"""
+Token-bucket rate limiting
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from src.core.config import Config
+from src.utils.rate_limiter import RateLimiter, RateLimiterRegistry, parse_retry_after
+
+@pytest.mark.parametrize("value, expected", [("5", 5.0), ("-3", 0.0), (None, None), ("soon", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+def test_parse_retry_after_http_date():
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+
+def test_burst_then_spaced_at_the_rate():
+    limiter = RateLimiter("test", requests_per_minute=600, burst=3)  # one token per 0.1s
+    waits = [limiter.reserve() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.1, abs=0.02)
+    assert waits[4] == pytest.approx(0.2, abs=0.02)
+
+def test_throttle_pauses_and_halves_the_rate():
+    limiter = RateLimiter("test", requests_per_minute=600, burst=5)
+    limiter.throttle(0.5)
+    assert limiter.rate == pytest.approx(5.0)
+    assert limiter.reserve() == pytest.approx(0.5 + 0.2, abs=0.05)
+
+def test_rate_floor_and_recovery():
+    limiter = RateLimiter("test", requests_per_minute=600)
+    for _ in range(10):
+        limiter.throttle(0)
+    assert limiter.rate == pytest.approx(10.0 / 8)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == pytest.approx(10.0)
+
+def test_concurrency_cap():
+    limiter = RateLimiter("test", requests_per_minute=60000, burst=100, max_concurrent=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def call():
+        limiter.acquire()
+        try:
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+        finally:
+            limiter.release()
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+def test_async_acquire_respects_the_cap():
+    limiter = RateLimiter("test", requests_per_minute=60000, burst=100, max_concurrent=1)
+
+    async def run():
+        await limiter.aacquire()
+        second = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.1)
+        assert not second.done()
+        limiter.release()
+        await asyncio.wait_for(second, 1)
+        limiter.release()
+
+    asyncio.run(run())
+
+def test_registry_combines_provider_and_model_limits(monkeypatch):
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", True)
+    registry = RateLimiterRegistry({"standin": {"requests_per_minute": 60},
+                                    "standin:slow": {"requests_per_minute": 6, "burst": 1}})
+    assert [limiter.name for limiter in registry.get("standin", "slow").limiters] == ["standin", "standin:slow"]
+    assert [limiter.name for limiter in registry.get("standin", "fast").limiters] == ["standin"]
+    assert registry.get("standin", "slow").limiters[0] is registry.get("standin", "fast").limiters[0]
+    assert registry.get("other", "model").limiters == []
+
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", False)
+    assert registry.get("standin", "slow").limiters == []
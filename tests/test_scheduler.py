@@ -0,0 +1,122 @@
+# tests/test_scheduler.py
+"""
+Global cross-model scheduler
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+import pytest
+
+from src.core.circuit_breaker import CircuitBreakerRegistry
+
+pytest.importorskip("openai")  # imported by src.generators.base
+from src.core.scheduler import GenerationScheduler
+from src.generators.base import GenerationResult
+
+def make_tasks(models, count):
+    return [{"provider": provider, "model": model, "prompt": {"id": f"p{i}", "prompt": "logo"}}
+            for provider, model in models for i in range(count)]
+
+class Recorder:
+    """execute() stand-in tracking concurrency per model and provider"""
+
+    def __init__(self, duration=0.05, fail=None):
+        self.duration = duration
+        self.fail = fail or (lambda task: None)
+        self.lock = threading.Lock()
+        self.active = defaultdict(int)
+        self.peak = defaultdict(int)
+        self.started = []
+
+    def __call__(self, task):
+        keys = (f"{task['provider']}:{task['model']}", task["provider"], "all")
+        with self.lock:
+            self.started.append((time.time(), keys[0], task["prompt"]["id"]))
+            for key in keys:
+                self.active[key] += 1
+                self.peak[key] = max(self.peak[key], self.active[key])
+        time.sleep(self.duration)
+        with self.lock:
+            for key in keys:
+                self.active[key] -= 1
+        status = self.fail(task)
+        return GenerationResult(status is None, task["prompt"]["id"], task["model"],
+                                error=None if status is None else "failed", status_code=status)
+
+@pytest.fixture
+def scheduler():
+    scheduler = GenerationScheduler(max_workers=4, provider_limits={"a": 2}, probe_workers=4)
+    yield scheduler
+    scheduler.shutdown()
+
+def test_runs_every_task_within_the_caps(scheduler):
+    execute = Recorder()
+    tasks = make_tasks([("a", "m1"), ("a", "m2"), ("b", "m1")], 6)
+    summary = scheduler.run(tasks, execute, model_limit=2)
+
+    assert len(summary["results"]) == 18 and all(result.success for result in summary["results"])
+    assert summary["failed_models"] == []
+    assert execute.peak["a:m1"] <= 2 and execute.peak["b:m1"] <= 2
+    # Provider "a" is capped at 2 regular tasks; canaries run on the probe pool
+    assert execute.peak["a"] <= 2 + 2
+    # Models ran side by side rather than one group after another
+    assert execute.peak["all"] > 2
+
+def test_canary_finishes_before_the_rest_of_its_model(scheduler):
+    execute = Recorder()
+    canaries = []
+    scheduler.run(make_tasks([("b", "m1"), ("b", "m2")], 4), execute, model_limit=4,
+                  on_canary=lambda task, result, duration: canaries.append((task["model"], result is not None)))
+
+    assert sorted(canaries) == [("m1", False), ("m1", True), ("m2", False), ("m2", True)]
+    for model in ("b:m1", "b:m2"):
+        starts = [start for start, key, _ in execute.started if key == model]
+        assert starts[1] - starts[0] >= execute.duration * 0.9
+
+def test_permanent_failure_skips_the_rest_of_the_model(scheduler):
+    execute = Recorder(fail=lambda task: 401 if task["model"] == "bad" else None)
+    summary = scheduler.run(make_tasks([("b", "bad"), ("b", "good")], 5), execute, model_limit=2)
+
+    assert summary["failed_models"] == ["b:bad"]
+    assert [key for _, key, _ in execute.started].count("b:bad") == 1
+    assert sum(result.success for result in summary["results"]) == 5
+
+def test_transient_outage_pauses_the_model_until_a_probe_succeeds(scheduler):
+    failures = iter([503, 503])
+    execute = Recorder(fail=lambda task: next(failures, None))
+    breakers = CircuitBreakerRegistry(open_seconds=0.1, max_open_seconds=0.2)
+    summary = scheduler.run(make_tasks([("b", "m1")], 4), execute, model_limit=2, breakers=breakers)
+
+    assert summary["failed_models"] == []
+    assert len(summary["results"]) == 4
+    assert breakers.get("b:m1").trips == 2
+
+def test_deferred_tasks_release_their_worker():
+    scheduler = GenerationScheduler(max_workers=1, provider_limits={}, probe_workers=1)
+    lock = threading.Lock()
+    outstanding, peak = [0], [0]
+
+    def execute(task):
+        future = Future()
+        with lock:
+            outstanding[0] += 1
+            peak[0] = max(peak[0], outstanding[0])
+
+        def finish():
+            with lock:
+                outstanding[0] -= 1
+            future.set_result(GenerationResult(True, task["prompt"]["id"], task["model"]))
+        threading.Timer(0.1, finish).start()
+        return future
+
+    try:
+        summary = scheduler.run(make_tasks([("b", "m1")], 5), execute, model_limit=4)
+    finally:
+        scheduler.shutdown()
+
+    assert sum(result.success for result in summary["results"]) == 5
+    # One worker thread, yet every task after the canary was in flight at once
+    assert peak[0] == 4
@@ -0,0 +1,68 @@
+# tests/test_streaming.py
+"""
+Staged streaming processing
+"""
+
+import threading
+import time
+
+from src.core.streaming import Stage, StreamingPipeline
+
+def test_items_flow_through_every_stage():
+    pipeline = StreamingPipeline([
+        Stage("double", lambda x: x * 2, workers=2),
+        Stage("label", lambda x: f"item-{x}")
+    ], queue_size=2).start()
+    for item in range(10):
+        pipeline.submit(item)
+    outputs = pipeline.close()
+
+    assert sorted(outputs["double"]) == [x * 2 for x in range(10)]
+    assert sorted(outputs["label"]) == sorted(f"item-{x * 2}" for x in range(10))
+    stats = pipeline.stats()
+    assert stats["submitted"] == 10
+    assert stats["stages"]["label"]["completed"] == 10
+    assert stats["drain_time"] is not None
+
+def test_failures_stop_an_item_without_stopping_the_stage():
+    def flaky(x):
+        if x == 3:
+            raise ValueError("broken")
+        return None if x == 5 else x
+
+    pipeline = StreamingPipeline([Stage("flaky", flaky), Stage("after", lambda x: x)]).start()
+    for item in range(8):
+        pipeline.submit(item)
+    outputs = pipeline.close()
+
+    assert sorted(outputs["after"]) == [0, 1, 2, 4, 6, 7]
+    assert pipeline.stats()["stages"]["flaky"]["failed"] == 2
+
+def test_processing_overlaps_submission():
+    processed = []
+    pipeline = StreamingPipeline([Stage("work", lambda x: processed.append(x) or x)]).start()
+    pipeline.submit("first")
+    deadline = time.time() + 2
+    while not processed and time.time() < deadline:
+        time.sleep(0.01)
+    assert processed == ["first"]
+    pipeline.close()
+
+def test_slow_stage_applies_back_pressure():
+    release = threading.Event()
+    pipeline = StreamingPipeline([Stage("slow", lambda x: release.wait() and x)], queue_size=1).start()
+
+    submitted = []
+    def produce():
+        for item in range(5):
+            pipeline.submit(item)
+            submitted.append(item)
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    time.sleep(0.2)
+    # One item in the worker and one in the queue; the producer blocks on the third
+    assert len(submitted) <= 2
+
+    release.set()
+    producer.join(timeout=2)
+    assert sorted(pipeline.close()["slow"]) == list(range(5))
@@ -0,0 +1,181 @@
+# tests/test_webhooks.py
+"""
+Webhook callbacks against a local stand-in provider
+"""
+
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.core.config import Config
+from src.generators.latency import PollSchedule, latency_history
+from src.generators.poller import prediction_poller
+from src.generators.webhooks import WebhookReceiver, verify_signature, webhook_receiver
+
+SECRET = "whsec_" + base64.b64encode(b"stand-in signing key").decode()
+
+def sign(body: bytes, timestamp: int, secret: str = SECRET) -> dict:
+    """Standard Webhooks headers, as Replicate sends them"""
+    key = base64.b64decode(secret.split("_", 1)[-1])
+    signature = base64.b64encode(hmac.new(key, f"msg_1.{timestamp}.".encode() + body,
+                                          hashlib.sha256).digest()).decode()
+    return {"webhook-id": "msg_1", "webhook-timestamp": str(timestamp), "webhook-signature": f"v1,{signature}"}
+
+def post(url: str, payload: dict, headers: dict = None) -> bool:
+    request = urllib.request.Request(url, json.dumps(payload).encode(),
+                                     {"Content-Type": "application/json", **(headers or {})})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())["handled"]
+
+class StandInProvider:
+    """Local Replicate/Fal.ai stand-in that answers submissions and fires completion callbacks
+
+    Status polls always report "processing", so a generation can only
+    finish through its callback.
+    """
+
+    def __init__(self, secret: str = SECRET):
+        self.secret = secret
+        self.status_polls = 0
+        ids = itertools.count()
+        provider = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _send(self, payload, code=200):
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prediction_id = f"pred{next(ids)}"
+                image_url = f"{provider.url}/image.png"
+                if self.path.startswith("/queue/"):
+                    callback = parse_qs(urlsplit(self.path).query)["fal_webhook"][0]
+                    provider.callback(callback, {"request_id": prediction_id, "status": "OK",
+                                                 "payload": {"images": [{"url": image_url}]}},
+                                      {"x-fal-webhook-timestamp": str(int(time.time()))})
+                    self._send({"request_id": prediction_id, "response_url": f"{provider.url}/r/{prediction_id}"})
+                else:
+                    payload = {"id": prediction_id, "status": "succeeded", "output": [image_url]}
+                    body = json.dumps(payload).encode()
+                    provider.callback(request["webhook"], payload, sign(body, int(time.time()), provider.secret))
+                    self._send({"id": prediction_id, "status": "starting"}, 201)
+
+            def do_GET(self):
+                if self.path == "/image.png":
+                    self.send_response(200)
+                    self.send_header("Content-Length", "8")
+                    self.end_headers()
+                    self.wfile.write(b"\x89PNG\r\n\x1a\n")
+                    return
+                provider.status_polls += 1
+                self._send({"status": "processing"}, 200 if self.path.startswith("/v1/") else 202)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def callback(self, url: str, payload: dict, headers: dict):
+        """Call back shortly after answering, like a provider finishing a prediction"""
+        threading.Timer(0.2, post, (url, payload, headers)).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def listener(monkeypatch):
+    webhook_receiver.start_listener(port=0, host="127.0.0.1")
+    monkeypatch.setattr(Config, "WEBHOOK_BASE_URL", f"http://127.0.0.1:{webhook_receiver.listener_port}")
+    yield webhook_receiver
+    webhook_receiver.stop_listener()
+
+@pytest.fixture
+def pending():
+    """Track a prediction that only a callback can finish"""
+    def track(key):
+        return prediction_poller.track(key, lambda: (False, None), PollSchedule.fixed(60, 60))
+    return track
+
+def register_stand_in(receiver):
+    def handle(payload):
+        return f"standin:{payload['id']}", payload["url"]
+    receiver.register("standin", handle, lambda body, headers: verify_signature(SECRET, body, headers))
+
+def test_callback_resolves_prediction(listener, pending):
+    register_stand_in(listener)
+    future = pending("standin:a")
+    body = {"id": "a", "url": "http://example.test/a.png"}
+    assert post(listener.callback_url("standin"), body, sign(json.dumps(body).encode(), int(time.time())))
+    assert future.result(timeout=5) == "http://example.test/a.png"
+
+def test_unknown_provider_is_ignored(listener):
+    assert not post(listener.callback_url("nobody"), {"id": "c", "url": "http://example.test/c.png"})
+
+def test_listener_binds_to_localhost():
+    assert Config.WEBHOOK_LISTEN_HOST == "127.0.0.1"
+
+@pytest.mark.parametrize("token", [None, "wrong"])
+def test_callback_without_token_is_rejected(listener, pending, token):
+    register_stand_in(listener)
+    future = pending(f"standin:{token}")
+    body = {"id": str(token), "url": "http://attacker.test/fake.png"}
+    url = f"{Config.WEBHOOK_BASE_URL}/api/webhooks/standin" + (f"?token={token}" if token else "")
+    assert not post(url, body, sign(json.dumps(body).encode(), int(time.time())))
+    assert not future.done()
+    prediction_poller.resolve(f"standin:{token}", None)
+
+def test_stale_or_forged_callback_is_rejected(listener, pending):
+    register_stand_in(listener)
+    future = pending("standin:b")
+    body = {"id": "b", "url": "http://attacker.test/fake.png"}
+    raw = json.dumps(body).encode()
+    url = listener.callback_url("standin")
+    assert not post(url, body, sign(raw, int(time.time()) - 3600))
+    assert not post(url, body, sign(raw, int(time.time()), secret="whsec_" + base64.b64encode(b"other").decode()))
+    assert not post(url, body, {})
+    assert not future.done()
+    prediction_poller.resolve("standin:b", None)
+
+def test_tokens_differ_per_receiver():
+    assert WebhookReceiver().token != WebhookReceiver().token
+
+def test_generators_finish_from_callbacks(listener, monkeypatch, tmp_path):
+    pytest.importorskip("openai")  # imported by src.generators.base
+    from src.generators.fal_ai import FalAIGenerator
+    from src.generators.replicate import ReplicateGenerator
+
+    monkeypatch.setattr(Config, "REPLICATE_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(Config, "WEBHOOK_FALLBACK_INTERVAL", 60)
+    monkeypatch.setattr(latency_history, "history_file", tmp_path / "model_latency.json")
+    provider = StandInProvider()
+    try:
+        replicate = ReplicateGenerator("stand-in-key")
+        replicate.base_url = f"{provider.url}/v1"
+        fal = FalAIGenerator("stand-in-key")
+        fal.queue_base_url = f"{provider.url}/queue"
+
+        results = [replicate.generate("logo", "r1", "flux_schnell", tmp_path),
+                   fal.generate("logo", "f1", "flux_schnell", tmp_path)]
+    finally:
+        provider.close()
+
+    assert all(result.success for result in results), results
+    assert provider.status_polls == 0